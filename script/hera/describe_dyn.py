@@ -10,7 +10,7 @@ from pathlib import Path
 from regrid_wrapper.describe import DescribeParams, describe
 
 
-def create_params(root_dir: Path, csv_out: Path) -> DescribeParams:
+def create_params(root_dir: Path, csv_out: Path, nproc: int = 1) -> DescribeParams:
     files = glob.glob("**/*smoke_dust*dyn*nc", root_dir=root_dir, recursive=True)
     print(f"{files=}")
     params = DescribeParams(
@@ -25,12 +25,13 @@ def create_params(root_dir: Path, csv_out: Path) -> DescribeParams:
             "smoke_ave",
         ),
         csv_out=csv_out,
+        nproc=nproc,
     )
     return params
 
 
-def main(root_dir: Path, csv_out: Path) -> None:
-    params = create_params(root_dir, csv_out)
+def main(root_dir: Path, csv_out: Path, nproc: int = 1) -> None:
+    params = create_params(root_dir, csv_out, nproc=nproc)
     describe(params)
 
 
@@ -1,7 +1,14 @@
+import fcntl
+import os
+import shutil
 import subprocess
+from enum import StrEnum, unique
 from pathlib import Path
 from typing import Any
 
+import netCDF4 as nc
+import numpy as np
+
 
 def ncdump(path: Path, header_only: bool = True) -> Any:
     args = ["ncdump"]
@@ -11,3 +18,101 @@ def ncdump(path: Path, header_only: bool = True) -> Any:
     ret = subprocess.check_output(args)
     print(ret.decode(), flush=True)
     return ret
+
+
+@unique
+class CopyStrategy(StrEnum):
+    # Reflink or byte copy of netCDF4 inputs. Other formats are re-encoded as
+    # netCDF4 like NETCDF.
+    AUTO = "AUTO"
+    HARDLINK = "HARDLINK"
+    REFLINK = "REFLINK"
+    BYTES = "BYTES"
+    # Re-encode as netCDF4, copying variables in bounded chunks
+    NETCDF = "NETCDF"
+
+
+# ioctl request for FICLONE from linux/fs.h
+_FICLONE = 0x40049409
+
+
+def reflink(src: Path, dst: Path) -> None:
+    """Create ``dst`` as a copy-on-write clone of ``src``.
+
+    Raises ``OSError`` if the filesystem does not support it.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def copy_nc(src: Path, dst: Path, max_chunk_bytes: int = 64 * 1024**2) -> None:
+    with nc.Dataset(src, "r") as dsrc, nc.Dataset(dst, "w", format="NETCDF4") as ddst:
+        ddst.setncatts({k: dsrc.getncattr(k) for k in dsrc.ncattrs()})
+        for name, dim in dsrc.dimensions.items():
+            ddst.createDimension(name, None if dim.isunlimited() else len(dim))
+        for name, var in dsrc.variables.items():
+            var.set_auto_maskandscale(False)
+            attrs = {k: var.getncattr(k) for k in var.ncattrs()}
+            new_var = ddst.createVariable(
+                name,
+                var.dtype,
+                var.dimensions,
+                fill_value=attrs.pop("_FillValue", None),
+            )
+            new_var.set_auto_maskandscale(False)
+            new_var.setncatts(attrs)
+            if var.ndim == 0:
+                new_var.assignValue(var.getValue())
+                continue
+            slab_bytes = var.dtype.itemsize * int(np.prod(var.shape[1:]))
+            chunk_size = max(1, max_chunk_bytes // max(1, slab_bytes))
+            for start in range(0, var.shape[0], chunk_size):
+                new_var[start : start + chunk_size] = var[start : start + chunk_size]
+
+
+class FileCopier:
+    """Copies input files into run directories using a ``CopyStrategy``."""
+
+    def __init__(self, strategy: CopyStrategy = CopyStrategy.AUTO) -> None:
+        self._strategy = strategy
+
+    def copy(self, src: Path, dst: Path) -> CopyStrategy:
+        """Copy ``src`` to ``dst`` and return the method actually used."""
+        src = Path(src).resolve()
+        if self._strategy == CopyStrategy.NETCDF or (
+            self._strategy == CopyStrategy.AUTO and not self._is_netcdf4_(src)
+        ):
+            copy_nc(src, dst)
+            return CopyStrategy.NETCDF
+        ret = None
+        if self._strategy == CopyStrategy.HARDLINK:
+            ret = self._try_link_(src, dst)
+        if ret is None and self._strategy != CopyStrategy.BYTES:
+            try:
+                reflink(src, dst)
+                ret = CopyStrategy.REFLINK
+            except OSError:
+                ret = None
+        if ret is None:
+            shutil.copyfile(src, dst)
+            ret = CopyStrategy.BYTES
+        return ret
+
+    @staticmethod
+    def _is_netcdf4_(src: Path) -> bool:
+        with nc.Dataset(src, "r") as ds:
+            return ds.data_model == "NETCDF4"
+
+    @staticmethod
+    def _try_link_(src: Path, dst: Path) -> CopyStrategy | None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            return None
+        return CopyStrategy.HARDLINK
@@ -1,4 +1,4 @@
-from typing import Iterator
+from typing import Dict, Iterator
 
 from regrid_wrapper.concrete.emi_data import EMI_DATA_ENV, EmiData
 from regrid_wrapper.concrete.rave_to_rrfs import RaveToRrfs
@@ -12,67 +12,79 @@ from regrid_wrapper.model.spec import (
 )
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
+# Source variables whose valid points approximate the regridding work. The RAVE
+# grid file holds no data. Operations writing a weight file keep ESMF's default
+# decomposition so the file's source indexing does not depend on the data.
+COST_VARIABLES: Dict[ComponentKey, str] = {
+    ComponentKey.DUST: RRFS_DUST_DATA_ENV.fields[0],
+    ComponentKey.EMI: EMI_DATA_ENV.fields[0],
+}
+
 
 def iter_operations(cfg: SmokeDustRegridConfig) -> Iterator[AbstractRegridOperation]:
     logger = LOGGER.getChild("iter_operations")
-    for target_grid in cfg.target_grids:
-        for target_component in cfg.target_components:
-            name = f"{target_grid}-{target_component}"
-            logger.debug(f"creating operation: {name}")
-            output_directory = cfg.output_directory(target_grid)
-            model_grid_path = cfg.model_grid_path(target_grid)
-            match target_component:
-                case ComponentKey.VEG_MAP:
-                    spec = GenerateWeightFileAndRegridFields(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory
-                        / f"weights-veg_map-NA_3km-to-{target_grid}.nc",
-                        output_filename=output_directory / "veg_map.nc",
-                        fields=["emiss_factor"],
-                        name=name,
-                    )
-                    yield RrfsSmokeDustVegetationMap(spec=spec)
-                case ComponentKey.RAVE_GRID:
-                    spec = GenerateWeightFileSpec(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory / "weight_file.nc",
-                        name=name,
-                    )
-                    yield RaveToRrfs(spec=spec)
-                case ComponentKey.DUST:
-                    spec = GenerateWeightFileAndRegridFields(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory
-                        / f"weights-dust_data-to-{target_grid}.nc",
-                        output_filename=output_directory / "dust12m_data.nc",
-                        fields=RRFS_DUST_DATA_ENV.fields,
-                        name=name,
-                    )
-                    yield RrfsDustData(spec=spec)
-                case ComponentKey.EMI:
-                    spec = GenerateWeightFileAndRegridFields(
-                        src_path=cfg.source_definition.components[
-                            target_component
-                        ].grid,
-                        dst_path=model_grid_path,
-                        output_weight_filename=output_directory
-                        / f"weights-dust_data-to-{target_grid}.nc",
-                        output_filename=output_directory / "emi_data.nc",
-                        esmpy_debug=False,
-                        name="emi-data",
-                        fields=EMI_DATA_ENV.fields,
-                    )
-                    yield EmiData(spec=spec)
-                case _:
-                    raise NotImplementedError(
-                        f"Unsupported target component {target_component}"
-                    )
+    for target_grid, target_component in cfg.iter_operation_keys():
+        name = f"{target_grid}-{target_component}"
+        src_cost_variable = None
+        if cfg.balance_decomposition:
+            src_cost_variable = COST_VARIABLES.get(target_component)
+        logger.debug(f"creating operation: {name}")
+        output_directory = cfg.output_directory(target_grid)
+        model_grid_path = cfg.model_grid_path(target_grid)
+        match target_component:
+            case ComponentKey.VEG_MAP:
+                spec = GenerateWeightFileAndRegridFields(
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    output_weight_filename=output_directory
+                    / f"weights-veg_map-NA_3km-to-{target_grid}.nc",
+                    output_filename=output_directory / "veg_map.nc",
+                    fields=["emiss_factor"],
+                    name=name,
+                    weight_cache_directory=cfg.weight_cache_directory,
+                    overwrite=cfg.manifest_directory is not None,
+                )
+                yield RrfsSmokeDustVegetationMap(spec=spec)
+            case ComponentKey.RAVE_GRID:
+                spec = GenerateWeightFileSpec(
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    output_weight_filename=output_directory / "weight_file.nc",
+                    name=name,
+                    weight_cache_directory=cfg.weight_cache_directory,
+                    overwrite=cfg.manifest_directory is not None,
+                )
+                yield RaveToRrfs(spec=spec)
+            case ComponentKey.DUST:
+                spec = GenerateWeightFileAndRegridFields(
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    output_filename=output_directory / "dust12m_data.nc",
+                    fields=RRFS_DUST_DATA_ENV.fields,
+                    time_chunk_size=cfg.time_chunk_size,
+                    pipeline_io=cfg.pipeline_io,
+                    name=name,
+                    weight_cache_directory=cfg.weight_cache_directory,
+                    src_cost_variable=src_cost_variable,
+                    overwrite=cfg.manifest_directory is not None,
+                )
+                yield RrfsDustData(spec=spec)
+            case ComponentKey.EMI:
+                spec = GenerateWeightFileAndRegridFields(
+                    src_path=cfg.source_definition.components[target_component].grid,
+                    dst_path=model_grid_path,
+                    output_filename=output_directory / "emi_data.nc",
+                    esmpy_debug=False,
+                    name=name,
+                    fields=EMI_DATA_ENV.fields,
+                    time_chunk_size=cfg.time_chunk_size,
+                    pipeline_io=cfg.pipeline_io,
+                    weight_cache_directory=cfg.weight_cache_directory,
+                    src_cost_variable=src_cost_variable,
+                    overwrite=cfg.manifest_directory is not None,
+                )
+                yield EmiData(spec=spec)
+            case _:
+                raise NotImplementedError(
+                    f"Unsupported target component {target_component}"
+                )
@@ -8,14 +8,21 @@ import numpy as np
 from pydantic import BaseModel, ConfigDict
 
 from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV
+from regrid_wrapper.context.profile import PROFILER, Phase
 from regrid_wrapper.esmpy.field_wrapper import (
     NcToGrid,
     GridSpec,
-    NcToField,
+    NcToFieldBatch,
     resize_nc,
     GridWrapper,
-    FieldWrapper,
+    FieldBatchWrapper,
 )
+from regrid_wrapper.esmpy.grid_registry import (
+    create_field_wrapper,
+    create_grid_wrapper,
+)
+from regrid_wrapper.esmpy.pipeline import TimeWindowPipeline
+from regrid_wrapper.esmpy.weight_cache import create_regridder
 from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
@@ -33,13 +40,20 @@ class EmiData(AbstractRegridOperation):
 
     def run(self) -> None:
         assert isinstance(self._spec, GenerateWeightFileAndRegridFields)
+        if self._spec.output_weight_filename is not None:
+            raise ValueError("operation does not write a weight file")
 
-        src_gwrap = self._create_source_grid_wrapper_()
+        src_gwrap = self._create_source_grid_wrapper_(self._spec.src_cost_variable)
         dst_gwrap = self._create_destination_grid_wrapper_()
 
-        archetype_field_name = EMI_DATA_ENV.fields[0]
+        # A time-chunked source is reloaded in place and cannot be shared.
+        time_chunk_size = self._spec.time_chunk_size
         src_fwrap = self._create_field_wrapper_(
-            archetype_field_name, self._spec.src_path, src_gwrap
+            EMI_DATA_ENV.fields,
+            self._spec.src_path,
+            src_gwrap,
+            shared=time_chunk_size is None,
+            time_chunk_size=time_chunk_size,
         )
 
         new_sizes = {
@@ -62,52 +76,66 @@ class EmiData(AbstractRegridOperation):
 
         dst_gwrap_output = copy(dst_gwrap)
         dst_gwrap_output.spec = src_gwrap.spec
-        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
-            dst_dim.name = src_dim.name
+        for dst_dim in dst_gwrap_output.dims.value:
+            dst_dim.name = src_gwrap.dims.get_by_coordinate_type(
+                dst_dim.coordinate_type
+            ).name
         dst_gwrap_output.fill_nc_variables(self._spec.output_filename)
 
         dst_fwrap = self._create_field_wrapper_(
-            archetype_field_name, self._spec.output_filename, dst_gwrap_output
+            EMI_DATA_ENV.fields,
+            self._spec.output_filename,
+            dst_gwrap_output,
+            time_chunk_size=time_chunk_size,
         )
 
         self._logger.info("starting weight file generation")
         regrid_method = esmpy.RegridMethod.BILINEAR
-        regridder = esmpy.Regrid(
-            src_fwrap.value,
-            dst_fwrap.value,
-            regrid_method=regrid_method,
-            # filename=str(self._spec.output_weight_filename), # Disable since weight files differ per-variable
-            unmapped_action=esmpy.UnmappedAction.IGNORE,
+        regridder = create_regridder(
+            src_fwrap,
+            dst_fwrap,
+            regrid_method,
+            esmpy.UnmappedAction.IGNORE,
+            cache_directory=self._spec.weight_cache_directory,
         )
 
-        for field_to_regrid in EMI_DATA_ENV.fields:
-            self._logger.info(f"regridding field: {field_to_regrid}")
-            src_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.src_path, src_gwrap
-            )
-            dst_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.output_filename, dst_gwrap_output
-            )
-
-            regridder(
-                src_fwrap_regrid.value,
-                dst_fwrap_regrid.value,
+        pipeline = TimeWindowPipeline(
+            src_fwrap,
+            self._spec.src_path,
+            dst_fwrap,
+            self._spec.output_filename,
+            src_fwrap.dims.get(EMI_DATA_ENV.dim_time).size,
+            time_chunk_size,
+            enabled=self._spec.pipeline_io,
+        )
+        for start, stop, src_window, dst_window in pipeline:
+            self._logger.info(
+                f"regridding fields: {EMI_DATA_ENV.fields}, time steps: [{start}, {stop})"
             )
-
-            dst_fwrap_regrid.fill_nc_variable(self._spec.output_filename)
+            with PROFILER.phase(Phase.SPARSE_APPLY):
+                regridder(
+                    src_window.value,
+                    dst_window.value,
+                )
 
     @staticmethod
     def _create_field_wrapper_(
-        field_name: str, path: Path, gwrap: GridWrapper
-    ) -> FieldWrapper:
-        nc2field = NcToField(
+        field_names: Tuple[str, ...],
+        path: Path,
+        gwrap: GridWrapper,
+        shared: bool = False,
+        time_chunk_size: int | None = None,
+    ) -> FieldBatchWrapper:
+        nc2field = NcToFieldBatch(
             path=path,
-            name=field_name,
+            names=field_names,
             dim_time=(RRFS_DUST_DATA_ENV.dim_time,),
             gwrap=gwrap,
+            time_chunk_size=time_chunk_size,
         )
-        fwrap = nc2field.create_field_wrapper()
-        return fwrap
+        if shared:
+            return create_field_wrapper(nc2field)
+        return nc2field.create_field_wrapper()
 
     def _create_destination_grid_wrapper_(self):
         dst_grid_def = NcToGrid(
@@ -122,7 +150,7 @@ class EmiData(AbstractRegridOperation):
         dst_gwrap = dst_grid_def.create_grid_wrapper()
         return dst_gwrap
 
-    def _create_source_grid_wrapper_(self) -> GridWrapper:
+    def _create_source_grid_wrapper_(self, cost_variable: str | None) -> GridWrapper:
         src_grid_def = NcToGrid(
             path=self._spec.src_path,
             spec=GridSpec(
@@ -131,6 +159,7 @@ class EmiData(AbstractRegridOperation):
                 x_dim=("grid_xt",),
                 y_dim=("grid_yt",),
             ),
+            cost_variable=cost_variable,
         )
-        src_gwrap = src_grid_def.create_grid_wrapper()
+        src_gwrap = create_grid_wrapper(src_grid_def)
         return src_gwrap
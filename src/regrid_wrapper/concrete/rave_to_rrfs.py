@@ -2,7 +2,14 @@ from pathlib import Path
 
 import esmpy
 
-from regrid_wrapper.esmpy.field_wrapper import NcToGrid, GridSpec, GridWrapper
+from regrid_wrapper.esmpy.field_wrapper import (
+    NcToGrid,
+    GridSpec,
+    GridWrapper,
+    FieldWrapper,
+)
+from regrid_wrapper.esmpy.grid_registry import create_grid_wrapper
+from regrid_wrapper.esmpy.weight_cache import create_regridder
 from regrid_wrapper.model.spec import GenerateWeightFileSpec
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
@@ -10,7 +17,7 @@ from regrid_wrapper.strategy.operation import AbstractRegridOperation
 class RaveToRrfs(AbstractRegridOperation):
 
     @staticmethod
-    def _create_grid_wrapper_(path: Path) -> GridWrapper:
+    def _create_grid_wrapper_(path: Path, shared: bool = False) -> GridWrapper:
         nc2grid = NcToGrid(
             path=path,
             spec=GridSpec(
@@ -24,30 +31,40 @@ class RaveToRrfs(AbstractRegridOperation):
                 y_corner_dim=("grid_y",),
             ),
         )
-        gwrap = nc2grid.create_grid_wrapper()
-        return gwrap
+        if shared:
+            return create_grid_wrapper(nc2grid)
+        return nc2grid.create_grid_wrapper()
 
     def run(self) -> None:
         assert isinstance(self._spec, GenerateWeightFileSpec)
 
-        src_gwrap = self._create_grid_wrapper_(self._spec.src_path)
+        src_gwrap = self._create_grid_wrapper_(self._spec.src_path, shared=True)
         dst_gwrap = self._create_grid_wrapper_(self._spec.dst_path)
 
-        src_field = esmpy.Field(src_gwrap.value, name="src")
-        dst_field = esmpy.Field(dst_gwrap.value, name="dst")
+        src_fwrap = FieldWrapper(
+            value=esmpy.Field(src_gwrap.value, name="src"),
+            dims=src_gwrap.dims,
+            gwrap=src_gwrap,
+        )
+        dst_fwrap = FieldWrapper(
+            value=esmpy.Field(dst_gwrap.value, name="dst"),
+            dims=dst_gwrap.dims,
+            gwrap=dst_gwrap,
+        )
 
         self._logger.info("starting weight file generation")
         regrid_method = esmpy.RegridMethod.CONSERVE
-        regridder = esmpy.Regrid(
-            src_field,
-            dst_field,
-            regrid_method=regrid_method,
-            filename=str(self._spec.output_weight_filename),
-            unmapped_action=esmpy.UnmappedAction.IGNORE,
+        regridder = create_regridder(
+            src_fwrap,
+            dst_fwrap,
+            regrid_method,
+            esmpy.UnmappedAction.IGNORE,
             ignore_degenerate=True,
+            filename=self._spec.output_weight_filename,
+            cache_directory=self._spec.weight_cache_directory,
         )
 
         # Uncomment to test read back from file
         # _ = esmpy.RegridFromFile(
-        #     src_field, dst_field, str(self._spec.output_weight_filename)
+        #     src_fwrap.value, dst_fwrap.value, str(self._spec.output_weight_filename)
         # )
@@ -1,46 +1,101 @@
+import hashlib
 from copy import copy
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Dict, List
 
 import esmpy
 import numpy as np
 
-from pydantic import BaseModel, ConfigDict
-
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.profile import PROFILER, Phase
 from regrid_wrapper.esmpy.field_wrapper import (
     NcToGrid,
     GridSpec,
-    NcToField,
+    NcToFieldBatch,
     resize_nc,
     GridWrapper,
+    FieldBatchWrapper,
     FieldWrapper,
 )
+from regrid_wrapper.esmpy.grid_registry import (
+    create_field_wrapper,
+    create_grid_wrapper,
+)
+from regrid_wrapper.esmpy.pipeline import TimeWindowPipeline
+from regrid_wrapper.esmpy.weight_cache import create_regridder
 from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
+class FieldMaskSpec(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    # Source value marking missing data. If None, the field is not masked.
+    sentinel: float | None = None
+    # Value of destination points not mapped from valid source points
+    fill_value: float | None = None
+    # If False, a mask is built for every time step instead of the first only.
+    # Otherwise, every time step is checked against the first.
+    time_invariant: bool = True
+
+    @property
+    def is_time_varying(self) -> bool:
+        return self.sentinel is not None and not self.time_invariant
+
+
 class RrfsDustDataEnv(BaseModel):
     model_config = ConfigDict(frozen=True)
     fields: Tuple[str, ...] = ["uthr", "sand", "clay", "rdrag", "ssm"]
     dim_time: str = "time"
+    # Fields without an entry are not masked
+    masks: Dict[str, FieldMaskSpec] = {
+        "uthr": FieldMaskSpec(sentinel=999, fill_value=999),
+        "sand": FieldMaskSpec(sentinel=-1, fill_value=-1),
+        "clay": FieldMaskSpec(sentinel=-1, fill_value=-1),
+        "rdrag": FieldMaskSpec(),
+        "ssm": FieldMaskSpec(),
+    }
+
+    @model_validator(mode="after")
+    def _validate_model_(self) -> "RrfsDustDataEnv":
+        unknown = set(self.masks).difference(self.fields)
+        if unknown:
+            raise ValueError(f"masks for unknown fields: {sorted(unknown)}")
+        return self
+
+    def get_mask_spec(self, name: str) -> FieldMaskSpec:
+        return self.masks.get(name, FieldMaskSpec())
 
 
 RRFS_DUST_DATA_ENV = RrfsDustDataEnv()
 
 
+class MaskGroup(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    mask: np.ndarray
+    names: List[str] = Field(default_factory=list)
+
+
 class RrfsDustData(AbstractRegridOperation):
 
     def run(self) -> None:
         assert isinstance(self._spec, GenerateWeightFileAndRegridFields)
+        if self._spec.output_weight_filename is not None:
+            raise ValueError("operation does not write a weight file")
 
-        src_gwrap = self._create_source_grid_wrapper_()
-        src_gwrap.value.add_item(esmpy.GridItem.MASK)
+        src_gwrap = self._create_source_grid_wrapper_(self._spec.src_cost_variable)
+        src_gwrap.add_mask()
         dst_gwrap = self._create_destination_grid_wrapper_()
 
-        archetype_field_name = RRFS_DUST_DATA_ENV.fields[0]
+        # A time-chunked source is reloaded in place and cannot be shared.
+        time_chunk_size = self._spec.time_chunk_size
         src_fwrap = self._create_field_wrapper_(
-            archetype_field_name, self._spec.src_path, src_gwrap
+            RRFS_DUST_DATA_ENV.fields,
+            self._spec.src_path,
+            src_gwrap,
+            shared=time_chunk_size is None,
+            time_chunk_size=time_chunk_size,
         )
 
         new_sizes = {
@@ -66,88 +121,222 @@ class RrfsDustData(AbstractRegridOperation):
 
         dst_gwrap_output = copy(dst_gwrap)
         dst_gwrap_output.spec = src_gwrap.spec
-        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
-            dst_dim.name = src_dim.name
+        for dst_dim in dst_gwrap_output.dims.value:
+            dst_dim.name = src_gwrap.dims.get_by_coordinate_type(
+                dst_dim.coordinate_type
+            ).name
         dst_gwrap_output.fill_nc_variables(self._spec.output_filename)
 
-        regrid_method = esmpy.RegridMethod.BILINEAR
+        dst_fwrap = self._create_field_wrapper_(
+            RRFS_DUST_DATA_ENV.fields,
+            self._spec.output_filename,
+            dst_gwrap_output,
+            time_chunk_size=time_chunk_size,
+        )
+
+        # Fields sharing a source mask share weights. Group them by mask so the
+        # weights are generated once per distinct mask. Fields whose mask varies
+        # through time are regridded one time step at a time.
+        groups: Dict[str, MaskGroup] = {}
+        time_varying: List[str] = []
         for field_to_regrid in RRFS_DUST_DATA_ENV.fields:
-            self._logger.info(f"regridding field: {field_to_regrid}")
-            src_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.src_path, src_gwrap
-            )
-            dst_fwrap_regrid = self._create_field_wrapper_(
-                field_to_regrid, self._spec.output_filename, dst_gwrap_output
+            mask_spec = RRFS_DUST_DATA_ENV.get_mask_spec(field_to_regrid)
+            if mask_spec.fill_value is not None:
+                dst_fwrap.get_data(field_to_regrid).fill(mask_spec.fill_value)
+            if mask_spec.is_time_varying:
+                time_varying.append(field_to_regrid)
+                continue
+            mask = self._create_mask_(
+                src_fwrap.get_data(field_to_regrid)[:, :, 0], mask_spec
             )
+            key = self._create_mask_key_(mask)
+            if key not in groups:
+                groups[key] = MaskGroup(mask=mask)
+            groups[key].names.append(field_to_regrid)
+        self._logger.info(
+            f"regridding {len(RRFS_DUST_DATA_ENV.fields)} fields using {len(groups)} distinct masks"
+        )
+        if time_varying:
+            self._logger.info(f"fields with time-varying masks: {time_varying}")
 
+        regrid_method = esmpy.RegridMethod.BILINEAR
+        regridders = []
+        for group in groups.values():
             self._logger.info("updating grid mask")
-            self._update_grid_mask_and_dst_field_(
-                src_gwrap, src_fwrap_regrid, dst_fwrap_regrid, field_to_regrid
-            )
+            src_gwrap.add_mask()[:] = group.mask
+
+            # Selections are None if the whole batch is regridded at once.
+            src_sel, dst_sel = None, None
+            if len(groups) > 1 or time_varying:
+                src_sel = src_fwrap.select(group.names)
+                dst_sel = dst_fwrap.select(group.names)
 
             self._logger.info("starting weight file generation")
-            regridder = esmpy.Regrid(
-                src_fwrap_regrid.value,
-                dst_fwrap_regrid.value,
-                regrid_method=regrid_method,
-                # filename=str(self._spec.output_weight_filename), # Disable since weight files differ per-variable
-                unmapped_action=esmpy.UnmappedAction.IGNORE,
+            regridder = create_regridder(
+                src_fwrap if src_sel is None else src_sel,
+                dst_fwrap if dst_sel is None else dst_sel,
+                regrid_method,
+                esmpy.UnmappedAction.IGNORE,
                 src_mask_values=[0],
+                cache_directory=self._spec.weight_cache_directory,
             )
+            regridders.append((group, src_sel, dst_sel, regridder))
 
-            regridder(
-                src_fwrap_regrid.value,
-                dst_fwrap_regrid.value,
-                zero_region=esmpy.Region.SELECT,
-            )
-            dst_fwrap_regrid.fill_nc_variable(self._spec.output_filename)
+        # Regridders are reused for every window of time steps. Regridders for
+        # time-varying masks are created as new masks are found.
+        time_varying_regridders: Dict[str, esmpy.Regrid] = {}
+        # Regridders for time-varying masks are created inside the loop. That
+        # reads weight files and communicates, which must not overlap with I/O
+        # in the pipeline thread.
+        pipeline_io = self._spec.pipeline_io and not time_varying
+        if self._spec.pipeline_io and not pipeline_io:
+            self._logger.warning("time-varying masks. Not pipelining I/O.")
+        pipeline = TimeWindowPipeline(
+            src_fwrap,
+            self._spec.src_path,
+            dst_fwrap,
+            self._spec.output_filename,
+            src_fwrap.dims.get(RRFS_DUST_DATA_ENV.dim_time).size,
+            time_chunk_size,
+            enabled=pipeline_io,
+        )
+        for start, stop, src_window, dst_window in pipeline:
+            for group, src_sel, dst_sel, regridder in regridders:
+                self._check_time_invariant_mask_(src_window, group, start, stop)
+                # Selections were copied from the first window.
+                if src_sel is not None and start > 0:
+                    src_sel.update(src_window, names=group.names)
+                self._logger.info(
+                    f"regridding fields: {group.names}, time steps: [{start}, {stop})"
+                )
+                with PROFILER.phase(Phase.SPARSE_APPLY):
+                    regridder(
+                        src_window.value if src_sel is None else src_sel.value,
+                        dst_window.value if dst_sel is None else dst_sel.value,
+                        zero_region=esmpy.Region.SELECT,
+                    )
+                if dst_sel is not None:
+                    dst_window.update(dst_sel)
+            for field_to_regrid in time_varying:
+                self._regrid_time_varying_field_(
+                    src_window,
+                    dst_window,
+                    field_to_regrid,
+                    stop - start,
+                    time_varying_regridders,
+                )
 
-    def _update_grid_mask_and_dst_field_(
+    def _regrid_time_varying_field_(
         self,
-        gwrap: GridWrapper,
-        src_fwrap: FieldWrapper,
-        dst_fwrap: FieldWrapper,
+        src_fwrap: FieldBatchWrapper,
+        dst_fwrap: FieldBatchWrapper,
         varname: str,
+        ntime: int,
+        regridders: Dict[str, esmpy.Regrid],
+    ) -> None:
+        mask_spec = RRFS_DUST_DATA_ENV.get_mask_spec(varname)
+        src_fwrap_step = self._create_time_step_field_wrapper_(src_fwrap)
+        dst_fwrap_step = self._create_time_step_field_wrapper_(dst_fwrap)
+        src_data = src_fwrap.get_data(varname)
+        dst_data = dst_fwrap.get_data(varname)
+        for idx in range(ntime):
+            mask = self._create_mask_(src_data[:, :, idx], mask_spec)
+            key = self._create_mask_key_(mask)
+            if key not in regridders:
+                self._logger.info(f"new mask for {varname} at time step {idx}")
+                src_fwrap_step.gwrap.add_mask()[:] = mask
+                regridders[key] = create_regridder(
+                    src_fwrap_step,
+                    dst_fwrap_step,
+                    esmpy.RegridMethod.BILINEAR,
+                    esmpy.UnmappedAction.IGNORE,
+                    src_mask_values=[0],
+                    cache_directory=self._spec.weight_cache_directory,
+                )
+            src_fwrap_step.value.data[:] = src_data[:, :, idx]
+            # Reset unmapped points since the buffers are reused across windows.
+            if mask_spec.fill_value is None:
+                dst_fwrap_step.value.data[:] = dst_data[:, :, idx]
+            else:
+                dst_fwrap_step.value.data.fill(mask_spec.fill_value)
+            with PROFILER.phase(Phase.SPARSE_APPLY):
+                regridders[key](
+                    src_fwrap_step.value,
+                    dst_fwrap_step.value,
+                    zero_region=esmpy.Region.SELECT,
+                )
+            dst_data[:, :, idx] = dst_fwrap_step.value.data
+        src_fwrap_step.value.destroy()
+        dst_fwrap_step.value.destroy()
+
+    def _check_time_invariant_mask_(
+        self, src_fwrap: FieldBatchWrapper, group: MaskGroup, start: int, stop: int
     ) -> None:
-        mask = gwrap.value.get_item(esmpy.GridItem.MASK)
-        mask.fill(1)  # 1 = unmasked
-
-        # Assume that the mask is constant through time
-        src_field_data = src_fwrap.value.data[:, :, 0]
-
-        dst_field_data = dst_fwrap.value.data
-
-        self._logger.debug(f"{mask.shape=}")
-        self._logger.debug(f"{src_field_data.shape=}")
-        match varname:
-            case "uthr":
-                mask[np.where(src_field_data == 999)] = 0
-                dst_field_data.fill(999)
-            case "clay":
-                mask[np.where(src_field_data == -1)] = 0
-                dst_field_data.fill(-1)
-            case "ssm":
-                pass
-            case "sand":
-                mask[np.where(src_field_data == -1)] = 0
-                dst_field_data.fill(-1)
-            case "rdrag":
-                pass
-            case _:
-                raise NotImplementedError
+        # Group masks are built from the first time step. A sentinel that moves
+        # through time would otherwise be regridded as valid data.
+        for name in group.names:
+            mask_spec = RRFS_DUST_DATA_ENV.get_mask_spec(name)
+            if mask_spec.sentinel is None:
+                continue
+            src_data = src_fwrap.get_data(name)
+            local = all(
+                np.array_equal(
+                    self._create_mask_(src_data[:, :, idx], mask_spec), group.mask
+                )
+                for idx in range(stop - start)
+            )
+            if not all(COMM.allgather(local)):
+                raise ValueError(
+                    f"mask of {name} varies in time steps [{start}, {stop}). "
+                    "Set time_invariant=False for the field."
+                )
+
+    @staticmethod
+    def _create_time_step_field_wrapper_(fwrap: FieldBatchWrapper) -> FieldWrapper:
+        field = esmpy.Field(
+            fwrap.gwrap.value, name=fwrap.value.name, staggerloc=fwrap.value.staggerloc
+        )
+        return FieldWrapper(
+            value=field, dims=fwrap.gwrap.dims, gwrap=fwrap.gwrap, io_mode=fwrap.io_mode
+        )
+
+    @staticmethod
+    def _create_mask_(
+        src_field_data: np.ndarray, mask_spec: FieldMaskSpec
+    ) -> np.ndarray:
+        # True where the source is valid. Compared in place without index arrays.
+        mask = np.ones(src_field_data.shape, dtype=bool)
+        if mask_spec.sentinel is not None:
+            np.not_equal(src_field_data, mask_spec.sentinel, out=mask)
+        return mask
+
+    @staticmethod
+    def _create_mask_key_(mask: np.ndarray) -> str:
+        # The key must agree on all ranks since weight generation is collective.
+        # Fully valid blocks are not hashed so unmasked fields share a key.
+        local = ""
+        if not mask.all():
+            local = hashlib.blake2b(np.packbits(mask).tobytes()).hexdigest()
+        return "-".join(COMM.allgather(local))
 
     @staticmethod
     def _create_field_wrapper_(
-        field_name: str, path: Path, gwrap: GridWrapper
-    ) -> FieldWrapper:
-        nc2field = NcToField(
+        field_names: Tuple[str, ...],
+        path: Path,
+        gwrap: GridWrapper,
+        shared: bool = False,
+        time_chunk_size: int | None = None,
+    ) -> FieldBatchWrapper:
+        nc2field = NcToFieldBatch(
             path=path,
-            name=field_name,
+            names=field_names,
             dim_time=(RRFS_DUST_DATA_ENV.dim_time,),
             gwrap=gwrap,
+            time_chunk_size=time_chunk_size,
         )
-        fwrap = nc2field.create_field_wrapper()
-        return fwrap
+        if shared:
+            return create_field_wrapper(nc2field)
+        return nc2field.create_field_wrapper()
 
     def _create_destination_grid_wrapper_(self):
         dst_grid_def = NcToGrid(
@@ -162,7 +351,7 @@ class RrfsDustData(AbstractRegridOperation):
         dst_gwrap = dst_grid_def.create_grid_wrapper()
         return dst_gwrap
 
-    def _create_source_grid_wrapper_(self) -> GridWrapper:
+    def _create_source_grid_wrapper_(self, cost_variable: str | None) -> GridWrapper:
         src_grid_def = NcToGrid(
             path=self._spec.src_path,
             spec=GridSpec(
@@ -171,6 +360,7 @@ class RrfsDustData(AbstractRegridOperation):
                 x_dim=("lon",),
                 y_dim=("lat",),
             ),
+            cost_variable=cost_variable,
         )
-        src_gwrap = src_grid_def.create_grid_wrapper()
+        src_gwrap = create_grid_wrapper(src_grid_def)
         return src_gwrap
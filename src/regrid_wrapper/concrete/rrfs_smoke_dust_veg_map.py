@@ -3,6 +3,7 @@ from pathlib import Path
 
 import esmpy
 
+from regrid_wrapper.context.profile import PROFILER, Phase
 from regrid_wrapper.esmpy.field_wrapper import (
     GridWrapper,
     NcToGrid,
@@ -11,6 +12,11 @@ from regrid_wrapper.esmpy.field_wrapper import (
     NcToField,
     resize_nc,
 )
+from regrid_wrapper.esmpy.grid_registry import (
+    create_field_wrapper,
+    create_grid_wrapper,
+)
+from regrid_wrapper.esmpy.weight_cache import create_regridder
 from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
@@ -27,7 +33,7 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
                 y_dim=("geolat", "lat"),
             ),
         )
-        src_gwrap = src_grid_def.create_grid_wrapper()
+        src_gwrap = create_grid_wrapper(src_grid_def)
         return src_gwrap
 
     def _create_destination_grid_wrapper_(self):
@@ -45,15 +51,16 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
 
     @staticmethod
     def _create_field_wrapper_(
-        field_name: str, path: Path, gwrap: GridWrapper
+        field_name: str, path: Path, gwrap: GridWrapper, shared: bool = False
     ) -> FieldWrapper:
         nc2field = NcToField(
             path=path,
             name=field_name,
             gwrap=gwrap,
         )
-        fwrap = nc2field.create_field_wrapper()
-        return fwrap
+        if shared:
+            return create_field_wrapper(nc2field)
+        return nc2field.create_field_wrapper()
 
     def run(self) -> None:
         assert isinstance(self._spec, GenerateWeightFileAndRegridFields)
@@ -64,7 +71,7 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
         dst_gwrap = self._create_destination_grid_wrapper_()
 
         src_fwrap = self._create_field_wrapper_(
-            field_to_regrid, self._spec.src_path, src_gwrap
+            field_to_regrid, self._spec.src_path, src_gwrap, shared=True
         )
 
         new_sizes = {}
@@ -85,8 +92,10 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
 
         dst_gwrap_output = copy(dst_gwrap)
         dst_gwrap_output.spec = src_gwrap.spec
-        for src_dim, dst_dim in zip(src_gwrap.dims.value, dst_gwrap_output.dims.value):
-            dst_dim.name = src_dim.name
+        for dst_dim in dst_gwrap_output.dims.value:
+            dst_dim.name = src_gwrap.dims.get_by_coordinate_type(
+                dst_dim.coordinate_type
+            ).name
         dst_gwrap_output.fill_nc_variables(self._spec.output_filename)
 
         dst_fwrap = self._create_field_wrapper_(
@@ -95,18 +104,20 @@ class RrfsSmokeDustVegetationMap(AbstractRegridOperation):
 
         self._logger.info("starting weight file generation")
         regrid_method = esmpy.RegridMethod.BILINEAR
-        regridder = esmpy.Regrid(
-            src_fwrap.value,
-            dst_fwrap.value,
-            regrid_method=regrid_method,
-            filename=str(self._spec.output_weight_filename),
-            unmapped_action=self._spec.esmpy_unmapped_action,
+        regridder = create_regridder(
+            src_fwrap,
+            dst_fwrap,
+            regrid_method,
+            self._spec.esmpy_unmapped_action,
+            filename=self._spec.output_weight_filename,
+            cache_directory=self._spec.weight_cache_directory,
         )
 
         self._logger.info(f"regridding field: {field_to_regrid}")
-        regridder(
-            src_fwrap.value,
-            dst_fwrap.value,
-            zero_region=esmpy.Region.SELECT,
-        )
+        with PROFILER.phase(Phase.SPARSE_APPLY):
+            regridder(
+                src_fwrap.value,
+                dst_fwrap.value,
+                zero_region=esmpy.Region.SELECT,
+            )
         dst_fwrap.fill_nc_variable(self._spec.output_filename)
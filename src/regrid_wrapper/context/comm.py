@@ -1,13 +1,20 @@
-from typing import Any, List
+from functools import cached_property
+from typing import Any, Callable, List, Sequence, Tuple, cast
 
+import numpy as np
 from mpi4py import MPI
 
 
 class Comm:
     MPI = MPI
 
-    def __init__(self) -> None:
-        self._comm = MPI.COMM_WORLD
+    def __init__(self, comm: MPI.Comm | None = None) -> None:
+        self._comm = MPI.COMM_WORLD if comm is None else comm
+
+    @cached_property
+    def node(self) -> "Comm":
+        """Ranks sharing memory with this rank (usually one compute node)."""
+        return Comm(self._comm.Split_type(MPI.COMM_TYPE_SHARED))
 
     @property
     def rank(self) -> int:
@@ -17,11 +24,57 @@ class Comm:
     def size(self) -> int:
         return self._comm.Get_size()
 
+    @property
+    def is_thread_multiple(self) -> bool:
+        """Whether MPI may be called from several threads at once."""
+        return MPI.Query_thread() == MPI.THREAD_MULTIPLE
+
     def barrier(self) -> None:
         self._comm.barrier()
 
-    def bcast(self, value: dict, root: int = 0) -> dict:
+    def bcast(self, value: Any, root: int = 0) -> Any:
         return self._comm.bcast(value, root=root)
 
+    def bcast_call(self, func: Callable[[], Any], root: int = 0) -> Any:
+        """Call ``func`` on ``root`` only and broadcast its result.
+
+        An exception raised on ``root`` is broadcast and raised on every rank so
+        no rank is left waiting.
+        """
+        ret, error = None, None
+        if self.rank == root:
+            try:
+                ret = func()
+            except Exception as e:
+                error = e
+        ret, error = self.bcast((ret, error), root=root)
+        if error is not None:
+            raise error
+        return ret
+
+    def gather(self, value: Any, root: int = 0) -> List[Any] | None:
+        return self._comm.gather(value, root=root)
+
+    def allgather(self, value: Any) -> List[Any]:
+        return self._comm.allgather(value)
+
+    def allocate_shared(
+        self, shape: Sequence[int], dtype: np.dtype
+    ) -> Tuple[MPI.Win, np.ndarray]:
+        """Allocate an array in memory shared by all ranks of this communicator.
+
+        Rank 0 owns the memory. The window must be freed collectively once the
+        array is no longer used.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize if self.rank == 0 else 0
+        # COMM_WORLD and communicators split from it are intracommunicators.
+        comm = cast(MPI.Intracomm, self._comm)
+        win = MPI.Win.Allocate_shared(nbytes, dtype.itemsize, comm=comm)
+        buf, _ = win.Shared_query(0)
+        return win, np.ndarray(
+            buffer=cast(memoryview, buf), dtype=dtype, shape=tuple(shape)
+        )
+
 
 COMM = Comm()
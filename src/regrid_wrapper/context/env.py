@@ -1,5 +1,6 @@
 import logging
 import os
+from typing import Dict
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -18,6 +19,18 @@ class Environment(BaseSettings):
     LOG_DIR: PathType
     LOG_PREFIX: str = "Regrid-Wrapper"
     LOG_LEVEL: int = logging.DEBUG
+    # MPI-IO hints (e.g. cb_nodes, striping_factor) used when opening files
+    MPIIO_HINTS: Dict[str, str] = {}
+    # Memory-map grid coordinates stored in classic (netCDF-3) files
+    MMAP_COORDS: bool = True
+    # Read grid coordinates once per node into MPI shared memory
+    NODE_SHARED_COORDS: bool = False
+    # Record per-phase timing, memory and I/O and write a report per operation
+    PROFILE: bool = False
+    # Source grids kept alive across operations by a run, and the estimated
+    # per-rank memory they may hold before the least recently used is destroyed
+    GRID_REGISTRY_MAX_SIZE: int = 4
+    GRID_REGISTRY_MAX_BYTES: int = 2 * 1024**3
 
     def create_log_file_path(self) -> Path:
         comm = MPI.COMM_WORLD
@@ -27,6 +27,9 @@ def init_logging() -> logging.Logger:
                 "class": "logging.FileHandler",
                 "filename": ENV.create_log_file_path(),
                 "mode": "w",
+                # Open on first record so importing does not touch the file
+                # system on every rank.
+                "delay": True,
             },
         },
         "loggers": {
@@ -41,4 +44,3 @@ def init_logging() -> logging.Logger:
 
 
 LOGGER = init_logging()
-LOGGER.info(ENV)
@@ -0,0 +1,223 @@
+import csv
+import json
+import os
+import resource
+import time
+from contextlib import contextmanager
+from enum import StrEnum, unique
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from pydantic import BaseModel
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.env import ENV
+from regrid_wrapper.context.logging import LOGGER
+
+
+@unique
+class Phase(StrEnum):
+    GRID_CREATE = "grid_create"
+    FIELD_LOAD = "field_load"
+    RESIZE_NC = "resize_nc"
+    WEIGHT_GENERATION = "weight_generation"
+    SPARSE_APPLY = "sparse_apply"
+    NC_WRITE = "nc_write"
+
+
+class PhaseStats(BaseModel):
+    count: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    # Process high-water mark at the last exit. Not attributable to the phase.
+    process_peak_rss: int = 0
+    # Largest growth of the resident set between entry and exit
+    rss_delta: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    # Entries that overlapped other threads. Only their wall time is recorded.
+    concurrent_count: int = 0
+
+
+class PhaseReport(BaseModel):
+    phase: str
+    count: int
+    wall_min: float
+    wall_mean: float
+    wall_max: float
+    cpu_min: float
+    cpu_mean: float
+    cpu_max: float
+    process_peak_rss_max: int
+    rss_delta_max: int
+    read_bytes_sum: int
+    write_bytes_sum: int
+    concurrent_count: int
+
+
+def read_io_bytes() -> Tuple[int, int]:
+    # rchar/wchar count bytes passed through read/write calls, including
+    # reads served from the page cache. Zero where procfs is unavailable.
+    ret = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                ret[key] = int(value)
+    except OSError:
+        pass
+    return ret.get("rchar", 0), ret.get("wchar", 0)
+
+
+def read_peak_rss() -> int:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def read_rss() -> int:
+    # Current resident set size. Zero where procfs is unavailable.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+class Profiler:
+    """Accumulates per-phase wall time, CPU time, memory growth and I/O on this rank.
+
+    Enabled with ``REGRID_WRAPPER_PROFILE``. When disabled, ``phase`` does not
+    read any counters. Nested entries of the same phase are only counted once.
+
+    CPU time, memory and I/O counters are process wide. Inside ``concurrent``
+    they would include work from other threads, so only wall time is recorded.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, PhaseStats] = {}
+        self._active: Dict[str, int] = {}
+        self._concurrent = 0
+        self._logger = LOGGER.getChild("profiler")
+
+    @property
+    def enabled(self) -> bool:
+        return ENV.PROFILE
+
+    @property
+    def stats(self) -> Dict[str, PhaseStats]:
+        return self._stats
+
+    def reset(self) -> None:
+        self._stats = {}
+        self._active = {}
+        self._concurrent = 0
+
+    @contextmanager
+    def concurrent(self) -> Iterator[None]:
+        """Mark a region where phases may run on several threads at once."""
+        self._concurrent += 1
+        try:
+            yield
+        finally:
+            self._concurrent -= 1
+
+    @contextmanager
+    def phase(self, name: Phase) -> Iterator[None]:
+        if not self.enabled or self._active.get(name, 0) > 0:
+            yield
+            return
+        self._active[name] = 1
+        concurrent = self._concurrent > 0
+        read_start, write_start = read_io_bytes()
+        rss_start = read_rss()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            read_end, write_end = read_io_bytes()
+            self._active[name] = 0
+            stats = self._stats.setdefault(name, PhaseStats())
+            stats.count += 1
+            stats.wall += wall
+            if concurrent or self._concurrent > 0:
+                stats.concurrent_count += 1
+            else:
+                stats.cpu += cpu
+                stats.process_peak_rss = read_peak_rss()
+                stats.rss_delta = max(stats.rss_delta, read_rss() - rss_start)
+                stats.read_bytes += read_end - read_start
+                stats.write_bytes += write_end - write_start
+
+    def reduce(self) -> List[PhaseReport] | None:
+        """Gather stats from all ranks. Only rank 0 receives the reduction."""
+        gathered = COMM.gather({k: v.model_dump() for k, v in self._stats.items()})
+        if gathered is None:
+            return None
+        names = [ii.value for ii in Phase]
+        for rank_stats in gathered:
+            names += [ii for ii in rank_stats if ii not in names]
+        ret = []
+        for name in names:
+            per_rank = [
+                PhaseStats.model_validate(ii[name]) for ii in gathered if name in ii
+            ]
+            if len(per_rank) == 0:
+                continue
+            walls = [ii.wall for ii in per_rank]
+            cpus = [ii.cpu for ii in per_rank]
+            ret.append(
+                PhaseReport(
+                    phase=name,
+                    count=max(ii.count for ii in per_rank),
+                    wall_min=min(walls),
+                    wall_mean=sum(walls) / len(walls),
+                    wall_max=max(walls),
+                    cpu_min=min(cpus),
+                    cpu_mean=sum(cpus) / len(cpus),
+                    cpu_max=max(cpus),
+                    process_peak_rss_max=max(ii.process_peak_rss for ii in per_rank),
+                    rss_delta_max=max(ii.rss_delta for ii in per_rank),
+                    read_bytes_sum=sum(ii.read_bytes for ii in per_rank),
+                    write_bytes_sum=sum(ii.write_bytes for ii in per_rank),
+                    concurrent_count=max(ii.concurrent_count for ii in per_rank),
+                )
+            )
+        return ret
+
+    def write_report(self, name: str, directory: Path | None = None) -> Path | None:
+        """Reduce stats and write ``<prefix>-profile-<name>.json/.csv`` on rank 0.
+
+        Collective. Returns the JSON path on rank 0 and ``None`` elsewhere.
+        """
+        if not self.enabled:
+            return None
+        reports = self.reduce()
+        if reports is None:
+            return None
+        if directory is None:
+            directory = Path(ENV.LOG_DIR)
+        stem = f"{ENV.LOG_PREFIX}-profile-{name}"
+        json_path = directory / f"{stem}.json"
+        with open(json_path, "w") as f:
+            json.dump(
+                {
+                    "name": name,
+                    "size": COMM.size,
+                    "phases": [ii.model_dump() for ii in reports],
+                },
+                f,
+                indent=2,
+            )
+        with open(directory / f"{stem}.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(PhaseReport.model_fields))
+            writer.writeheader()
+            for report in reports:
+                writer.writerow(report.model_dump())
+        self._logger.info(f"wrote profile report: {json_path}")
+        return json_path
+
+
+PROFILER = Profiler()
@@ -1,37 +1,181 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Sequence
 
-import pandas as pd
-import xarray as xr
+import netCDF4 as nc
+import numpy as np
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+QUANTILES = (0.25, 0.5, 0.75)
+
 
 class DescribeParams(BaseModel):
     namespace: str
     files: tuple[Path, ...]
     varnames: tuple[str, ...]
     csv_out: Path
+    # Number of worker processes. Files are summarized independently.
+    nproc: int = 1
+    # Upper bound on the size of each chunk read from a variable
+    chunk_bytes: int = 256 * 1024**2
+    # Histogram resolution used to estimate quantiles
+    nbins: int = 4096
+
+
+class StreamingStats:
+    """Summary statistics accumulated over chunks of an array in one pass.
+
+    Null values (masked or NaN) are counted and otherwise skipped. Moments are
+    merged chunk by chunk. Quantiles are interpolated from a fixed number of
+    histogram bins whose range doubles as new values arrive, so they fall within
+    a few ``(max - min) / nbins`` of the order statistics around the exact value.
+    """
+
+    def __init__(self, nbins: int = 4096) -> None:
+        if nbins < 2 or nbins % 2 != 0:
+            raise ValueError(f"nbins must be an even number >= 2: {nbins}")
+        self.nbins = nbins
+        self.n = 0
+        self.n_null = 0
+        self.sum = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._lo: float | None = None
+        self._width = 0.0
+        self._counts = np.zeros(nbins, dtype=np.int64)
+
+    @property
+    def std(self) -> float:
+        if self.n == 0:
+            return np.nan
+        return float(np.sqrt(self.m2 / self.n))
+
+    def update(self, values: np.ndarray) -> None:
+        data = np.ma.getdata(values).astype(np.float64, copy=False).ravel()
+        valid = ~np.isnan(data) & ~np.ma.getmaskarray(values).ravel()
+        data = data[valid]
+        self.n_null += valid.size - data.size
+        if data.size == 0:
+            return
+
+        n = data.size
+        mean = data.mean()
+        m2 = np.square(data - mean).sum()
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+        self.sum += data.sum()
+        self.min = min(self.min, data.min())
+        self.max = max(self.max, data.max())
+
+        finite = data[np.isfinite(data)]
+        if finite.size > 0:
+            self._update_histogram_(finite, finite.min(), finite.max())
+
+    def quantile(self, q: float) -> float:
+        cumulative = np.cumsum(self._counts)
+        if cumulative[-1] == 0:
+            return np.nan
+        target = q * cumulative[-1]
+        idx = int(np.searchsorted(cumulative, target, side="left"))
+        before = cumulative[idx - 1] if idx > 0 else 0
+        fraction = (target - before) / self._counts[idx]
+        value = self._lo + (idx + fraction) * self._width
+        return float(np.clip(value, self.min, self.max))
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret: Dict[str, Any] = {
+            "median": self.quantile(0.5),
+            "min": self.min if self.n > 0 else np.nan,
+            "max": self.max if self.n > 0 else np.nan,
+            "mean": self.mean if self.n > 0 else np.nan,
+            "std": self.std,
+        }
+        for q in QUANTILES:
+            ret[f"{q:.0%}"] = self.quantile(q)
+        ret["sum"] = self.sum
+        ret["n"] = self.n
+        ret["n_null"] = self.n_null
+        return ret
+
+    def _update_histogram_(self, data: np.ndarray, lo: float, hi: float) -> None:
+        if self._lo is None:
+            self._lo = lo
+            self._width = max((hi - lo) / self.nbins, np.finfo(np.float64).tiny)
+        while lo < self._lo:
+            # Extend the range left by its current span and merge bin pairs.
+            self._lo -= self._width * self.nbins
+            self._counts = self._merge_bins_(np.zeros_like(self._counts), self._counts)
+        while hi > self._lo + self._width * self.nbins:
+            self._counts = self._merge_bins_(self._counts, np.zeros_like(self._counts))
+        idx = ((data - self._lo) / self._width).astype(np.int64)
+        np.clip(idx, 0, self.nbins - 1, out=idx)
+        self._counts += np.bincount(idx, minlength=self.nbins)
+
+    def _merge_bins_(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        self._width *= 2
+        return np.concatenate([left, right]).reshape(-1, 2).sum(axis=1)
+
+
+def iter_chunks(var: nc.Variable, chunk_bytes: int) -> Iterator[np.ndarray]:
+    """Read a variable in slabs along its first dimension."""
+    if var.ndim == 0 or var.size == 0:
+        yield var[...]
+        return
+    row_bytes = var.dtype.itemsize * int(np.prod(var.shape[1:]))
+    step = max(1, chunk_bytes // max(row_bytes, 1))
+    for start in range(0, var.shape[0], step):
+        yield var[start : start + step]
+
+
+def describe_file(
+    path: Path,
+    namespace: str,
+    varnames: Sequence[str],
+    chunk_bytes: int = DescribeParams.model_fields["chunk_bytes"].default,
+    nbins: int = DescribeParams.model_fields["nbins"].default,
+) -> List[Dict[str, Any]]:
+    ret = []
+    with nc.Dataset(path, "r") as ds:
+        for varname in varnames:
+            stats = StreamingStats(nbins=nbins)
+            for chunk in iter_chunks(ds.variables[varname], chunk_bytes):
+                stats.update(chunk)
+            row = {"file": path, "namespace": namespace, "varname": varname}
+            row.update(stats.to_dict())
+            ret.append(row)
+    return ret
+
 
+def describe(params: DescribeParams) -> "pd.DataFrame":
+    import pandas as pd
 
-def describe(params: DescribeParams) -> pd.DataFrame:
+    func = partial(
+        describe_file,
+        namespace=params.namespace,
+        varnames=params.varnames,
+        chunk_bytes=params.chunk_bytes,
+        nbins=params.nbins,
+    )
+    nfiles = len(params.files)
     summary = []
-    for idx, f in enumerate(params.files):
-        with xr.open_dataset(f) as ds:
-            print(f"{idx + 1} of {len(params.files)}: {f=}")
-            for varname in params.varnames:
-                print(varname)
-                row = {"file": f, "namespace": params.namespace}
-                row["varname"] = varname
-                row["median"] = ds[varname].median().values.item()
-                row["min"] = ds[varname].min().values.item()
-                row["max"] = ds[varname].max().values.item()
-                row["mean"] = ds[varname].mean().values.item()
-                row["std"] = ds[varname].std().values.item()
-                for q in [0.25, 0.5, 0.75]:
-                    row[f"{q:.0%}"] = ds[varname].quantile(q).values.item()
-                row["sum"] = ds[varname].sum().values.item()
-                row["n"] = ds[varname].count().values.item()
-                row["n_null"] = ds[varname].isnull().sum().values.item()
-                summary.append(row)
+    if params.nproc > 1 and nfiles > 1:
+        with ProcessPoolExecutor(max_workers=min(params.nproc, nfiles)) as executor:
+            for idx, rows in enumerate(executor.map(func, params.files)):
+                print(f"{idx + 1} of {nfiles}: {params.files[idx]}")
+                summary += rows
+    else:
+        for idx, f in enumerate(params.files):
+            print(f"{idx + 1} of {nfiles}: {f=}")
+            summary += func(f)
     df = pd.DataFrame(summary)
     df.to_csv(params.csv_out, index=False)
     return df
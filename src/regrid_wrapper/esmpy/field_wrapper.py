@@ -1,36 +1,124 @@
 import abc
 from contextlib import contextmanager
+from enum import StrEnum, unique
 from pathlib import Path
-from typing import Tuple, Literal, Dict, Sequence, Any, Union, List
+from typing import Tuple, Literal, Dict, Sequence, Any, Union, List, Iterator, Self
 
 import numpy as np
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 import esmpy
 import netCDF4 as nc
+import scipy.io
 
 from mpi4py import MPI
 
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.env import ENV
 from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.profile import PROFILER, Phase
 
 _LOGGER = LOGGER.getChild(__name__)
 
 
+def create_mpi_info(hints: Dict[str, str] | None = None) -> MPI.Info:
+    if hints is None:
+        hints = ENV.MPIIO_HINTS
+    if not hints:
+        return MPI.Info()
+    info = MPI.Info.Create()
+    for key, value in hints.items():
+        info.Set(key, str(value))
+    return info
+
+
+def _create_dataset_(
+    path: Path, mode: Literal["r", "w", "a"], clobber: bool, parallel: bool
+) -> nc.Dataset:
+    _LOGGER.debug(f"opening {path}")
+    info = create_mpi_info()
+    try:
+        return nc.Dataset(
+            path,
+            mode=mode,
+            clobber=clobber,
+            parallel=parallel,
+            comm=MPI.COMM_WORLD,
+            info=info,
+        )
+    finally:
+        if info != MPI.INFO_NULL:
+            info.Free()
+
+
+class DatasetPool:
+    """Keeps one open handle per path shared by all ``open_nc`` calls in a session."""
+
+    def __init__(self) -> None:
+        self._handles: Dict[Path, Tuple[str, bool, nc.Dataset]] = {}
+
+    def get(
+        self,
+        path: Path,
+        mode: Literal["r", "w", "a"],
+        clobber: bool,
+        parallel: bool,
+    ) -> nc.Dataset:
+        key = Path(path).resolve()
+        if key in self._handles:
+            open_mode, open_parallel, ds = self._handles[key]
+            if open_parallel == parallel and mode != "w":
+                if open_mode == "a" and mode == "r":
+                    # Make values written through this handle visible to all ranks
+                    ds.sync()
+                    return ds
+                if open_mode == mode:
+                    return ds
+            _LOGGER.debug(f"reopening {path} with mode={mode}")
+            ds.close()
+            del self._handles[key]
+        ds = _create_dataset_(path, mode, clobber, parallel)
+        self._handles[key] = ("a" if mode == "w" else mode, parallel, ds)
+        return ds
+
+    def close(self) -> None:
+        for path, (_, _, ds) in self._handles.items():
+            _LOGGER.debug(f"closing {path}")
+            ds.close()
+        self._handles.clear()
+
+
+_DATASET_POOL: DatasetPool | None = None
+
+
+@contextmanager
+def dataset_session() -> Iterator[DatasetPool]:
+    """Open each file once for the duration of the session.
+
+    Nested sessions share the outermost pool.
+    """
+    global _DATASET_POOL
+    if _DATASET_POOL is not None:
+        yield _DATASET_POOL
+        return
+    _DATASET_POOL = DatasetPool()
+    try:
+        yield _DATASET_POOL
+    finally:
+        pool, _DATASET_POOL = _DATASET_POOL, None
+        pool.close()
+
+
 @contextmanager
 def open_nc(
     path: Path,
     mode: Literal["r", "w", "a"] = "r",
     clobber: bool = False,
     parallel: bool = True,
-) -> nc.Dataset:
-    _LOGGER.debug(f"opening {path}")
-    ds = nc.Dataset(
-        path,
-        mode=mode,
-        clobber=clobber,
-        parallel=parallel,
-        comm=MPI.COMM_WORLD,
-        info=MPI.Info(),
-    )
+) -> Iterator[nc.Dataset]:
+    if _DATASET_POOL is not None:
+        yield _DATASET_POOL.get(path, mode, clobber, parallel)
+        return
+    ds = _create_dataset_(path, mode, clobber, parallel)
     try:
         yield ds
     finally:
@@ -47,11 +135,13 @@ def copy_nc_attrs(src: HasNcAttrsType, dst: HasNcAttrsType) -> None:
         setattr(dst, attr, getattr(src, attr))
 
 
+@PROFILER.phase(Phase.RESIZE_NC)
 def resize_nc(
     src_path: Path,
     dst_path: Path,
     new_sizes: Dict[str, int],
     copy_values_for: Sequence[str] | None = None,
+    max_chunk_bytes: int = 64 * 1024**2,
 ) -> None:
     with open_nc(src_path, mode="r") as src:
         with open_nc(dst_path, mode="w") as dst:
@@ -68,7 +158,30 @@ def resize_nc(
                 )
                 copy_nc_attrs(var, new_var)
                 if copy_values_for and varname in copy_values_for:
-                    new_var[:] = var[:]
+                    copy_nc_values(var, new_var, max_chunk_bytes=max_chunk_bytes)
+
+
+def copy_nc_values(
+    src: nc.Variable, dst: nc.Variable, max_chunk_bytes: int = 64 * 1024**2
+) -> None:
+    """Stream values in hyperslabs along the slowest varying dimension.
+
+    Chunks are dealt round-robin to ranks so each rank reads and writes only
+    its share and holds at most ``max_chunk_bytes`` at a time.
+    """
+    # Ranks copy different numbers of chunks so access must be independent
+    set_io_mode(src, IoMode.INDEPENDENT)
+    set_io_mode(dst, IoMode.INDEPENDENT)
+    if src.ndim == 0:
+        if COMM.rank == 0:
+            dst.assignValue(src.getValue())
+        return
+    slab_bytes = np.dtype(src.dtype).itemsize * int(np.prod(src.shape[1:]))
+    chunk_size = max(1, max_chunk_bytes // max(1, slab_bytes))
+    nslow = src.shape[0]
+    for start in range(COMM.rank * chunk_size, nslow, COMM.size * chunk_size):
+        stop = min(start + chunk_size, nslow)
+        dst[start:stop] = src[start:stop]
 
 
 NameListType = Tuple[str, ...]
@@ -114,6 +227,12 @@ class DimensionCollection(BaseModel):
                     return ii
         raise ValueError(f"dimension not found: {name}")
 
+    def get_by_coordinate_type(self, coordinate_type: str) -> Dimension:
+        for ii in self.value:
+            if ii.coordinate_type == coordinate_type:
+                return ii
+        raise ValueError(f"dimension not found: {coordinate_type}")
+
 
 def create_dimension_map(dims: DimensionCollection) -> Dict[str, int]:
     ret = {}
@@ -123,23 +242,140 @@ def create_dimension_map(dims: DimensionCollection) -> Dict[str, int]:
     return ret
 
 
+@unique
+class IoMode(StrEnum):
+    INDEPENDENT = "INDEPENDENT"
+    COLLECTIVE = "COLLECTIVE"
+    AUTO = "AUTO"
+
+
+# Variables at least this large use collective access in ``IoMode.AUTO``.
+COLLECTIVE_IO_MIN_BYTES = 4 * 1024**2
+
+
+def set_io_mode(var: nc.Variable, io_mode: IoMode) -> None:
+    """Set the MPI-IO access mode of a variable opened for parallel access.
+
+    Collective access requires every rank to take part in each read or write.
+    The ``AUTO`` decision depends only on the global variable size, so it is
+    the same on all ranks.
+    """
+    match io_mode:
+        case IoMode.INDEPENDENT:
+            collective = False
+        case IoMode.COLLECTIVE:
+            collective = True
+        case IoMode.AUTO:
+            nbytes = np.dtype(var.dtype).itemsize * int(np.prod(var.shape))
+            collective = nbytes >= COLLECTIVE_IO_MIN_BYTES
+        case _:
+            raise NotImplementedError(io_mode)
+    # Ignored by netCDF4 if the file is not open for parallel access
+    var.set_collective(collective)
+
+
+_MASKING_ATTRS = (
+    "_FillValue",
+    "missing_value",
+    "valid_min",
+    "valid_max",
+    "valid_range",
+)
+
+
+def set_auto_mask(var: nc.Variable) -> None:
+    # Masked arrays cost an extra allocation and pass over the data. Only use
+    # them if the variable declares values to mask.
+    var.set_auto_mask(any(hasattr(var, attr) for attr in _MASKING_ATTRS))
+
+
 def load_variable_data(
-    var: nc.Variable, target_dims: DimensionCollection
+    var: nc.Variable,
+    target_dims: DimensionCollection,
+    io_mode: IoMode = IoMode.AUTO,
+    out: np.ndarray | None = None,
 ) -> np.ndarray:
+    """Read the target hyperslab of ``var`` in ``target_dims`` order.
+
+    If ``out`` is given the data is read into it. ``out`` is viewed in the
+    NetCDF dimension order so the hyperslab is copied directly without an
+    intermediate transposed array. For Fortran-ordered ESMF buffers that view
+    is C-contiguous.
+    """
+    set_io_mode(var, io_mode)
+    set_auto_mask(var)
+    slices, axes = _create_hyperslab_(var.dimensions, target_dims)
+    if out is None:
+        raw_data = var[*slices]
+        transposed_data = raw_data.transpose(axes)
+        return transposed_data
+    out.transpose(np.argsort(axes))[...] = var[*slices]
+    return out
+
+
+def _create_hyperslab_(
+    dimensions: Sequence[str], target_dims: DimensionCollection
+) -> Tuple[List[slice], List[int]]:
     slices = [
-        slice(target_dims.get(ii).lower, target_dims.get(ii).upper)
-        for ii in var.dimensions
+        slice(target_dims.get(ii).lower, target_dims.get(ii).upper) for ii in dimensions
     ]
-    raw_data = var[*slices]
-    dim_map = {dim: ii for ii, dim in enumerate(var.dimensions)}
+    dim_map = {dim: ii for ii, dim in enumerate(dimensions)}
     axes = [get_aliased_key(dim_map, ii.name) for ii in target_dims.value]
-    transposed_data = raw_data.transpose(axes)
-    return transposed_data
+    return slices, axes
+
+
+_MMAP_DATA_MODELS = ("NETCDF3_CLASSIC", "NETCDF3_64BIT_OFFSET")
+
+
+def is_mmap_readable(var: nc.Variable) -> bool:
+    """Whether ``var`` is stored as one contiguous block that can be mapped.
+
+    Only fixed-size variables in classic and 64-bit offset files qualify.
+    Packed variables are excluded. Masking attributes are ignored since the
+    mapped values are the raw stored values.
+    """
+    ds = var.group()
+    if ds.data_model not in _MMAP_DATA_MODELS:
+        return False
+    if any(ds.dimensions[ii].isunlimited() for ii in var.dimensions):
+        return False
+    return not any(hasattr(var, attr) for attr in ("scale_factor", "add_offset"))
+
+
+def load_mmap_variable_data(
+    path: Path,
+    varname: str,
+    target_dims: DimensionCollection,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Like ``load_variable_data`` but reads the hyperslab from a memory map.
+
+    Ranks on a node share the mapped pages instead of each reading the file
+    through the netCDF library.
+    """
+    with scipy.io.netcdf_file(path, "r", mmap=True) as ds:
+        var = ds.variables[varname]
+        slices, axes = _create_hyperslab_(var.dimensions, target_dims)
+        if out is None:
+            out = np.array(
+                var.data[*slices].transpose(axes),
+                dtype=var.data.dtype.newbyteorder("="),
+            )
+        else:
+            out.transpose(np.argsort(axes))[...] = var.data[*slices]
+        # The map can only be closed once nothing references it
+        del var
+    return out
 
 
 def set_variable_data(
-    var: nc.Variable, target_dims: DimensionCollection, target_data: np.ndarray
+    var: nc.Variable,
+    target_dims: DimensionCollection,
+    target_data: np.ndarray,
+    io_mode: IoMode = IoMode.AUTO,
 ) -> np.ndarray:
+    set_io_mode(var, io_mode)
+    set_auto_mask(var)
     dim_map = create_dimension_map(target_dims)
     axes = [get_aliased_key(dim_map, ii) for ii in var.dimensions]
     transposed_data = target_data.transpose(axes)
@@ -154,6 +390,164 @@ def set_variable_data(
     return transposed_data
 
 
+class AbstractCoordinateReader(abc.ABC):
+    """Source of dimension sizes and coordinate hyperslabs for grid creation."""
+
+    @abc.abstractmethod
+    def get_size(self, names: NameListType) -> int: ...
+
+    @abc.abstractmethod
+    def load(
+        self, varname: str, target_dims: DimensionCollection, out: np.ndarray
+    ) -> np.ndarray: ...
+
+
+class NcCoordinateReader(AbstractCoordinateReader):
+    """Every rank reads its own hyperslab from a parallel dataset."""
+
+    def __init__(self, ds: nc.Dataset) -> None:
+        self._ds = ds
+
+    def get_size(self, names: NameListType) -> int:
+        return get_nc_dimension(self._ds, names).size
+
+    def load(
+        self, varname: str, target_dims: DimensionCollection, out: np.ndarray
+    ) -> np.ndarray:
+        return load_variable_data(self._ds.variables[varname], target_dims, out=out)
+
+
+class MmapCoordinateReader(AbstractCoordinateReader):
+    """Every rank memory-maps its own hyperslab without a netCDF open.
+
+    Ranks on a node share the mapped pages. Use as a context manager.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._sizes: Dict[str, int] = {}
+
+    def __enter__(self) -> "MmapCoordinateReader":
+        with scipy.io.netcdf_file(self._path, "r", mmap=True) as ds:
+            self._sizes = dict(ds.dimensions)
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def get_size(self, names: NameListType) -> int:
+        return get_aliased_key(self._sizes, names)
+
+    def load(
+        self, varname: str, target_dims: DimensionCollection, out: np.ndarray
+    ) -> np.ndarray:
+        # Reading into ``out`` discards any mask like the netCDF readers.
+        _LOGGER.debug(f"memory mapping {varname}")
+        return load_mmap_variable_data(self._path, varname, target_dims, out)
+
+
+class NodeSharedCoordinateReader(AbstractCoordinateReader):
+    """One rank per node reads whole variables into MPI shared memory.
+
+    The other ranks on the node copy their hyperslabs from that memory, so
+    the file is opened once per node instead of once per rank. Use as a
+    context manager. Entering and exiting are collective.
+    """
+
+    def __init__(self, path: Path, varnames: Sequence[str]) -> None:
+        self._path = path
+        self._varnames = tuple(varnames)
+        self._sizes: Dict[str, int] = {}
+        self._variables: Dict[str, Tuple[Tuple[str, ...], np.ndarray]] = {}
+        self._windows: List[MPI.Win] = []
+
+    def __enter__(self) -> "NodeSharedCoordinateReader":
+        node = COMM.node
+        ds: nc.Dataset | None = None
+
+        def read_header() -> Tuple[Dict[str, int], Dict[str, Tuple[Any, str]]]:
+            nonlocal ds
+            _LOGGER.debug(f"reading {self._varnames} from {self._path} for node")
+            ds = _create_dataset_(self._path, "r", False, False)
+            return (
+                {k: len(v) for k, v in ds.dimensions.items()},
+                {
+                    ii: (ds.variables[ii].dimensions, ds.variables[ii].dtype.str)
+                    for ii in self._varnames
+                },
+            )
+
+        def read_variables() -> None:
+            assert ds is not None
+            for varname, (_, data) in self._variables.items():
+                var = ds.variables[varname]
+                var.set_auto_mask(False)
+                data[...] = var[:]
+
+        # Reads happen on node rank 0 only. Their errors are raised on every
+        # rank of the node so none is left waiting in a collective call.
+        try:
+            self._sizes, variables = node.bcast_call(read_header)
+            for varname, (dimensions, dtype) in variables.items():
+                shape = [self._sizes[ii] for ii in dimensions]
+                win, data = node.allocate_shared(shape, np.dtype(dtype))
+                self._windows.append(win)
+                self._variables[varname] = (dimensions, data)
+            node.bcast_call(read_variables)
+        except Exception:
+            self._free_()
+            raise
+        finally:
+            if ds is not None:
+                ds.close()
+        node.barrier()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        COMM.node.barrier()
+        self._free_()
+
+    def _free_(self) -> None:
+        for win in self._windows:
+            win.Free()
+        self._windows = []
+        self._variables = {}
+
+    def get_size(self, names: NameListType) -> int:
+        return get_aliased_key(self._sizes, names)
+
+    def load(
+        self, varname: str, target_dims: DimensionCollection, out: np.ndarray
+    ) -> np.ndarray:
+        dimensions, data = self._variables[varname]
+        slices, axes = _create_hyperslab_(dimensions, target_dims)
+        out.transpose(np.argsort(axes))[...] = data[*slices]
+        return out
+
+
+@contextmanager
+def open_coordinate_reader(
+    path: Path, varnames: Sequence[str]
+) -> Iterator[AbstractCoordinateReader]:
+    if ENV.NODE_SHARED_COORDS:
+        with NodeSharedCoordinateReader(path, varnames) as reader:
+            yield reader
+    elif ENV.MMAP_COORDS and COMM.bcast_call(
+        lambda: _is_mmap_readable_file_(path, varnames)
+    ):
+        # Decided on rank 0 so the collective parallel open is skipped entirely.
+        with MmapCoordinateReader(path) as reader:
+            yield reader
+    else:
+        with open_nc(path, "r") as ds:
+            yield NcCoordinateReader(ds)
+
+
+def _is_mmap_readable_file_(path: Path, varnames: Sequence[str]) -> bool:
+    with _create_dataset_(path, "r", False, False) as ds:
+        return all(is_mmap_readable(ds.variables[ii]) for ii in varnames)
+
+
 class AbstractWrapper(abc.ABC, BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     dims: DimensionCollection
@@ -172,6 +566,10 @@ class GridSpec(BaseModel):
     y_corner_dim: NameListType | None = None
     x_index: int = 0
     y_index: int = 1
+    # Grid dimension placed first in the esmpy.Grid. ESMF's default
+    # decomposition splits the first dimension into one stripe per rank. If
+    # None, the first dimension is the one with index 0.
+    decomp_dim: Literal["x", "y"] | None = None
 
     @model_validator(mode="after")
     def _validate_model_(self) -> "GridSpec":
@@ -202,6 +600,19 @@ class GridSpec(BaseModel):
             raise ValueError
         return self.y_corner
 
+    @property
+    def grid_dim_order(self) -> Tuple[Literal["x", "y"], Literal["x", "y"]]:
+        if self.decomp_dim == "x":
+            return "x", "y"
+        elif self.decomp_dim == "y":
+            return "y", "x"
+        elif self.x_index == 0:
+            return "x", "y"
+        elif self.x_index == 1:
+            return "y", "x"
+        else:
+            raise NotImplementedError(self.x_index, self.y_index)
+
     def get_x_data(self, grid: esmpy.Grid, staggerloc: esmpy.StaggerLoc) -> np.ndarray:
         return grid.get_coords(self.x_index, staggerloc=staggerloc)
 
@@ -209,7 +620,10 @@ class GridSpec(BaseModel):
         return grid.get_coords(self.y_index, staggerloc=staggerloc)
 
     def create_grid_dims(
-        self, ds: nc.Dataset, grid: esmpy.Grid, staggerloc: esmpy.StaggerLoc
+        self,
+        reader: "AbstractCoordinateReader",
+        grid: esmpy.Grid,
+        staggerloc: esmpy.StaggerLoc,
     ) -> DimensionCollection:
         if staggerloc == esmpy.StaggerLoc.CENTER:
             x_dim, y_dim = self.x_dim, self.y_dim
@@ -217,36 +631,72 @@ class GridSpec(BaseModel):
             x_dim, y_dim = self.x_corner_dim, self.y_corner_dim
         else:
             raise NotImplementedError(staggerloc)
+        order = self.grid_dim_order
+        x_grid_index = order.index("x")
+        y_grid_index = order.index("y")
         x_dimobj = Dimension(
             name=x_dim,
-            size=get_nc_dimension(ds, x_dim).size,
-            lower=grid.lower_bounds[staggerloc][self.x_index],
-            upper=grid.upper_bounds[staggerloc][self.x_index],
+            size=reader.get_size(x_dim),
+            lower=grid.lower_bounds[staggerloc][x_grid_index],
+            upper=grid.upper_bounds[staggerloc][x_grid_index],
             staggerloc=staggerloc,
             coordinate_type="x",
         )
         y_dimobj = Dimension(
             name=y_dim,
-            size=get_nc_dimension(ds, y_dim).size,
-            lower=grid.lower_bounds[staggerloc][self.y_index],
-            upper=grid.upper_bounds[staggerloc][self.y_index],
+            size=reader.get_size(y_dim),
+            lower=grid.lower_bounds[staggerloc][y_grid_index],
+            upper=grid.upper_bounds[staggerloc][y_grid_index],
             staggerloc=staggerloc,
             coordinate_type="y",
         )
-        if self.x_index == 0:
+        if order == ("x", "y"):
             value = [x_dimobj, y_dimobj]
-        elif self.x_index == 1:
-            value = [y_dimobj, x_dimobj]
         else:
-            raise NotImplementedError(self.x_index, self.y_index)
+            value = [y_dimobj, x_dimobj]
         return DimensionCollection(value=value)
 
 
 class GridWrapper(AbstractWrapper):
     value: esmpy.Grid
     spec: GridSpec
+    path: Path | None = None
     corner_dims: DimensionCollection | None = None
+    has_mask: bool = False
+
+    @PROFILER.phase(Phase.GRID_CREATE)
+    def load_corner_coords(self) -> DimensionCollection:
+        """Load corner coordinates from ``path`` if they are not loaded yet.
 
+        Corners are only needed by conservative regridding, so they are not
+        read when the grid is created.
+        """
+        if self.corner_dims is not None:
+            return self.corner_dims
+        if not self.spec.has_corners or self.path is None:
+            raise ValueError("grid has no corner coordinates to load")
+        staggerloc = esmpy.StaggerLoc.CORNER
+        varnames = [self.spec.get_x_corner(), self.spec.get_y_corner()]
+        with open_coordinate_reader(self.path, varnames) as reader:
+            self.value.add_coords(staggerloc)
+            dims = self.spec.create_grid_dims(reader, self.value, staggerloc)
+            reader.load(
+                varnames[0], dims, out=self.spec.get_x_data(self.value, staggerloc)
+            )
+            reader.load(
+                varnames[1], dims, out=self.spec.get_y_data(self.value, staggerloc)
+            )
+        self.corner_dims = dims
+        return dims
+
+    def add_mask(self) -> np.ndarray:
+        staggerloc = esmpy.StaggerLoc.CENTER
+        if not self.has_mask:
+            self.value.add_item(esmpy.GridItem.MASK, staggerloc=staggerloc)
+            self.has_mask = True
+        return self.value.get_item(esmpy.GridItem.MASK, staggerloc=staggerloc)
+
+    @PROFILER.phase(Phase.NC_WRITE)
     def fill_nc_variables(self, path: Path):
         if self.corner_dims is not None:
             raise NotImplementedError
@@ -262,76 +712,257 @@ class GridWrapper(AbstractWrapper):
             )
 
 
+def estimate_stripe_imbalance(cost: np.ndarray, nstripes: int) -> float:
+    """Ratio of the most expensive stripe to the mean stripe cost.
+
+    Stripes follow ESMF's balanced block decomposition: contiguous index
+    ranges whose sizes differ by at most one.
+    """
+    total = float(cost.sum())
+    if total <= 0:
+        return 1.0
+    nstripes = min(nstripes, cost.size)
+    bounds = np.cumsum([0] + [len(ii) for ii in np.array_split(cost, nstripes)])
+    sums = np.add.reduceat(cost, bounds[:-1])
+    return float(sums.max()) / (total / nstripes)
+
+
+def choose_decomp_dim(
+    x_cost: np.ndarray, y_cost: np.ndarray, nstripes: int
+) -> Literal["x", "y"]:
+    x_imbalance = estimate_stripe_imbalance(x_cost, nstripes)
+    y_imbalance = estimate_stripe_imbalance(y_cost, nstripes)
+    return "y" if y_imbalance < x_imbalance else "x"
+
+
 class NcToGrid(BaseModel):
     path: Path
     spec: GridSpec
+    # Variable whose valid (unmasked and finite) points approximate per-point
+    # work. When set and the spec has no decomposition, the grid dimension
+    # giving the most even per-rank cost is placed first.
+    cost_variable: str | None = None
 
+    @PROFILER.phase(Phase.GRID_CREATE)
     def create_grid_wrapper(self) -> GridWrapper:
-        with open_nc(self.path, "r") as ds:
-            grid_shape = self._create_grid_shape_(ds)
+        if self.cost_variable is not None and self.spec.decomp_dim is None:
+            decomp_dim = COMM.bcast_call(self._choose_decomp_dim_)
+            _LOGGER.info(f"decomposing {self.path} along {decomp_dim}")
+            self.spec = self.spec.model_copy(update={"decomp_dim": decomp_dim})
+        varnames = [self.spec.x_center, self.spec.y_center]
+        with open_coordinate_reader(self.path, varnames) as reader:
+            grid_shape = self._create_grid_shape_(reader)
             staggerloc = esmpy.StaggerLoc.CENTER
             grid = esmpy.Grid(
                 grid_shape,
                 staggerloc=staggerloc,
                 coord_sys=esmpy.CoordSys.SPH_DEG,
             )
-            dims = self.spec.create_grid_dims(ds, grid, staggerloc)
-            grid_x_center_coords = self.spec.get_x_data(grid, staggerloc)
-            grid_x_center_coords[:] = load_variable_data(
-                ds.variables[self.spec.x_center], dims
+            dims = self.spec.create_grid_dims(reader, grid, staggerloc)
+            reader.load(
+                self.spec.x_center, dims, out=self.spec.get_x_data(grid, staggerloc)
             )
-            grid_y_center_coords = self.spec.get_y_data(grid, staggerloc)
-            grid_y_center_coords[:] = load_variable_data(
-                ds.variables[self.spec.y_center], dims
+            reader.load(
+                self.spec.y_center, dims, out=self.spec.get_y_data(grid, staggerloc)
             )
 
-            if self.spec.has_corners:
-                corner_dims = self._add_corner_coords_(ds, grid)
-            else:
-                corner_dims = None
+            gwrap = GridWrapper(value=grid, dims=dims, spec=self.spec, path=self.path)
+            return gwrap
 
-            gwrap = GridWrapper(
-                value=grid, dims=dims, spec=self.spec, corner_dims=corner_dims
+    def _create_grid_shape_(self, reader: AbstractCoordinateReader) -> np.ndarray:
+        sizes = {
+            "x": reader.get_size(self.spec.x_dim),
+            "y": reader.get_size(self.spec.y_dim),
+        }
+        return np.array([sizes[ii] for ii in self.spec.grid_dim_order])
+
+    def _choose_decomp_dim_(self) -> Literal["x", "y"]:
+        # Only the first index of non-grid dimensions (e.g. time) is read.
+        grid_dims = {"x": self.spec.x_dim, "y": self.spec.y_dim}
+        with _create_dataset_(self.path, "r", False, False) as ds:
+            var = ds.variables[self.cost_variable]
+            index = tuple(
+                slice(None) if ii in grid_dims["x"] + grid_dims["y"] else 0
+                for ii in var.dimensions
             )
-            return gwrap
+            data = np.ma.masked_invalid(var[index])
+            dimensions = [ii for ii, jj in zip(var.dimensions, index) if jj != 0]
+        valid = (~np.ma.getmaskarray(data)).astype(np.int64)
+        costs = {}
+        for axis, dimname in enumerate(dimensions):
+            key = "x" if dimname in grid_dims["x"] else "y"
+            other = tuple(ii for ii in range(valid.ndim) if ii != axis)
+            costs[key] = valid.sum(axis=other)
+        return choose_decomp_dim(costs["x"], costs["y"], COMM.size)
 
-    def _create_grid_shape_(self, ds: nc.Dataset) -> np.ndarray:
-        x_size = get_nc_dimension(ds, self.spec.x_dim).size
-        y_size = get_nc_dimension(ds, self.spec.y_dim).size
-        if self.spec.x_index == 0:
-            grid_shape = (x_size, y_size)
-        elif self.spec.x_index == 1:
-            grid_shape = (y_size, x_size)
-        else:
-            raise NotImplementedError(self.spec.x_index, self.spec.y_index)
-        return np.array(grid_shape)
 
-    def _add_corner_coords_(
-        self, ds: nc.Dataset, grid: esmpy.Grid
-    ) -> DimensionCollection:
-        staggerloc = esmpy.StaggerLoc.CORNER
-        grid.add_coords(staggerloc)
-        dims = self.spec.create_grid_dims(ds, grid, staggerloc)
-        grid_x_corner_coords = self.spec.get_x_data(grid, staggerloc)
-        grid_x_corner_coords[:] = load_variable_data(
-            ds.variables[self.spec.x_corner], dims
-        )
-        grid_y_corner_coords = self.spec.get_y_data(grid, staggerloc)
-        grid_y_corner_coords[:] = load_variable_data(
-            ds.variables[self.spec.y_corner], dims
-        )
-        return dims
+def iter_time_windows(size: int, chunk_size: int | None) -> Iterator[Tuple[int, int]]:
+    """Consecutive ``[start, stop)`` windows of at most ``chunk_size`` time steps."""
+    step = size if chunk_size is None else chunk_size
+    for start in range(0, size, max(step, 1)):
+        yield start, min(start + step, size)
 
 
 class FieldWrapper(AbstractWrapper):
     value: esmpy.Field
     gwrap: GridWrapper
+    io_mode: IoMode = IoMode.AUTO
+
+    def set_time_window(self, start: int, stop: int) -> None:
+        """Select the time steps ``[start, stop)`` for the next load or write.
+
+        The window may be shorter than the field's time bounds, e.g. for the last
+        chunk. Only the leading part of the data is then read and written.
+        """
+        axis, time_dim = self._get_time_axis_()
+        if not 0 <= start < stop <= time_dim.size:
+            raise ValueError(f"invalid time window: {start=}, {stop=}")
+        if stop - start > self.value.data.shape[axis]:
+            raise ValueError(f"time window is larger than the field: {start=}, {stop=}")
+        time_dim.lower = start
+        time_dim.upper = stop
+
+    def clone(self) -> Self:
+        """Copy the field into a new buffer on the same grid.
+
+        The copy has its own dimensions so its time window can be set
+        independently.
+        """
+        ndbounds = self.value.data.shape[len(self.gwrap.dims.value) :]
+        field = esmpy.Field(
+            self.gwrap.value,
+            name=self.value.name,
+            ndbounds=list(ndbounds) or None,
+            staggerloc=self.value.staggerloc,
+        )
+        field.data[...] = self.value.data
+        return self.model_copy(
+            update={"value": field, "dims": self.dims.model_copy(deep=True)}
+        )
+
+    @PROFILER.phase(Phase.FIELD_LOAD)
+    def load_nc_variable(self, path: Path) -> None:
+        with open_nc(path, "r") as ds:
+            load_variable_data(
+                ds.variables[self.value.name],
+                self.dims,
+                io_mode=self.io_mode,
+                out=self._get_window_data_(self.value.data),
+            )
 
+    @PROFILER.phase(Phase.NC_WRITE)
     def fill_nc_variable(self, path: Path):
         _LOGGER.debug(r"filling variable: {self.value.name}")
         with open_nc(path, "a") as ds:
             var = ds.variables[self.value.name]
-            set_variable_data(var, self.dims, self.value.data)
+            set_variable_data(
+                var,
+                self.dims,
+                self._get_window_data_(self.value.data),
+                io_mode=self.io_mode,
+            )
+
+    def _get_time_axis_(self) -> Tuple[int, Dimension]:
+        for axis, dim in enumerate(self.dims.value):
+            if dim.coordinate_type == "time":
+                return axis, dim
+        raise ValueError("field has no time dimension")
+
+    def _get_window_data_(self, data: np.ndarray) -> np.ndarray:
+        # View of the data restricted to the current time window. Trailing batch
+        # axes do not change the position of the time axis.
+        try:
+            axis, time_dim = self._get_time_axis_()
+        except ValueError:
+            return data
+        index = [slice(None)] * data.ndim
+        index[axis] = slice(0, time_dim.upper - time_dim.lower)
+        return data[tuple(index)]
+
+
+class FieldBatchWrapper(FieldWrapper):
+    """Fields stacked along a trailing ungridded dimension of a single ESMF field.
+
+    ``dims`` describes each member field. The batch dimension is always last.
+    """
+
+    names: Tuple[str, ...]
+
+    def get_data(self, name: str) -> np.ndarray:
+        return self.value.data[..., self.names.index(name)]
+
+    def select(self, names: Sequence[str]) -> "FieldBatchWrapper":
+        ndbounds = list(self.value.data.shape[len(self.gwrap.dims.value) :])
+        ndbounds[-1] = len(names)
+        field = esmpy.Field(
+            self.gwrap.value,
+            name=self.value.name,
+            ndbounds=ndbounds,
+            staggerloc=self.value.staggerloc,
+        )
+        for idx, name in enumerate(names):
+            field.data[..., idx] = self.get_data(name)
+        return FieldBatchWrapper(
+            value=field,
+            dims=self.dims,
+            gwrap=self.gwrap,
+            names=tuple(names),
+            io_mode=self.io_mode,
+        )
+
+    def update(
+        self, other: "FieldBatchWrapper", names: Sequence[str] | None = None
+    ) -> None:
+        for name in other.names if names is None else names:
+            self.get_data(name)[:] = other.get_data(name)
+
+    @PROFILER.phase(Phase.FIELD_LOAD)
+    def load_nc_variable(self, path: Path) -> None:
+        with open_nc(path, "r") as ds:
+            for name in self.names:
+                load_variable_data(
+                    ds.variables[name],
+                    self.dims,
+                    io_mode=self.io_mode,
+                    out=self._get_window_data_(self.get_data(name)),
+                )
+
+    @PROFILER.phase(Phase.NC_WRITE)
+    def fill_nc_variable(self, path: Path) -> None:
+        with open_nc(path, "a") as ds:
+            for name in self.names:
+                _LOGGER.debug(f"filling variable: {name}")
+                set_variable_data(
+                    ds.variables[name],
+                    self.dims,
+                    self._get_window_data_(self.get_data(name)),
+                    io_mode=self.io_mode,
+                )
+
+
+def _create_field_dims_(
+    ds: nc.Dataset,
+    gwrap: GridWrapper,
+    dim_time: NameListType | None,
+    staggerloc: int,
+    time_chunk_size: int | None = None,
+) -> Tuple[DimensionCollection, Tuple[int, ...] | None]:
+    if dim_time is None:
+        return gwrap.dims, None
+    size = len(get_nc_dimension(ds, dim_time))
+    # The field holds the first chunk of time steps. Later chunks are loaded
+    # into the same buffer with set_time_window and load_nc_variable.
+    ndbounds = (size if time_chunk_size is None else min(time_chunk_size, size),)
+    time_dim = Dimension(
+        name=dim_time,
+        size=size,
+        lower=0,
+        upper=ndbounds[0],
+        staggerloc=staggerloc,
+        coordinate_type="time",
+    )
+    target_dims = DimensionCollection(value=list(gwrap.dims.value) + [time_dim])
+    return target_dims, ndbounds
 
 
 class NcToField(BaseModel):
@@ -340,39 +971,76 @@ class NcToField(BaseModel):
     gwrap: GridWrapper
     dim_time: NameListType | None = None
     staggerloc: int = esmpy.StaggerLoc.CENTER
+    io_mode: IoMode = IoMode.AUTO
+    # Time steps held by the field. If None, all time steps are loaded.
+    time_chunk_size: int | None = None
 
+    @PROFILER.phase(Phase.FIELD_LOAD)
     def create_field_wrapper(self) -> FieldWrapper:
         with open_nc(self.path, "r") as ds:
-            if self.dim_time is None:
-                ndbounds = None
-                target_dims = self.gwrap.dims
-            else:
-                ndbounds = (len(get_nc_dimension(ds, self.dim_time)),)
-                time_dim = Dimension(
-                    name=self.dim_time,
-                    size=ndbounds[0],
-                    lower=0,
-                    upper=ndbounds[0],
-                    staggerloc=self.staggerloc,
-                    coordinate_type="time",
-                )
-                target_dims = DimensionCollection(
-                    value=list(self.gwrap.dims.value) + [time_dim]
-                )
+            target_dims, ndbounds = _create_field_dims_(
+                ds, self.gwrap, self.dim_time, self.staggerloc, self.time_chunk_size
+            )
             field = esmpy.Field(
                 self.gwrap.value,
                 name=self.name,
                 ndbounds=ndbounds,
                 staggerloc=self.staggerloc,
             )
-            field.data[:] = load_variable_data(ds.variables[self.name], target_dims)
-            fwrap = FieldWrapper(value=field, dims=target_dims, gwrap=self.gwrap)
+            load_variable_data(
+                ds.variables[self.name],
+                target_dims,
+                io_mode=self.io_mode,
+                out=field.data,
+            )
+            fwrap = FieldWrapper(
+                value=field, dims=target_dims, gwrap=self.gwrap, io_mode=self.io_mode
+            )
             return fwrap
 
 
+class NcToFieldBatch(BaseModel):
+    path: Path
+    names: Tuple[str, ...]
+    gwrap: GridWrapper
+    dim_time: NameListType | None = None
+    staggerloc: int = esmpy.StaggerLoc.CENTER
+    io_mode: IoMode = IoMode.AUTO
+    # Time steps held by the field. If None, all time steps are loaded.
+    time_chunk_size: int | None = None
+
+    @PROFILER.phase(Phase.FIELD_LOAD)
+    def create_field_wrapper(self) -> FieldBatchWrapper:
+        with open_nc(self.path, "r") as ds:
+            target_dims, ndbounds = _create_field_dims_(
+                ds, self.gwrap, self.dim_time, self.staggerloc, self.time_chunk_size
+            )
+            field = esmpy.Field(
+                self.gwrap.value,
+                name="-".join(self.names),
+                ndbounds=list(ndbounds or []) + [len(self.names)],
+                staggerloc=self.staggerloc,
+            )
+            for idx, name in enumerate(self.names):
+                load_variable_data(
+                    ds.variables[name],
+                    target_dims,
+                    io_mode=self.io_mode,
+                    out=field.data[..., idx],
+                )
+            return FieldBatchWrapper(
+                value=field,
+                dims=target_dims,
+                gwrap=self.gwrap,
+                names=self.names,
+                io_mode=self.io_mode,
+            )
+
+
 class FieldWrapperCollection(BaseModel):
     value: Tuple[FieldWrapper, ...]
 
+    @PROFILER.phase(Phase.NC_WRITE)
     def fill_nc_variables(self, path: Path) -> None:
         for fwrap in self.value:
             fwrap.fill_nc_variable(path)
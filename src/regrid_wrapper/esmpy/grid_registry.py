@@ -0,0 +1,195 @@
+import math
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, overload
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.env import ENV
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.esmpy.field_wrapper import (
+    FieldBatchWrapper,
+    FieldWrapper,
+    GridSpec,
+    GridWrapper,
+    NameListType,
+    NcToField,
+    NcToFieldBatch,
+    NcToGrid,
+)
+
+_LOGGER = LOGGER.getChild(__name__)
+
+GridKeyType = Tuple[Path, GridSpec, str | None]
+FieldKeyType = Tuple[Path, Tuple[str, ...], NameListType | None, int, bool]
+
+
+def estimate_grid_nbytes(gwrap: GridWrapper) -> int:
+    """Estimate the per-rank memory held by a grid's coordinates and mask.
+
+    The estimate uses global sizes so it is identical on every rank.
+    """
+    npoints = math.prod(ii.size for ii in gwrap.dims.value)
+    nbytes = 2 * 8 * npoints
+    if gwrap.has_mask:
+        nbytes += 4 * npoints
+    if gwrap.corner_dims is not None:
+        nbytes += 2 * 8 * math.prod(ii.size for ii in gwrap.corner_dims.value)
+    return math.ceil(nbytes / COMM.size)
+
+
+def estimate_field_nbytes(fwrap: FieldWrapper) -> int:
+    """Estimate the per-rank memory held by a field's data from global sizes."""
+    npoints = math.prod(ii.size for ii in fwrap.dims.value)
+    if isinstance(fwrap, FieldBatchWrapper):
+        npoints *= len(fwrap.names)
+    return math.ceil(fwrap.value.data.itemsize * npoints / COMM.size)
+
+
+class GridRegistry:
+    """Keeps built grids alive across operations, keyed by path and grid spec.
+
+    Fields loaded from files on a registered grid are kept with it, so source
+    data read once can be regridded to several destinations.
+
+    The least recently used grids and their fields are destroyed once more
+    than ``max_size`` grids are held or their estimated size exceeds
+    ``max_bytes``. The most recently used grid is never evicted. Callers may add
+    a mask or corners to a shared grid but must not change its coordinates or
+    the data of shared fields.
+    """
+
+    def __init__(self, max_size: int, max_bytes: int) -> None:
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._grids: OrderedDict[GridKeyType, GridWrapper] = OrderedDict()
+        self._fields: Dict[GridKeyType, Dict[FieldKeyType, FieldWrapper]] = {}
+
+    def __len__(self) -> int:
+        return len(self._grids)
+
+    @staticmethod
+    def create_key(nc2grid: NcToGrid) -> GridKeyType:
+        return Path(nc2grid.path).resolve(), nc2grid.spec, nc2grid.cost_variable
+
+    def get(self, nc2grid: NcToGrid) -> GridWrapper:
+        key = self.create_key(nc2grid)
+        if key in self._grids:
+            _LOGGER.debug(f"reusing grid: {nc2grid.path}")
+            self._grids.move_to_end(key)
+            return self._grids[key]
+        gwrap = nc2grid.create_grid_wrapper()
+        self._grids[key] = gwrap
+        self._fields[key] = {}
+        self._evict_()
+        return gwrap
+
+    @overload
+    def get_field(self, nc2field: NcToFieldBatch) -> FieldBatchWrapper: ...
+
+    @overload
+    def get_field(self, nc2field: NcToField) -> FieldWrapper: ...
+
+    def get_field(self, nc2field: NcToField | NcToFieldBatch) -> FieldWrapper:
+        """Load a field, or reuse it if it was loaded on the same registered grid.
+
+        Fields on grids not created by this registry are never shared.
+        """
+        grid_key = self._find_grid_key_(nc2field.gwrap)
+        if grid_key is None:
+            return nc2field.create_field_wrapper()
+        # Batches are only ever stored under keys marked as batches.
+        if isinstance(nc2field, NcToFieldBatch):
+            names, is_batch = tuple(nc2field.names), True
+        else:
+            names, is_batch = (nc2field.name,), False
+        key = (
+            Path(nc2field.path).resolve(),
+            names,
+            nc2field.dim_time,
+            nc2field.staggerloc,
+            is_batch,
+        )
+        self._grids.move_to_end(grid_key)
+        fields = self._fields[grid_key]
+        if key in fields:
+            _LOGGER.debug(f"reusing fields {key[1]}: {nc2field.path}")
+            return fields[key]
+        fwrap = nc2field.create_field_wrapper()
+        fields[key] = fwrap
+        self._evict_()
+        return fwrap
+
+    def get_nbytes(self) -> int:
+        ret = sum(estimate_grid_nbytes(ii) for ii in self._grids.values())
+        for fields in self._fields.values():
+            ret += sum(estimate_field_nbytes(ii) for ii in fields.values())
+        return ret
+
+    def clear(self) -> None:
+        while self._grids:
+            self._destroy_oldest_()
+
+    def _find_grid_key_(self, gwrap: GridWrapper) -> GridKeyType | None:
+        for key, value in self._grids.items():
+            if value is gwrap:
+                return key
+        return None
+
+    def _evict_(self) -> None:
+        while len(self._grids) > 1 and (
+            len(self._grids) > self._max_size or self.get_nbytes() > self._max_bytes
+        ):
+            self._destroy_oldest_()
+
+    def _destroy_oldest_(self) -> None:
+        key, gwrap = self._grids.popitem(last=False)
+        _LOGGER.debug(f"destroying grid: {key[0]}")
+        for fwrap in self._fields.pop(key).values():
+            fwrap.value.destroy()
+        gwrap.value.destroy()
+
+
+_GRID_REGISTRY: GridRegistry | None = None
+
+
+@contextmanager
+def grid_registry_session() -> Iterator[GridRegistry]:
+    """Share grids and fields created through this module for the session.
+
+    Nested sessions share the outermost registry. Collective.
+    """
+    global _GRID_REGISTRY
+    if _GRID_REGISTRY is not None:
+        yield _GRID_REGISTRY
+        return
+    _GRID_REGISTRY = GridRegistry(
+        ENV.GRID_REGISTRY_MAX_SIZE, ENV.GRID_REGISTRY_MAX_BYTES
+    )
+    try:
+        yield _GRID_REGISTRY
+    finally:
+        registry, _GRID_REGISTRY = _GRID_REGISTRY, None
+        registry.clear()
+
+
+def create_grid_wrapper(nc2grid: NcToGrid) -> GridWrapper:
+    """Create a grid, or reuse a shared one inside a registry session."""
+    if _GRID_REGISTRY is None:
+        return nc2grid.create_grid_wrapper()
+    return _GRID_REGISTRY.get(nc2grid)
+
+
+@overload
+def create_field_wrapper(nc2field: NcToFieldBatch) -> FieldBatchWrapper: ...
+
+
+@overload
+def create_field_wrapper(nc2field: NcToField) -> FieldWrapper: ...
+
+
+def create_field_wrapper(nc2field: NcToField | NcToFieldBatch) -> FieldWrapper:
+    """Load a field, or reuse a shared one inside a registry session."""
+    if _GRID_REGISTRY is None:
+        return nc2field.create_field_wrapper()
+    return _GRID_REGISTRY.get_field(nc2field)
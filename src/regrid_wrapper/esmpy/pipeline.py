@@ -0,0 +1,107 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Generic, Iterator, List, Tuple, TypeVar
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.profile import PROFILER
+from regrid_wrapper.esmpy.field_wrapper import FieldWrapper, iter_time_windows
+
+_LOGGER = LOGGER.getChild(__name__)
+
+FieldT = TypeVar("FieldT", bound=FieldWrapper)
+
+
+class TimeWindowPipeline(Generic[FieldT]):
+    """Loads, yields and writes consecutive time windows of a source/destination pair.
+
+    The caller regrids each yielded window from the source into the destination
+    field. The destination is written once the caller asks for the next window.
+
+    If ``enabled``, a second source and destination buffer are allocated and a
+    single background thread reads the next window and writes the previous one
+    while the current window is regridded. This requires MPI to allow calls from
+    several threads since the regridding communicates concurrently. Otherwise,
+    and when there is only one window, windows are processed in order on the
+    calling thread.
+
+    netCDF is not thread safe. While iterating a pipelined instance the caller
+    must only apply existing regridders and must not open files, create
+    regridders or use the weight cache.
+    """
+
+    def __init__(
+        self,
+        src_fwrap: FieldT,
+        src_path: Path,
+        dst_fwrap: FieldT,
+        dst_path: Path,
+        ntime: int,
+        time_chunk_size: int | None,
+        enabled: bool = False,
+    ) -> None:
+        self._src_fwrap = src_fwrap
+        self._src_path = src_path
+        self._dst_fwrap = dst_fwrap
+        self._dst_path = dst_path
+        self._windows = list(iter_time_windows(ntime, time_chunk_size))
+        self._enabled = enabled and len(self._windows) > 1
+        if self._enabled and not COMM.is_thread_multiple:
+            _LOGGER.warning("MPI is not thread safe. Not pipelining I/O.")
+            self._enabled = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def __iter__(self) -> Iterator[Tuple[int, int, FieldT, FieldT]]:
+        if self._enabled:
+            return self._iter_pipelined_()
+        return self._iter_serial_()
+
+    def _iter_serial_(self) -> Iterator[Tuple[int, int, FieldT, FieldT]]:
+        for start, stop in self._windows:
+            if start > 0:
+                self._load_(self._src_fwrap, start, stop)
+                self._dst_fwrap.set_time_window(start, stop)
+            yield start, stop, self._src_fwrap, self._dst_fwrap
+            self._dst_fwrap.fill_nc_variable(self._dst_path)
+
+    def _iter_pipelined_(self) -> Iterator[Tuple[int, int, FieldT, FieldT]]:
+        # Destination clones carry fill values set by the caller before iterating.
+        srcs = [self._src_fwrap, self._src_fwrap.clone()]
+        dsts = [self._dst_fwrap, self._dst_fwrap.clone()]
+        writes: List[Future | None] = [None, None]
+        try:
+            with PROFILER.concurrent(), ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="regrid-io"
+            ) as executor:
+                read: Future | None = None
+                for idx, (start, stop) in enumerate(self._windows):
+                    slot = idx % 2
+                    if read is not None:
+                        read.result()
+                    if idx + 1 < len(self._windows):
+                        read = executor.submit(
+                            self._load_, srcs[1 - slot], *self._windows[idx + 1]
+                        )
+                    # The buffer is free once the window written from it two
+                    # iterations ago is flushed.
+                    write = writes[slot]
+                    if write is not None:
+                        write.result()
+                    dsts[slot].set_time_window(start, stop)
+                    yield start, stop, srcs[slot], dsts[slot]
+                    writes[slot] = executor.submit(
+                        dsts[slot].fill_nc_variable, self._dst_path
+                    )
+                for write in writes:
+                    if write is not None:
+                        write.result()
+        finally:
+            srcs[1].value.destroy()
+            dsts[1].value.destroy()
+
+    def _load_(self, fwrap: FieldT, start: int, stop: int) -> None:
+        fwrap.set_time_window(start, stop)
+        fwrap.load_nc_variable(self._src_path)
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Sequence, List
+
+import esmpy
+import numpy as np
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.profile import PROFILER, Phase
+from regrid_wrapper.esmpy.field_wrapper import FieldWrapper, GridWrapper
+
+_LOGGER = LOGGER.getChild(__name__)
+
+# Bump when the fingerprint recipe changes so stale cache entries are never hit.
+_CACHE_VERSION = 1
+
+
+def _mix_(value: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer
+    value = value ^ (value >> np.uint64(30))
+    value = value * np.uint64(0xBF58476D1CE4E5B9)
+    value = value ^ (value >> np.uint64(27))
+    value = value * np.uint64(0x94D049BB133111EB)
+    return value ^ (value >> np.uint64(31))
+
+
+def fingerprint_array(data: np.ndarray, lower_bounds: Sequence[int]) -> int:
+    """Checksum of a distributed array that is independent of the decomposition.
+
+    Every element is mixed with its global index and the results are summed
+    modulo 2**64, so per-rank sums may be combined in any order.
+    """
+    bits = np.asarray(data, dtype=np.float64).view(np.uint64)
+    index = np.zeros(bits.shape, dtype=np.uint64)
+    for axis, lower in enumerate(lower_bounds):
+        shape = [1] * bits.ndim
+        shape[axis] = bits.shape[axis]
+        coord = np.arange(lower, lower + bits.shape[axis], dtype=np.uint64)
+        index = _mix_(index ^ coord.reshape(shape))
+    local = int(_mix_(bits ^ index).sum(dtype=np.uint64))
+    return sum(COMM.allgather(local)) % 2**64
+
+
+def fingerprint_grid(gwrap: GridWrapper) -> List[int | str]:
+    grid = gwrap.value
+    ret: List[int | str] = [
+        str(gwrap.spec.x_index),
+        "".join(ii.coordinate_type for ii in gwrap.dims.value),
+        ",".join(str(ii.size) for ii in gwrap.dims.value),
+    ]
+    staggerlocs = [esmpy.StaggerLoc.CENTER]
+    if gwrap.corner_dims is not None:
+        staggerlocs.append(esmpy.StaggerLoc.CORNER)
+    for staggerloc in staggerlocs:
+        lower_bounds = grid.lower_bounds[staggerloc]
+        for data in [
+            gwrap.spec.get_x_data(grid, staggerloc),
+            gwrap.spec.get_y_data(grid, staggerloc),
+        ]:
+            ret.append(fingerprint_array(data, lower_bounds))
+    if gwrap.has_mask:
+        staggerloc = esmpy.StaggerLoc.CENTER
+        mask = grid.get_item(esmpy.GridItem.MASK, staggerloc=staggerloc)
+        ret.append(fingerprint_array(mask, grid.lower_bounds[staggerloc]))
+    return ret
+
+
+def requires_corners(regrid_method: int) -> bool:
+    return regrid_method in (
+        esmpy.RegridMethod.CONSERVE,
+        esmpy.RegridMethod.CONSERVE_2ND,
+    )
+
+
+def create_weight_key(
+    src_gwrap: GridWrapper,
+    dst_gwrap: GridWrapper,
+    regrid_method: int,
+    unmapped_action: int,
+    src_mask_values: Sequence[int] | None = None,
+    ignore_degenerate: bool = False,
+) -> str:
+    parts = [
+        _CACHE_VERSION,
+        fingerprint_grid(src_gwrap),
+        fingerprint_grid(dst_gwrap),
+        int(regrid_method),
+        int(unmapped_action),
+        None if src_mask_values is None else sorted(src_mask_values),
+        ignore_degenerate,
+    ]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class WeightCache:
+    """Content-addressed store of ESMF weight files shared between runs."""
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+
+    def get_path(self, key: str) -> Path:
+        return self._directory / f"weights-{key}.nc"
+
+    def has(self, key: str) -> bool:
+        exists = None
+        if COMM.rank == 0:
+            exists = self.get_path(key).exists()
+        return COMM.bcast(exists)
+
+    def create_regridder(
+        self,
+        src_fwrap: FieldWrapper,
+        dst_fwrap: FieldWrapper,
+        regrid_method: int,
+        unmapped_action: int,
+        src_mask_values: Sequence[int] | None = None,
+        ignore_degenerate: bool = False,
+        filename: Path | None = None,
+    ) -> esmpy.Regrid:
+        key = create_weight_key(
+            src_fwrap.gwrap,
+            dst_fwrap.gwrap,
+            regrid_method,
+            unmapped_action,
+            src_mask_values=src_mask_values,
+            ignore_degenerate=ignore_degenerate,
+        )
+        path = self.get_path(key)
+        if self.has(key):
+            _LOGGER.info(f"weight cache hit: {path}")
+            regridder = esmpy.RegridFromFile(
+                src_fwrap.value, dst_fwrap.value, filename=str(path)
+            )
+        else:
+            _LOGGER.info(f"weight cache miss: {path}")
+            tmp_path = None
+            if COMM.rank == 0:
+                self._directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = str(path.with_name(f".{path.name}.{uuid.uuid4().hex}"))
+            tmp_path = COMM.bcast(tmp_path)
+            regridder = esmpy.Regrid(
+                src_fwrap.value,
+                dst_fwrap.value,
+                regrid_method=regrid_method,
+                unmapped_action=unmapped_action,
+                src_mask_values=src_mask_values,
+                ignore_degenerate=ignore_degenerate,
+                filename=tmp_path,
+            )
+            COMM.barrier()
+            if COMM.rank == 0:
+                os.replace(tmp_path, path)
+        if filename is not None and COMM.rank == 0:
+            shutil.copyfile(path, filename)
+        COMM.barrier()
+        return regridder
+
+
+@PROFILER.phase(Phase.WEIGHT_GENERATION)
+def create_regridder(
+    src_fwrap: FieldWrapper,
+    dst_fwrap: FieldWrapper,
+    regrid_method: int,
+    unmapped_action: int,
+    src_mask_values: Sequence[int] | None = None,
+    ignore_degenerate: bool = False,
+    filename: Path | None = None,
+    cache_directory: Path | None = None,
+) -> esmpy.Regrid:
+    if requires_corners(regrid_method):
+        src_fwrap.gwrap.load_corner_coords()
+        dst_fwrap.gwrap.load_corner_coords()
+    if cache_directory is None:
+        return esmpy.Regrid(
+            src_fwrap.value,
+            dst_fwrap.value,
+            regrid_method=regrid_method,
+            unmapped_action=unmapped_action,
+            src_mask_values=src_mask_values,
+            ignore_degenerate=ignore_degenerate,
+            filename=None if filename is None else str(filename),
+        )
+    cache = WeightCache(cache_directory)
+    return cache.create_regridder(
+        src_fwrap,
+        dst_fwrap,
+        regrid_method,
+        unmapped_action,
+        src_mask_values=src_mask_values,
+        ignore_degenerate=ignore_degenerate,
+        filename=filename,
+    )
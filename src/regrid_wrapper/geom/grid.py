@@ -1,13 +1,15 @@
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-import xarray as xr
 from pydantic import BaseModel
 
 from regrid_wrapper.geom.plot_spec import PlotSpec
 from regrid_wrapper.geom.bounding_box import BoundingBox
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class Grid(BaseModel):
     path: Path
@@ -15,12 +17,16 @@ class Grid(BaseModel):
     lat_name: str
     plot_spec: PlotSpec = PlotSpec()
 
-    def describe(self) -> pd.DataFrame:
+    def describe(self) -> "pd.DataFrame":
+        import pandas as pd
+
         lon = self.describe_variable(self.lon_name)
         lat = self.describe_variable(self.lat_name)
         return pd.concat([lon, lat], axis=0)
 
     def get_bounding_box(self) -> BoundingBox:
+        import xarray as xr
+
         with xr.open_dataset(self.path) as ds:
             lat = ds[self.lat_name]
             lon = ds[self.lon_name]
@@ -33,11 +39,15 @@ class Grid(BaseModel):
             )
 
     def get(self, name: str) -> np.ndarray:
+        import xarray as xr
+
         with xr.open_dataset(self.path) as ds:
             target = ds[name]
             return target.values
 
-    def describe_variable(self, name: str) -> pd.DataFrame:
+    def describe_variable(self, name: str) -> "pd.DataFrame":
+        import xarray as xr
+
         with xr.open_dataset(self.path) as ds:
             da = ds[name]
             desc = da.to_dataframe().describe().transpose()
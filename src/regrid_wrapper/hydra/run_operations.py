@@ -2,17 +2,27 @@ import hydra
 from omegaconf import DictConfig
 
 from regrid_wrapper.concrete.core import iter_operations
+from regrid_wrapper.context.env import ENV
 from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.esmpy.grid_registry import grid_registry_session
 from regrid_wrapper.model.config import SmokeDustRegridConfig
 from regrid_wrapper.strategy.core import RegridProcessor
+from regrid_wrapper.strategy.manifest import Manifest
 
 
 def do_run_operations(cfg: SmokeDustRegridConfig) -> None:
     logger = LOGGER.getChild("run_operations")
+    logger.info(ENV)
     logger.info(cfg)
-    for op in iter_operations(cfg):
-        processor = RegridProcessor(op)
-        processor.execute()
+    if cfg.manifest_directory is None:
+        manifest = None
+    else:
+        manifest = Manifest(cfg.manifest_directory)
+    # Source grids are reused by the operations of every target grid.
+    with grid_registry_session():
+        for op in iter_operations(cfg):
+            processor = RegridProcessor(op, manifest=manifest)
+            processor.execute()
     logger.info("success")
 
 
@@ -1,9 +1,11 @@
 import hydra
 from omegaconf import DictConfig
 
+from regrid_wrapper.common import FileCopier
+from regrid_wrapper.context.env import ENV
 from regrid_wrapper.context.logging import LOGGER
 from regrid_wrapper.model.config import SmokeDustRegridConfig, ComponentKey
-import xarray as xr
+from regrid_wrapper.strategy.schedule import create_schedule
 
 
 MAIN_JOB_TEMPLATE = """#!/usr/bin/env bash
@@ -31,9 +33,44 @@ export PYTHONPATH=${{DIR}}/src:${{PYTHONPATH}}
 export REGRID_WRAPPER_LOG_DIR={log_directory}
 
 cd ${{REGRID_WRAPPER_LOG_DIR}}
-mpirun -np {ntasks} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py
+{run_commands}
 """
 
+RUN_COMMAND_TEMPLATE = (
+    "mpirun -np {ntasks} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py"
+)
+
+CONCURRENT_RUN_COMMAND_TEMPLATE = """REGRID_WRAPPER_LOG_PREFIX=Regrid-Wrapper-{name} srun --exact --ntasks={ntasks} python ${{DIR}}/src/regrid_wrapper/hydra/run_operations.py "target_grids=[{target_grid}]" "target_components=[{target_components}]" &
+pids+=($!)"""
+
+
+def create_run_commands(cfg: SmokeDustRegridConfig, ntasks: int) -> str:
+    logger = LOGGER.getChild("create_run_commands")
+    if cfg.concurrent:
+        groups = create_schedule(cfg, ntasks)
+    else:
+        groups = []
+    if len(groups) == 0:
+        return RUN_COMMAND_TEMPLATE.format(ntasks=ntasks)
+    logger.info(f"running {len(groups)} operation groups concurrently")
+    lines = ["pids=()"]
+    for group in groups:
+        lines.append(
+            CONCURRENT_RUN_COMMAND_TEMPLATE.format(
+                name=group.name,
+                ntasks=group.ntasks,
+                target_grid=group.target_grid.value,
+                target_components=",".join(ii.value for ii in group.target_components),
+            )
+        )
+    # Fail the job if any group fails. Waiting in a condition keeps set -e from
+    # exiting before the other groups finish.
+    lines.append(
+        'status=0; for pid in "${pids[@]}"; do wait "${pid}" || status=1; done'
+    )
+    lines.append("exit ${status}")
+    return "\n".join(lines)
+
 
 def do_task_prep(cfg: SmokeDustRegridConfig) -> None:
     logger = LOGGER.getChild("do_task_prep")
@@ -42,24 +79,26 @@ def do_task_prep(cfg: SmokeDustRegridConfig) -> None:
     cfg.root_output_directory.mkdir(exist_ok=False, parents=True)
     cfg.log_directory.mkdir(exist_ok=False)
     rrfs_grid = None
+    copier = FileCopier(cfg.copy_strategy)
     for grid_key in cfg.target_grids:
         cfg.output_directory(grid_key).mkdir(exist_ok=False, parents=True)
-        logger.info("copying rrfs grid")
         rrfs_grid = cfg.source_definition.rrfs_grids[grid_key]
-        with xr.open_dataset(rrfs_grid.grid) as src:
-            src.to_netcdf(cfg.model_grid_path(grid_key))
-        logger.info("copying rave grid")
-        with xr.open_dataset(
-            cfg.source_definition.components[ComponentKey.RAVE_GRID].grid
-        ) as src:
-            src.to_netcdf(cfg.rave_grid_path(grid_key))
+        method = copier.copy(rrfs_grid.grid, cfg.model_grid_path(grid_key))
+        logger.info(f"copied rrfs grid: {method}")
+        method = copier.copy(
+            cfg.source_definition.components[ComponentKey.RAVE_GRID].grid,
+            cfg.rave_grid_path(grid_key),
+        )
+        logger.info(f"copied rave grid: {method}")
     logger.info("creating main job script")
     assert rrfs_grid is not None
+    ntasks = rrfs_grid.nodes * rrfs_grid.tasks_per_node
     with open(cfg.main_job_path, "w") as f:
         template = MAIN_JOB_TEMPLATE.format(
             job_name=cfg.root_output_directory.name,
             nodes=rrfs_grid.nodes,
-            ntasks=rrfs_grid.nodes * rrfs_grid.tasks_per_node,
+            ntasks=ntasks,
+            run_commands=create_run_commands(cfg, ntasks),
             log_directory=cfg.log_directory,
             wall_time=rrfs_grid.wall_time,
             tasks_per_node=rrfs_grid.tasks_per_node,
@@ -72,6 +111,7 @@ def do_task_prep(cfg: SmokeDustRegridConfig) -> None:
 def do_task_prep_cli(cfg: DictConfig) -> None:
     logger = LOGGER.getChild("regrid_wrapper_app")
     logger.info("start")
+    logger.info(ENV)
     sd_cfg = SmokeDustRegridConfig.model_validate(cfg)
     do_task_prep(sd_cfg)
     logger.info("success")
@@ -1,8 +1,10 @@
+import itertools
 from enum import StrEnum, unique
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Iterator
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PositiveInt
 
+from regrid_wrapper.common import CopyStrategy
 from regrid_wrapper.context.common import PathType
 
 
@@ -47,6 +49,32 @@ class SmokeDustRegridConfig(BaseModel):
     target_components: Tuple[ComponentKey, ...] = Field(min_length=1)
     root_output_directory: PathType
     source_definition: SourceDefinition
+    weight_cache_directory: PathType | None = None
+    # Record finished operations here so a restarted job skips them
+    manifest_directory: PathType | None = None
+    # How task prep copies grid files into the output directories
+    copy_strategy: CopyStrategy = CopyStrategy.AUTO
+    # Run independent (grid, component) operations as concurrent sub-jobs
+    concurrent: bool = False
+    # Run all target grids of a component back to back so its source grid and
+    # fields are loaded once. Concurrent sub-jobs each run a single target grid.
+    fan_out: bool = False
+    # Time steps regridded per iteration for components with a time dimension
+    time_chunk_size: PositiveInt | None = None
+    # Overlap reading and writing time chunks with regridding
+    pipeline_io: bool = False
+    # Decompose source grids along the dimension that balances valid points.
+    # Operations writing a weight file are not affected.
+    balance_decomposition: bool = False
+
+    def iter_operation_keys(self) -> Iterator[Tuple[RrfsGridKey, ComponentKey]]:
+        if self.fan_out:
+            return (
+                (target_grid, target_component)
+                for target_component in self.target_components
+                for target_grid in self.target_grids
+            )
+        return itertools.product(self.target_grids, self.target_components)
 
     def output_directory(self, target_grid: RrfsGridKey) -> PathType:
         return (
@@ -1,37 +1,88 @@
 import abc
 import os
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, FrozenSet, List, Tuple
 
-import esmpy
-from pydantic import BaseModel, model_validator, field_validator
+import netCDF4 as nc
+from pydantic import BaseModel, PositiveInt, model_validator
 
+from regrid_wrapper.context.comm import COMM
 from regrid_wrapper.context.common import PathType
 from regrid_wrapper.context.logging import LOGGER
-import xarray as xr
+
+_VARIABLE_NAMES: Dict[Tuple[Path, int], FrozenSet[str]] = {}
+
+
+def get_variable_names(path: Path) -> FrozenSet[str]:
+    """Variable names in a netCDF file, read from the header on rank 0.
+
+    Rank 0 caches listings per path and modification time for the life of the
+    process. Every call is collective. An error on rank 0 is raised on every
+    rank.
+    """
+    return COMM.bcast_call(lambda: _read_variable_names_(Path(path).absolute()))
+
+
+def _read_variable_names_(path: Path) -> FrozenSet[str]:
+    key = path, os.stat(path).st_mtime_ns
+    if key not in _VARIABLE_NAMES:
+        with nc.Dataset(path, "r") as ds:
+            _VARIABLE_NAMES[key] = frozenset(ds.variables)
+    return _VARIABLE_NAMES[key]
+
+
+def clear_variable_names_cache() -> None:
+    _VARIABLE_NAMES.clear()
 
 
 class AbstractRegridSpec(BaseModel, abc.ABC):
     name: str
     nproc: int = 1
     esmpy_debug: bool = False
-    esmpy_unmapped_action: int = esmpy.UnmappedAction.ERROR
+    # esmpy.UnmappedAction.ERROR without importing esmpy
+    esmpy_unmapped_action: int = 0
+    weight_cache_directory: PathType | None = None
+    # Allow existing outputs so a restarted job can replace stale results
+    overwrite: bool = False
 
 
 class GenerateWeightFileSpec(AbstractRegridSpec):
     src_path: PathType
     dst_path: PathType
-    output_weight_filename: PathType
+    # Only written by operations that create a single regridder. Operations that
+    # create several regridders leave it unset.
+    output_weight_filename: PathType | None = None
+    # Source variable whose valid points are used to balance the decomposition
+    # of the source grid. If None, ESMF's default decomposition is used. Not
+    # allowed with a weight file whose source indexing must not change.
+    src_cost_variable: str | None = None
+
+    @property
+    def input_paths(self) -> Tuple[Path, ...]:
+        return self.src_path, self.dst_path
+
+    @property
+    def output_paths(self) -> Tuple[Path, ...]:
+        if self.output_weight_filename is None:
+            return ()
+        return (self.output_weight_filename,)
 
     def is_complete(self) -> bool:
-        return self.output_weight_filename.exists()
+        return all(ii.exists() for ii in self.output_paths)
 
     @model_validator(mode="after")
     def _validate_model_(self) -> "GenerateWeightFileSpec":
+        if not self.output_paths:
+            raise ValueError("spec has no output files")
+        if self.src_cost_variable is not None and self.output_weight_filename:
+            raise ValueError("cannot balance the decomposition of a weight file")
         errors = []
         errors += self._validate_input_file_path_(self.src_path)
         errors += self._validate_input_file_path_(self.dst_path)
-        errors += self._validate_output_file_(self.output_weight_filename)
+        if self.output_weight_filename is not None:
+            errors += self._validate_output_file_(
+                self.output_weight_filename, self.overwrite
+            )
         if errors:
             LOGGER.error(errors)
             raise IOError(errors)
@@ -49,14 +100,14 @@ class GenerateWeightFileSpec(AbstractRegridSpec):
         return errors
 
     @staticmethod
-    def _validate_output_file_(path: Path) -> List[str]:
+    def _validate_output_file_(path: Path, overwrite: bool = False) -> List[str]:
         errors = []
         parent = path.parent
         if not parent.exists():
             errors.append(f"parent directory does not exist: {path.parent}")
         if not os.access(parent, os.W_OK):
             errors.append(f"parent directory is not writable: {path.parent}")
-        if path.exists():
+        if path.exists() and not overwrite:
             errors.append(f"file already exists: {path}")
         return errors
 
@@ -64,23 +115,31 @@ class GenerateWeightFileSpec(AbstractRegridSpec):
 class GenerateWeightFileAndRegridFields(GenerateWeightFileSpec):
     output_filename: PathType
     fields: Tuple[str, ...]
+    # Regrid fields with a time dimension this many time steps at a time. If
+    # None, all time steps are loaded at once.
+    time_chunk_size: PositiveInt | None = None
+    # Read the next and write the previous time chunk in a background thread
+    # while the current chunk is regridded
+    pipeline_io: bool = False
+
+    @property
+    def output_paths(self) -> Tuple[Path, ...]:
+        if self.output_weight_filename is None:
+            return (self.output_filename,)
+        return self.output_weight_filename, self.output_filename
 
     @model_validator(mode="after")
     def _validate_fields_(self) -> "GenerateWeightFileAndRegridFields":
-        missing = []
-        with xr.open_dataset(self.src_path) as ds:
-            for field in self.fields:
-                if field not in ds:
-                    missing.append(field)
+        varnames = get_variable_names(self.src_path)
+        missing = [ii for ii in self.fields if ii not in varnames]
         if missing:
             raise ValueError(f"missing fields: {missing}")
         return self
 
-    @field_validator("output_filename")
-    @classmethod
-    def _validate_output_filename_(cls, path: PathType) -> PathType:
-        errors = cls._validate_output_file_(path)
+    @model_validator(mode="after")
+    def _validate_output_filename_(self) -> "GenerateWeightFileAndRegridFields":
+        errors = self._validate_output_file_(self.output_filename, self.overwrite)
         if errors:
             LOGGER.error(errors)
             raise IOError(errors)
-        return path
+        return self
@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Tuple
+
+import netCDF4 as nc
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+from scipy import sparse
+
+ShapeType = Tuple[int, ...]
+
+
+class WeightMatrix(BaseModel):
+    """Sparse regridding weights applied without ESMF.
+
+    Shapes are given in NetCDF dimension order with the fastest varying
+    dimension last (e.g. ``(grid_yt, grid_xt)``). This matches the ESMF
+    sequence indices of grids whose first dimension is x (the default
+    ``GridSpec.grid_dim_order``).
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
+
+    value: sparse.csr_matrix
+    src_shape: ShapeType
+    dst_shape: ShapeType
+
+    @classmethod
+    def from_file(
+        cls, path: Path, src_shape: ShapeType, dst_shape: ShapeType
+    ) -> "WeightMatrix":
+        with nc.Dataset(path, "r") as ds:
+            ds.set_auto_mask(False)
+            row = ds.variables["row"][:]
+            col = ds.variables["col"][:]
+            weights = ds.variables["S"][:]
+        # ESMF sequence indices are one-based
+        value = sparse.csr_matrix(
+            (weights, (row - 1, col - 1)),
+            shape=(int(np.prod(dst_shape)), int(np.prod(src_shape))),
+        )
+        return cls(value=value, src_shape=tuple(src_shape), dst_shape=tuple(dst_shape))
+
+    @property
+    def mapped(self) -> np.ndarray:
+        """Boolean array over the destination marking points that receive weights."""
+        return (np.diff(self.value.indptr) > 0).reshape(self.dst_shape)
+
+    def apply(self, src: np.ndarray, dst: np.ndarray | None = None) -> np.ndarray:
+        """Regrid ``src`` with leading dimensions such as time applied in one matmul.
+
+        If ``dst`` is provided, only mapped destination points are overwritten
+        (``esmpy.Region.SELECT``). Otherwise a new array is returned with
+        unmapped points set to zero (``esmpy.Region.TOTAL``).
+        """
+        ndim = len(self.src_shape)
+        if tuple(src.shape[-ndim:]) != self.src_shape:
+            raise ValueError(
+                f"source shape {src.shape} does not end with {self.src_shape}"
+            )
+        leading = src.shape[:-ndim]
+        nsrc, ndst = self.value.shape[1], self.value.shape[0]
+        src_2d = np.reshape(src, (-1, nsrc))
+        result = np.asarray(self.value @ src_2d.T).T
+        result = result.reshape(leading + self.dst_shape)
+        if dst is None:
+            return result
+        expected = leading + self.dst_shape
+        if tuple(dst.shape) != expected:
+            raise ValueError(f"destination shape {dst.shape} is not {expected}")
+        mapped = self.mapped
+        dst[..., mapped] = result[..., mapped]
+        return dst
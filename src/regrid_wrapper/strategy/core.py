@@ -1,16 +1,58 @@
+from regrid_wrapper.context.comm import COMM
 from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.context.profile import PROFILER
+from regrid_wrapper.esmpy.field_wrapper import dataset_session
+from regrid_wrapper.model.spec import GenerateWeightFileSpec
+from regrid_wrapper.strategy.manifest import Manifest
 from regrid_wrapper.strategy.operation import AbstractRegridOperation
 
 
 class RegridProcessor:
 
-    def __init__(self, operation: AbstractRegridOperation) -> None:
+    def __init__(
+        self, operation: AbstractRegridOperation, manifest: Manifest | None = None
+    ) -> None:
         self._operation = operation
+        self._manifest = manifest
         self._logger = LOGGER.getChild("regrid-processor")
 
     def execute(self) -> None:
         self._logger.info("start: execute")
+        spec = self._operation.spec
+        manifest = self._manifest
+        if manifest is not None and isinstance(spec, GenerateWeightFileSpec):
+            self._execute_recorded_(manifest, spec)
+        else:
+            self._run_(spec.name)
+        self._logger.info("end: execute")
+
+    def _execute_recorded_(
+        self, manifest: Manifest, spec: GenerateWeightFileSpec
+    ) -> None:
+        if self._is_fresh_(manifest, spec):
+            self._logger.info(f"skipping complete operation: {spec.name}")
+            return
+        self._run_(spec.name)
+        COMM.barrier()
+        if COMM.rank == 0:
+            manifest.write(spec)
+        COMM.barrier()
+
+    def _run_(self, name: str) -> None:
+        PROFILER.reset()
         self._operation.initialize()
-        self._operation.run()
+        with dataset_session():
+            self._operation.run()
         self._operation.finalize()
-        self._logger.info("end: execute")
+        PROFILER.write_report(name)
+
+    @staticmethod
+    def _is_fresh_(manifest: Manifest, spec: GenerateWeightFileSpec) -> bool:
+        is_fresh = None
+        if COMM.rank == 0:
+            is_fresh = manifest.is_fresh(spec)
+            if not is_fresh:
+                manifest.clear(spec)
+        is_fresh = COMM.bcast(is_fresh)
+        COMM.barrier()
+        return is_fresh
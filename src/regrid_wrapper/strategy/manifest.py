@@ -0,0 +1,114 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Dict
+
+from pydantic import BaseModel, ConfigDict
+
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.model.spec import GenerateWeightFileSpec
+
+
+class InputFingerprint(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    size: int
+    mtime_ns: int
+
+
+class ManifestRecord(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    name: str
+    spec: str
+    inputs: Dict[str, InputFingerprint]
+    outputs: Dict[str, str]
+
+
+def fingerprint_input(path: Path) -> InputFingerprint:
+    stat = os.stat(path)
+    return InputFingerprint(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def checksum_file(path: Path, chunk_size: int = 16 * 1024**2) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _hash_spec_(spec: GenerateWeightFileSpec) -> str:
+    # The overwrite flag only controls validation and does not change outputs.
+    dumped = spec.model_dump_json(exclude={"overwrite"})
+    return hashlib.sha256(dumped.encode()).hexdigest()
+
+
+class Manifest:
+    """Completion records for finished operations, one JSON file per operation.
+
+    Records are only written after an operation finishes and are replaced
+    atomically, so a job killed mid-operation leaves no record behind. Methods
+    touch the filesystem and should only be called from a single rank.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = Path(directory)
+        self._logger = LOGGER.getChild("manifest")
+
+    def get_path(self, spec: GenerateWeightFileSpec) -> Path:
+        # Names are not guaranteed unique across target grids so the outputs
+        # are part of the key.
+        key = hashlib.sha256(
+            "|".join(str(ii) for ii in spec.output_paths).encode()
+        ).hexdigest()[:16]
+        return self._directory / f"{spec.name}-{key}.json"
+
+    def create_record(self, spec: GenerateWeightFileSpec) -> ManifestRecord:
+        return ManifestRecord(
+            name=spec.name,
+            spec=_hash_spec_(spec),
+            inputs={str(ii): fingerprint_input(ii) for ii in spec.input_paths},
+            outputs={str(ii): checksum_file(ii) for ii in spec.output_paths},
+        )
+
+    def read(self, spec: GenerateWeightFileSpec) -> ManifestRecord | None:
+        path = self.get_path(spec)
+        if not path.exists():
+            return None
+        return ManifestRecord.model_validate_json(path.read_text())
+
+    def write(self, spec: GenerateWeightFileSpec) -> ManifestRecord:
+        record = self.create_record(spec)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(spec)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            f.write(record.model_dump_json(indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return record
+
+    def is_fresh(self, spec: GenerateWeightFileSpec) -> bool:
+        record = self.read(spec)
+        if record is None or not spec.is_complete():
+            return False
+        if record.spec != _hash_spec_(spec):
+            self._logger.info(f"spec changed: {spec.name}")
+            return False
+        inputs = {str(ii): fingerprint_input(ii) for ii in spec.input_paths}
+        if record.inputs != inputs:
+            self._logger.info(f"inputs changed: {spec.name}")
+            return False
+        for path in spec.output_paths:
+            if record.outputs.get(str(path)) != checksum_file(path):
+                self._logger.info(f"output changed: {path}")
+                return False
+        return True
+
+    def clear(self, spec: GenerateWeightFileSpec) -> None:
+        self.get_path(spec).unlink(missing_ok=True)
+        for path in spec.output_paths:
+            if path.exists():
+                self._logger.info(f"removing stale output: {path}")
+                path.unlink()
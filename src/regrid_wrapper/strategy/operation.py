@@ -1,19 +1,27 @@
 import abc
-
-import esmpy
+from typing import TYPE_CHECKING
 
 from regrid_wrapper.context.logging import LOGGER
 from regrid_wrapper.model.spec import AbstractRegridSpec
 
+if TYPE_CHECKING:
+    import esmpy
+
 
 class AbstractRegridOperation(abc.ABC):
 
     def __init__(self, spec: AbstractRegridSpec) -> None:
         self._spec = spec
         self._logger = LOGGER.getChild("operation").getChild(spec.name)
-        self._esmf_manager: None | esmpy.Manager = None
+        self._esmf_manager: "None | esmpy.Manager" = None
+
+    @property
+    def spec(self) -> AbstractRegridSpec:
+        return self._spec
 
     def initialize(self) -> None:
+        import esmpy
+
         self._logger.info(f"initializing regrid operation: {self._spec.name}")
         self._esmf_manager = esmpy.Manager(debug=self._spec.esmpy_debug)
 
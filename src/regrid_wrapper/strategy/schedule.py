@@ -0,0 +1,140 @@
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import netCDF4 as nc
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+from regrid_wrapper.context.logging import LOGGER
+from regrid_wrapper.model.config import (
+    ComponentKey,
+    RrfsGridKey,
+    SmokeDustRegridConfig,
+)
+
+
+class GridSize(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    cells: int
+    layers: int
+
+
+class OperationGroup(BaseModel):
+    """Operations sharing one sub-allocation of ranks.
+
+    Each group is launched as its own MPI job so esmpy only ever sees the ranks
+    assigned to it.
+    """
+
+    model_config = ConfigDict(frozen=True)
+    target_grid: RrfsGridKey
+    target_components: Tuple[ComponentKey, ...] = Field(min_length=1)
+    cost: float
+    ntasks: int = 1
+
+    @property
+    def name(self) -> str:
+        return f"{self.target_grid}-{'-'.join(self.target_components)}"
+
+
+def read_grid_size(path: Path) -> GridSize:
+    # Only the header is read. The horizontal grid is taken to be the largest
+    # trailing 2d shape and every variable defined on it counts as a layer.
+    with nc.Dataset(path, "r") as ds:
+        shapes = [
+            var.shape
+            for var in ds.variables.values()
+            if len(var.shape) >= 2 and int(np.prod(var.shape[-2:])) > 0
+        ]
+    if len(shapes) == 0:
+        raise ValueError(f"no gridded variables found: {path}")
+    cells = max(int(np.prod(ii[-2:])) for ii in shapes)
+    layers = sum(
+        int(np.prod(ii[:-2])) for ii in shapes if int(np.prod(ii[-2:])) == cells
+    )
+    return GridSize(cells=cells, layers=layers)
+
+
+def estimate_cost(src: GridSize, dst: GridSize, component: ComponentKey) -> float:
+    # Weight generation scales with both grids. Regridding scales with the
+    # destination size times the number of source layers.
+    cost = float(src.cells + dst.cells)
+    if component != ComponentKey.RAVE_GRID:
+        cost += float(dst.cells * src.layers)
+    return cost
+
+
+def allocate_tasks(costs: List[float], ntasks: int) -> List[int]:
+    """Split ``ntasks`` proportionally to ``costs`` with at least one per entry."""
+    if ntasks < len(costs):
+        raise ValueError(f"cannot allocate {ntasks} tasks to {len(costs)} groups")
+    total = sum(costs)
+    if total <= 0:
+        weights = np.full(len(costs), 1.0 / len(costs))
+    else:
+        weights = np.array(costs) / total
+    spare = ntasks - len(costs)
+    exact = weights * spare
+    ret = np.floor(exact).astype(int)
+    remainder = spare - int(ret.sum())
+    for idx in np.argsort(-(exact - ret), kind="stable")[:remainder]:
+        ret[idx] += 1
+    return [int(ii) + 1 for ii in ret]
+
+
+def create_schedule(cfg: SmokeDustRegridConfig, ntasks: int) -> List[OperationGroup]:
+    """Group independent operations and size each group's sub-allocation.
+
+    Every (grid, component) pair gets its own group when there are enough
+    tasks. Otherwise the components of a grid are run one after another in a
+    single group. An empty schedule is returned if there are fewer tasks than
+    grids.
+    """
+    logger = LOGGER.getChild("create_schedule")
+    sizes: Dict[Path, GridSize] = {}
+
+    def get_size(path: Path) -> GridSize:
+        if path not in sizes:
+            sizes[path] = read_grid_size(path)
+        return sizes[path]
+
+    pairs: List[Tuple[RrfsGridKey, ComponentKey, float]] = []
+    for target_grid in cfg.target_grids:
+        dst = get_size(Path(cfg.source_definition.rrfs_grids[target_grid].grid))
+        for target_component in cfg.target_components:
+            src = get_size(
+                Path(cfg.source_definition.components[target_component].grid)
+            )
+            pairs.append(
+                (
+                    target_grid,
+                    target_component,
+                    estimate_cost(src, dst, target_component),
+                )
+            )
+
+    if ntasks >= len(pairs):
+        groups = [
+            OperationGroup(target_grid=grid, target_components=(comp,), cost=cost)
+            for grid, comp, cost in pairs
+        ]
+    elif ntasks >= len(cfg.target_grids):
+        groups = [
+            OperationGroup(
+                target_grid=target_grid,
+                target_components=tuple(ii[1] for ii in pairs if ii[0] == target_grid),
+                cost=sum(ii[2] for ii in pairs if ii[0] == target_grid),
+            )
+            for target_grid in cfg.target_grids
+        ]
+    else:
+        logger.warning(f"not enough tasks to run concurrently: {ntasks}")
+        return []
+
+    allocation = allocate_tasks([ii.cost for ii in groups], ntasks)
+    ret = [
+        ii.model_copy(update={"ntasks": count}) for ii, count in zip(groups, allocation)
+    ]
+    for group in ret:
+        logger.info(f"{group.name}: ntasks={group.ntasks}, cost={group.cost:.3e}")
+    return ret
@@ -0,0 +1,228 @@
+"""Benchmark the concrete operations on synthetic RRFS-sized grids.
+
+Run from the ``src`` directory, for example::
+
+    python -m test.benchmark.cli suite /tmp/bench --scale 0.25 --nprocs 1 --nprocs 8
+    python -m test.benchmark.cli compare baseline.jsonl /tmp/bench/results.jsonl
+    python -m test.benchmark.cli imports --repeat 5
+"""
+
+import datetime
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import typer
+from pydantic import BaseModel
+
+from regrid_wrapper.concrete.core import iter_operations
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.profile import PROFILER
+from regrid_wrapper.hydra.task_prep import do_task_prep
+from regrid_wrapper.model.config import ComponentKey, RrfsGridKey
+from regrid_wrapper.strategy.core import RegridProcessor
+from test.benchmark.grids import create_config, create_inputs
+from test.benchmark.imports import measure_import
+
+app = typer.Typer()
+
+SRC_DIR = Path(__file__).parent.parent.parent
+
+
+class BenchmarkRecord(BaseModel):
+    timestamp: str
+    commit: str
+    host: str
+    nprocs: int
+    scale: float
+    target_grid: RrfsGridKey
+    component: ComponentKey
+    wall: float
+    phases: Dict[str, float] = {}
+
+    @property
+    def key(self) -> Tuple[str, str, int, float]:
+        return self.target_grid.value, self.component.value, self.nprocs, self.scale
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(
+    work_dir: Path,
+    results: Path,
+    target_grids: Tuple[RrfsGridKey, ...],
+    target_components: Tuple[ComponentKey, ...],
+    scale: float = 1.0,
+    repeat: int = 1,
+    keep: bool = False,
+) -> List[BenchmarkRecord]:
+    source_definition = create_inputs(
+        work_dir / "inputs", target_grids, target_components, scale=scale
+    )
+    commit = get_commit() if COMM.rank == 0 else None
+    commit = COMM.bcast(commit)
+    ret = []
+    for _ in range(repeat):
+        root = None
+        if COMM.rank == 0:
+            root = str(work_dir / f"run-{COMM.size}-{uuid.uuid4().hex[:8]}")
+        root = Path(COMM.bcast(root))
+        cfg = create_config(root, source_definition, target_grids, target_components)
+        if COMM.rank == 0:
+            do_task_prep(cfg)
+        COMM.barrier()
+        pairs = cfg.iter_operation_keys()
+        for (target_grid, component), op in zip(pairs, iter_operations(cfg)):
+            COMM.barrier()
+            start = time.perf_counter()
+            RegridProcessor(op).execute()
+            COMM.barrier()
+            wall = time.perf_counter() - start
+            phases = PROFILER.reduce() if PROFILER.enabled else None
+            if COMM.rank != 0:
+                continue
+            record = BenchmarkRecord(
+                timestamp=datetime.datetime.now().isoformat(),
+                commit=commit,
+                host=socket.gethostname(),
+                nprocs=COMM.size,
+                scale=scale,
+                target_grid=target_grid,
+                component=component,
+                wall=wall,
+                phases={ii.phase: ii.wall_max for ii in phases or []},
+            )
+            with open(results, "a") as f:
+                f.write(record.model_dump_json() + "\n")
+            typer.echo(f"{target_grid} {component} nprocs={COMM.size}: {wall:.3f}s")
+            ret.append(record)
+        if COMM.rank == 0 and not keep:
+            shutil.rmtree(root)
+        COMM.barrier()
+    return ret
+
+
+def read_records(path: Path) -> List[BenchmarkRecord]:
+    with open(path) as f:
+        return [BenchmarkRecord.model_validate_json(ii) for ii in f if ii.strip()]
+
+
+def compare_records(
+    baseline: List[BenchmarkRecord], current: List[BenchmarkRecord]
+) -> Dict[Tuple[str, str, int, float], Tuple[float, float]]:
+    """Best wall time per key for keys present in both result sets."""
+
+    def best(records: List[BenchmarkRecord]) -> Dict[Tuple, float]:
+        ret: Dict[Tuple, float] = {}
+        for record in records:
+            ret[record.key] = min(ret.get(record.key, float("inf")), record.wall)
+        return ret
+
+    best_baseline = best(baseline)
+    best_current = best(current)
+    return {
+        key: (best_baseline[key], best_current[key])
+        for key in sorted(best_baseline)
+        if key in best_current
+    }
+
+
+@app.command()
+def run(
+    work_dir: Path,
+    target_grid: List[RrfsGridKey] = typer.Option(list(RrfsGridKey)),
+    component: List[ComponentKey] = typer.Option(list(ComponentKey)),
+    scale: float = 1.0,
+    repeat: int = 1,
+    keep: bool = False,
+) -> None:
+    """Run the benchmark in this process. Launch with mpirun for parallel runs."""
+    if COMM.rank == 0:
+        work_dir.mkdir(parents=True, exist_ok=True)
+    COMM.barrier()
+    run_benchmark(
+        work_dir,
+        work_dir / "results.jsonl",
+        tuple(target_grid),
+        tuple(component),
+        scale=scale,
+        repeat=repeat,
+        keep=keep,
+    )
+
+
+@app.command()
+def suite(
+    work_dir: Path,
+    nprocs: List[int] = typer.Option([1]),
+    target_grid: List[RrfsGridKey] = typer.Option(list(RrfsGridKey)),
+    component: List[ComponentKey] = typer.Option(list(ComponentKey)),
+    scale: float = 1.0,
+    repeat: int = 1,
+    mpirun: str = "mpirun",
+) -> None:
+    """Run the benchmark serially and under ``mpirun -n N`` in subprocesses."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC_DIR), env.get("PYTHONPATH", "")])
+    env.setdefault("REGRID_WRAPPER_LOG_DIR", str(work_dir))
+    env.setdefault("REGRID_WRAPPER_PROFILE", "true")
+    args = [str(work_dir.resolve()), f"--scale={scale}", f"--repeat={repeat}"]
+    args += [f"--target-grid={ii.value}" for ii in target_grid]
+    args += [f"--component={ii.value}" for ii in component]
+    for n in nprocs:
+        cmd = [sys.executable, "-m", "test.benchmark.cli", "run"] + args
+        if n > 1:
+            cmd = [mpirun, "-n", str(n)] + cmd
+        typer.echo(" ".join(cmd))
+        subprocess.run(cmd, cwd=SRC_DIR, env=env, check=True)
+
+
+@app.command()
+def compare(baseline: Path, current: Path, tolerance: float = 0.1) -> None:
+    """Compare best wall times and exit non-zero on regressions."""
+    regressions = 0
+    rows = compare_records(read_records(baseline), read_records(current))
+    for key, (old, new) in rows.items():
+        ratio = new / old if old > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions += 1
+            flag = "REGRESSION"
+        typer.echo(f"{key}: {old:.3f}s -> {new:.3f}s ({ratio:.2f}x) {flag}")
+    if regressions:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def imports(
+    module: List[str] = typer.Option(
+        [
+            "regrid_wrapper.hydra.task_prep",
+            "regrid_wrapper.hydra.run_operations",
+            "regrid_wrapper.describe",
+        ]
+    ),
+    repeat: int = 3,
+) -> None:
+    """Time imports in fresh interpreters and list the heavy modules they load."""
+    for name in module:
+        record = measure_import(name, repeat=repeat)
+        typer.echo(f"{name}: {record.seconds:.3f}s loaded={list(record.loaded)}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,114 @@
+from pathlib import Path
+from typing import Dict, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.config import (
+    Component,
+    ComponentKey,
+    RrfsGrid,
+    RrfsGridKey,
+    SmokeDustRegridConfig,
+    SourceDefinition,
+)
+from test.conftest import (
+    create_dust_data_file,
+    create_emi_data_file,
+    create_rrfs_grid_file,
+    create_veg_map_file,
+)
+
+
+class GridShape(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    nlon: int
+    nlat: int
+
+    def scale(self, factor: float) -> "GridShape":
+        return GridShape(
+            nlon=max(2, round(self.nlon * factor)),
+            nlat=max(2, round(self.nlat * factor)),
+        )
+
+
+# Approximate horizontal sizes of the operational grids.
+RRFS_GRID_SHAPES: Dict[RrfsGridKey, GridShape] = {
+    RrfsGridKey.RRFS_CONUS_25KM: GridShape(nlon=219, nlat=131),
+    RrfsGridKey.RRFS_CONUS_13KM: GridShape(nlon=396, nlat=232),
+    RrfsGridKey.RRFS_NA_13KM: GridShape(nlon=912, nlat=623),
+}
+SOURCE_GRID_SHAPE = GridShape(nlon=3950, nlat=2700)
+
+
+def _create_file_(path: Path, component: ComponentKey | None, shape: GridShape) -> None:
+    if path.exists():
+        return
+    tmp_path = path.with_name(f".{path.name}")
+    tmp_path.unlink(missing_ok=True)
+    match component:
+        case None | ComponentKey.RAVE_GRID:
+            _ = create_rrfs_grid_file(tmp_path, nlon=shape.nlon, nlat=shape.nlat)
+        case ComponentKey.VEG_MAP:
+            _ = create_veg_map_file(
+                tmp_path, ["emiss_factor"], nlon=shape.nlon, nlat=shape.nlat
+            )
+        case ComponentKey.DUST:
+            _ = create_dust_data_file(tmp_path, nlon=shape.nlon, nlat=shape.nlat)
+        case ComponentKey.EMI:
+            _ = create_emi_data_file(tmp_path, nlon=shape.nlon, nlat=shape.nlat)
+        case _:
+            raise NotImplementedError(component)
+    tmp_path.rename(path)
+
+
+def create_inputs(
+    directory: Path,
+    target_grids: Tuple[RrfsGridKey, ...],
+    target_components: Tuple[ComponentKey, ...],
+    scale: float = 1.0,
+) -> SourceDefinition:
+    """Create synthetic inputs once per scale and reuse them on later runs.
+
+    Files are written by rank 0 only.
+    """
+    directory = directory / f"scale-{scale:g}"
+    src_shape = SOURCE_GRID_SHAPE.scale(scale)
+    components = {}
+    rrfs_grids = {}
+    if COMM.rank == 0:
+        directory.mkdir(parents=True, exist_ok=True)
+    # Task prep always copies the RAVE grid into each target directory.
+    for key in set(target_components) | {ComponentKey.RAVE_GRID}:
+        path = directory / f"{key.value.lower()}-{src_shape.nlon}x{src_shape.nlat}.nc"
+        if COMM.rank == 0:
+            _create_file_(path, key, src_shape)
+        components[key] = Component.model_construct(grid=path)
+    for key in target_grids:
+        shape = RRFS_GRID_SHAPES[key].scale(scale)
+        path = directory / f"{key.value.lower()}-{shape.nlon}x{shape.nlat}.nc"
+        if COMM.rank == 0:
+            _create_file_(path, None, shape)
+        rrfs_grids[key] = RrfsGrid.model_construct(
+            grid=path, nodes=1, tasks_per_node=COMM.size, wall_time="04:00:00"
+        )
+    COMM.barrier()
+    # Configs require definitions for all components and grids even if only a
+    # few are benchmarked.
+    return SourceDefinition.model_construct(
+        components=components, rrfs_grids=rrfs_grids
+    )
+
+
+def create_config(
+    root_output_directory: Path,
+    source_definition: SourceDefinition,
+    target_grids: Tuple[RrfsGridKey, ...],
+    target_components: Tuple[ComponentKey, ...],
+) -> SmokeDustRegridConfig:
+    return SmokeDustRegridConfig(
+        target_grids=target_grids,
+        target_components=target_components,
+        root_output_directory=root_output_directory,
+        source_definition=source_definition,
+    )
@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Tuple
+
+from pydantic import BaseModel
+
+SRC_DIR = Path(__file__).parent.parent.parent
+
+# Dependencies that should only load in the code paths that use them.
+HEAVY_MODULES = ("esmpy", "xarray", "pandas", "cartopy", "matplotlib")
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+loaded = [ii for ii in {heavy!r} if ii in sys.modules]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+class ImportRecord(BaseModel):
+    module: str
+    seconds: float
+    loaded: Tuple[str, ...]
+
+
+def measure_import(
+    module: str, heavy: Tuple[str, ...] = HEAVY_MODULES, repeat: int = 1
+) -> ImportRecord:
+    """Import ``module`` in fresh interpreters and keep the fastest run."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC_DIR), env.get("PYTHONPATH", "")])
+    script = _SCRIPT.format(module=module, heavy=tuple(heavy))
+    ret = None
+    for _ in range(repeat):
+        out = subprocess.check_output(
+            [sys.executable, "-c", script], cwd=SRC_DIR, env=env, text=True
+        )
+        record = ImportRecord(module=module, **json.loads(out.splitlines()[-1]))
+        if ret is None or record.seconds < ret.seconds:
+            ret = record
+    return ret
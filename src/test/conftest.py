@@ -128,18 +128,20 @@ def create_rrfs_grid_file(
     return ds
 
 
-def create_veg_map_file(path: Path, field_names: List[str]) -> xr.Dataset:
+def create_veg_map_file(
+    path: Path, field_names: List[str], nlon: int = 71, nlat: int = 26
+) -> xr.Dataset:
     if path.exists():
         raise ValueError(f"path exists: {path}")
-    lon = np.linspace(230, 300, 71)
-    lat = np.linspace(25, 50, 26)
+    lon = np.linspace(230, 300, nlon)
+    lat = np.linspace(25, 50, nlat)
     lon_mesh, lat_mesh = np.meshgrid(lon, lat)
 
     with nc.Dataset(path, "w") as ds:
-        ds.createDimension("lon", 71)
-        ds.createDimension("geolon", 71)
-        ds.createDimension("lat", 26)
-        ds.createDimension("geolat", 26)
+        ds.createDimension("lon", nlon)
+        ds.createDimension("geolon", nlon)
+        ds.createDimension("lat", nlat)
+        ds.createDimension("geolat", nlat)
         geolat = ds.createVariable("geolat", float, ("lat", "lon"))
         geolat[:] = lat_mesh
         geolon = ds.createVariable("geolon", float, ("lat", "lon"))
@@ -166,12 +168,12 @@ def create_veg_map_file(path: Path, field_names: List[str]) -> xr.Dataset:
 DUST_FIELD_OFFSETS = {ii: random.randint(1, 1000) for ii in RRFS_DUST_DATA_ENV.fields}
 
 
-def create_dust_data_file(path: Path) -> xr.Dataset:
+def create_dust_data_file(path: Path, nlon: int = 71, nlat: int = 26) -> xr.Dataset:
     if path.exists():
         raise ValueError(f"path exists: {path}")
 
-    lon = np.linspace(230, 300, 71)
-    lat = np.linspace(25, 50, 26)
+    lon = np.linspace(230, 300, nlon)
+    lat = np.linspace(25, 50, nlat)
     lon_mesh, lat_mesh = np.meshgrid(lon, lat)
     ds = xr.Dataset()
     dims = ["lat", "lon"]
@@ -197,12 +199,12 @@ def create_dust_data_file(path: Path) -> xr.Dataset:
 EMI_FIELD_OFFSETS = {ii: random.randint(1, 1000) for ii in EMI_DATA_ENV.fields}
 
 
-def create_emi_data_file(path: Path) -> xr.Dataset:
+def create_emi_data_file(path: Path, nlon: int = 71, nlat: int = 26) -> xr.Dataset:
     if path.exists():
         raise ValueError(f"path exists: {path}")
 
-    lon = np.linspace(230, 300, 71)
-    lat = np.linspace(25, 50, 26)
+    lon = np.linspace(230, 300, nlon)
+    lat = np.linspace(25, 50, nlat)
     lon_mesh, lat_mesh = np.meshgrid(lon, lat)
     ds = xr.Dataset()
     dims = ["grid_yt", "grid_xt"]
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.config import ComponentKey, RrfsGridKey
+from test.benchmark.cli import compare_records, read_records, run_benchmark
+
+
+@pytest.mark.mpi
+def test_run_benchmark(tmp_path_shared: Path) -> None:
+    results = tmp_path_shared / "results.jsonl"
+    records = run_benchmark(
+        tmp_path_shared,
+        results,
+        (RrfsGridKey.RRFS_CONUS_25KM,),
+        (ComponentKey.VEG_MAP, ComponentKey.DUST),
+        scale=0.02,
+        repeat=2,
+    )
+    if COMM.rank != 0:
+        assert records == []
+        return
+    assert len(records) == 4
+    assert read_records(results) == records
+    assert [ii.name for ii in tmp_path_shared.iterdir() if ii.is_dir()] == ["inputs"]
+
+    rows = compare_records(records[:2], records[2:])
+    assert len(rows) == 2
+    key = (RrfsGridKey.RRFS_CONUS_25KM.value, ComponentKey.DUST.value, COMM.size, 0.02)
+    assert rows[key] == (records[1].wall, records[3].wall)
@@ -0,0 +1,69 @@
+import os
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from regrid_wrapper.common import CopyStrategy, FileCopier, copy_nc
+from test.conftest import create_dust_data_file, create_rrfs_grid_file
+
+
+def assert_same_nc(expected: Path, actual: Path) -> None:
+    with nc.Dataset(expected) as e, nc.Dataset(actual) as a:
+        assert e.__dict__ == a.__dict__
+        assert {k: len(v) for k, v in e.dimensions.items()} == {
+            k: len(v) for k, v in a.dimensions.items()
+        }
+        for name, var in e.variables.items():
+            assert var.dimensions == a.variables[name].dimensions
+            assert np.array_equal(var[:], a.variables[name][:])
+
+
+def test_copy_nc(tmp_path: Path) -> None:
+    src = tmp_path / "src.nc"
+    _ = create_dust_data_file(src)
+    dst = tmp_path / "dst.nc"
+    copy_nc(src, dst, max_chunk_bytes=1024)
+    assert_same_nc(src, dst)
+    with nc.Dataset(dst) as ds:
+        assert ds.data_model == "NETCDF4"
+
+
+@pytest.mark.parametrize("strategy", list(CopyStrategy))
+def test_file_copier(tmp_path: Path, strategy: CopyStrategy) -> None:
+    src = tmp_path / "grid.nc"
+    _ = create_rrfs_grid_file(src)
+    copier = FileCopier(strategy)
+    dsts = [tmp_path / f"copy-{ii}.nc" for ii in range(2)]
+    methods = [copier.copy(src, ii) for ii in dsts]
+
+    for dst in dsts:
+        assert_same_nc(src, dst)
+    src_inode = os.stat(src).st_ino
+    inodes = [os.stat(ii).st_ino for ii in dsts]
+    match strategy:
+        case CopyStrategy.HARDLINK:
+            assert methods == [CopyStrategy.HARDLINK] * 2
+            assert inodes == [src_inode] * 2
+        case CopyStrategy.AUTO:
+            assert all(
+                ii in (CopyStrategy.REFLINK, CopyStrategy.BYTES) for ii in methods
+            )
+            assert len({src_inode, *inodes}) == 3
+        case CopyStrategy.BYTES:
+            assert methods == [CopyStrategy.BYTES] * 2
+        case _:
+            assert src_inode not in inodes
+
+
+@pytest.mark.parametrize("data_model", ["NETCDF3_CLASSIC", "NETCDF4_CLASSIC"])
+def test_file_copier_auto_netcdf4(tmp_path: Path, data_model: str) -> None:
+    src = tmp_path / "grid.nc"
+    ds = create_rrfs_grid_file(tmp_path / "tmp.nc")
+    ds.to_netcdf(src, format=data_model)
+    dst = tmp_path / "copy.nc"
+    assert FileCopier().copy(src, dst) == CopyStrategy.NETCDF
+    assert_same_nc(src, dst)
+    with nc.Dataset(dst) as ds:
+        assert ds.data_model == "NETCDF4"
@@ -25,7 +25,6 @@ from test.conftest import (
 def test(tmp_path_shared: Path) -> None:
     src_grid = tmp_path_shared / "src_grid.nc"
     dst_grid = tmp_path_shared / "dst_grid.nc"
-    weights = tmp_path_shared / "weights.nc"
     emi_data = tmp_path_shared / "emi.nc"
 
     if COMM.rank == 0:
@@ -36,7 +35,6 @@ def test(tmp_path_shared: Path) -> None:
     spec = GenerateWeightFileAndRegridFields(
         src_path=src_grid,
         dst_path=dst_grid,
-        output_weight_filename=weights,
         output_filename=emi_data,
         esmpy_debug=False,
         name="emi-data",
@@ -46,7 +44,6 @@ def test(tmp_path_shared: Path) -> None:
     processor = RegridProcessor(operation=op)
     processor.execute()
 
-    assert not weights.exists()
     assert emi_data.exists()
 
     if COMM.rank == 0:
@@ -1,16 +1,25 @@
 from pathlib import Path
 
+import netCDF4 as nc
 import numpy as np
 import pytest
 import xarray as xr
+from pytest_mock import MockerFixture
 
+from regrid_wrapper.concrete import rrfs_dust_data
 from regrid_wrapper.concrete.rrfs_dust_data import (
+    FieldMaskSpec,
     RrfsDustData,
+    RrfsDustDataEnv,
     RRFS_DUST_DATA_ENV,
 )
 from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.esmpy.field_wrapper import NcToFieldBatch, NcToGrid
+from regrid_wrapper.esmpy.grid_registry import grid_registry_session
+from regrid_wrapper.esmpy.pipeline import TimeWindowPipeline
 from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
 from regrid_wrapper.strategy.core import RegridProcessor
+from regrid_wrapper.strategy.manifest import Manifest
 from test.conftest import (
     create_rrfs_grid_file,
     create_dust_data_file,
@@ -22,7 +31,6 @@ from test.conftest import (
 def test(tmp_path_shared: Path) -> None:
     src_grid = tmp_path_shared / "src_grid.nc"
     dst_grid = tmp_path_shared / "dst_grid.nc"
-    weights = tmp_path_shared / "weights.nc"
     dust_data = tmp_path_shared / "dust.nc"
 
     if COMM.rank == 0:
@@ -33,7 +41,6 @@ def test(tmp_path_shared: Path) -> None:
     spec = GenerateWeightFileAndRegridFields(
         src_path=src_grid,
         dst_path=dst_grid,
-        output_weight_filename=weights,
         output_filename=dust_data,
         esmpy_debug=False,
         name="dust-data",
@@ -43,7 +50,6 @@ def test(tmp_path_shared: Path) -> None:
     processor = RegridProcessor(operation=op)
     processor.execute()
 
-    assert not weights.exists()
     assert dust_data.exists()
 
     if COMM.rank == 0:
@@ -63,3 +69,337 @@ def test(tmp_path_shared: Path) -> None:
                 assert_zero_sum_diff(
                     actual["geolon"].values, expected_coords["grid_lont"].values
                 )
+
+
+@pytest.mark.mpi
+def test_src_cost_variable(tmp_path_shared: Path, mocker: MockerFixture) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    spy = mocker.spy(NcToGrid, "_choose_decomp_dim_")
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        src_cost_variable="uthr",
+    )
+    RegridProcessor(operation=RrfsDustData(spec=spec)).execute()
+    assert spy.call_count == (1 if COMM.rank == 0 else 0)
+
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as expected:
+            with xr.open_dataset(dust_data) as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.parametrize("with_sentinels, expected_regridders", [(False, 1), (True, 3)])
+@pytest.mark.mpi
+def test_weights_shared_by_mask(
+    tmp_path_shared: Path,
+    mocker: MockerFixture,
+    with_sentinels: bool,
+    expected_regridders: int,
+) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+        if with_sentinels:
+            with nc.Dataset(src_grid, "a") as ds:
+                ds.variables["uthr"][:, 0:5, :] = 999
+                ds.variables["clay"][:, :, 0:3] = -1
+                ds.variables["sand"][:, :, 0:3] = -1
+    COMM.barrier()
+
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+    )
+    spy = mocker.spy(rrfs_dust_data, "create_regridder")
+    op = RrfsDustData(spec=spec)
+    RegridProcessor(operation=op).execute()
+
+    # Without sentinels every mask is identical. Otherwise "uthr", "clay"/"sand"
+    # and "rdrag"/"ssm" each share a mask.
+    assert spy.call_count == expected_regridders
+
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as expected:
+            with xr.open_dataset(dust_data) as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.mpi
+def test_fan_out(tmp_path_shared: Path, mocker: MockerFixture) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grids = [tmp_path_shared / f"dst_grid-{ii}.nc" for ii in range(2)]
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        for dst_grid, nlon in zip(dst_grids, [71, 40]):
+            _ = create_rrfs_grid_file(dst_grid, nlon=nlon)
+    COMM.barrier()
+
+    spy = mocker.spy(NcToFieldBatch, "create_field_wrapper")
+    with grid_registry_session():
+        for idx, dst_grid in enumerate(dst_grids):
+            spec = GenerateWeightFileAndRegridFields(
+                src_path=src_grid,
+                dst_path=dst_grid,
+                output_filename=tmp_path_shared / f"dust-{idx}.nc",
+                name=f"dust-data-{idx}",
+                fields=RRFS_DUST_DATA_ENV.fields,
+            )
+            RegridProcessor(operation=RrfsDustData(spec=spec)).execute()
+
+    # One source load shared by both operations plus one load per output.
+    assert spy.call_count == 3
+
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as expected:
+            with xr.open_dataset(tmp_path_shared / "dust-0.nc") as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+            with xr.open_dataset(tmp_path_shared / "dust-1.nc") as actual:
+                assert actual["uthr"].shape == (12, 26, 40)
+
+
+@pytest.mark.mpi
+def test_time_chunk_size(tmp_path_shared: Path, mocker: MockerFixture) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+        with nc.Dataset(src_grid, "a") as ds:
+            ds.variables["uthr"][:, 0:5, :] = 999
+            ds.variables["clay"][:, :, 0:3] = -1
+            for idx in range(12):
+                ds.variables["ssm"][idx] = ds.variables["ssm"][idx] + idx
+    COMM.barrier()
+
+    spy = mocker.spy(rrfs_dust_data, "create_regridder")
+    for time_chunk_size, pipeline_io in [(None, False), (5, False), (5, True)]:
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_filename=tmp_path_shared
+            / f"dust-{time_chunk_size}-{pipeline_io}.nc",
+            name="dust-data",
+            fields=RRFS_DUST_DATA_ENV.fields,
+            time_chunk_size=time_chunk_size,
+            pipeline_io=pipeline_io,
+        )
+        RegridProcessor(operation=RrfsDustData(spec=spec)).execute()
+
+    # Regridders are created once per mask, not once per window.
+    assert spy.call_count == 3 * 3
+
+    if COMM.rank == 0:
+        with xr.open_dataset(tmp_path_shared / "dust-None-False.nc") as expected:
+            for suffix in ["5-False", "5-True"]:
+                with xr.open_dataset(tmp_path_shared / f"dust-{suffix}.nc") as actual:
+                    for field_name in RRFS_DUST_DATA_ENV.fields:
+                        np.testing.assert_allclose(
+                            actual[field_name].values, expected[field_name].values
+                        )
+
+
+@pytest.mark.parametrize(
+    "time_chunk_size, pipeline_io", [(None, False), (5, False), (5, True)]
+)
+@pytest.mark.mpi
+def test_time_varying_mask(
+    tmp_path_shared: Path,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    time_chunk_size: int | None,
+    pipeline_io: bool,
+) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+        with nc.Dataset(src_grid, "a") as ds:
+            ds.variables["uthr"][0::2, 0:5, :] = 999
+    COMM.barrier()
+
+    masks = dict(RRFS_DUST_DATA_ENV.masks)
+    masks["uthr"] = FieldMaskSpec(sentinel=999, fill_value=999, time_invariant=False)
+    monkeypatch.setattr(
+        rrfs_dust_data,
+        "RRFS_DUST_DATA_ENV",
+        RRFS_DUST_DATA_ENV.model_copy(update={"masks": masks}),
+    )
+    spy = mocker.spy(rrfs_dust_data, "create_regridder")
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        time_chunk_size=time_chunk_size,
+        pipeline_io=pipeline_io,
+    )
+    RegridProcessor(operation=RrfsDustData(spec=spec)).execute()
+
+    # One regridder for the other fields and one per distinct "uthr" mask.
+    assert spy.call_count == 3
+
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as expected:
+            with xr.open_dataset(dust_data) as actual:
+                uthr = actual["uthr"].values
+                assert (uthr[0::2, 0:5, :] == 999).all()
+                assert_zero_sum_diff(uthr[1::2], expected["uthr"].values[1::2])
+                for field_name in ["sand", "clay", "rdrag", "ssm"]:
+                    assert_zero_sum_diff(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.parametrize("time_chunk_size", [None, 5])
+@pytest.mark.mpi
+def test_time_invariant_mask_varies(
+    tmp_path_shared: Path, time_chunk_size: int | None
+) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+        with nc.Dataset(src_grid, "a") as ds:
+            ds.variables["sand"][7, 0:5, :] = -1
+    COMM.barrier()
+
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_filename=tmp_path_shared / "dust.nc",
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        time_chunk_size=time_chunk_size,
+    )
+    with pytest.raises(ValueError, match="mask of sand varies"):
+        RrfsDustData(spec=spec).run()
+
+
+def test_env_masks() -> None:
+    env = RrfsDustDataEnv(fields=(*RRFS_DUST_DATA_ENV.fields, "other"))
+    assert env.get_mask_spec("uthr").sentinel == 999
+    assert env.get_mask_spec("other") == FieldMaskSpec()
+    with pytest.raises(ValueError, match="masks for unknown fields"):
+        RrfsDustDataEnv(fields=("uthr",), masks={"foo": FieldMaskSpec()})
+
+
+@pytest.mark.parametrize("time_varying", [False, True])
+@pytest.mark.mpi
+def test_pipeline_io_weight_cache(
+    tmp_path_shared: Path,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    time_varying: bool,
+) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+        with nc.Dataset(src_grid, "a") as ds:
+            # A time-invariant mask must be the same in every time step.
+            step = 2 if time_varying else 1
+            ds.variables["uthr"][::step, 0:5, :] = 999
+    COMM.barrier()
+
+    if time_varying:
+        masks = dict(RRFS_DUST_DATA_ENV.masks)
+        masks["uthr"] = FieldMaskSpec(
+            sentinel=999, fill_value=999, time_invariant=False
+        )
+        monkeypatch.setattr(
+            rrfs_dust_data,
+            "RRFS_DUST_DATA_ENV",
+            RRFS_DUST_DATA_ENV.model_copy(update={"masks": masks}),
+        )
+    spy = mocker.spy(TimeWindowPipeline, "_iter_pipelined_")
+    for pipeline_io in [False, True]:
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_filename=tmp_path_shared / f"dust-{pipeline_io}.nc",
+            name="dust-data",
+            fields=RRFS_DUST_DATA_ENV.fields,
+            time_chunk_size=5,
+            pipeline_io=pipeline_io,
+            weight_cache_directory=tmp_path_shared / "weights",
+        )
+        RegridProcessor(operation=RrfsDustData(spec=spec)).execute()
+
+    # Regridders for time-varying masks use the weight cache inside the loop
+    # so I/O is not pipelined.
+    assert spy.call_count == (0 if time_varying else 1)
+
+    if COMM.rank == 0:
+        with xr.open_dataset(tmp_path_shared / "dust-False.nc") as expected:
+            with xr.open_dataset(tmp_path_shared / "dust-True.nc") as actual:
+                for field_name in RRFS_DUST_DATA_ENV.fields:
+                    np.testing.assert_allclose(
+                        actual[field_name].values, expected[field_name].values
+                    )
+
+
+@pytest.mark.mpi
+def test_manifest(tmp_path_shared: Path, mocker: MockerFixture) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    dust_data = tmp_path_shared / "dust.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    manifest = Manifest(tmp_path_shared / "manifest")
+    spec = GenerateWeightFileAndRegridFields(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_filename=dust_data,
+        name="dust-data",
+        fields=RRFS_DUST_DATA_ENV.fields,
+        overwrite=True,
+    )
+    assert spec.output_paths == (dust_data,)
+    spy = mocker.spy(RrfsDustData, "run")
+    for _ in range(2):
+        RegridProcessor(RrfsDustData(spec=spec), manifest=manifest).execute()
+    assert spy.call_count == 1
+    assert spec.is_complete()
+    if COMM.rank == 0:
+        assert manifest.is_fresh(spec)
+
+    with_weights = spec.model_copy(
+        update={"output_weight_filename": tmp_path_shared / "weights.nc"}
+    )
+    with pytest.raises(ValueError, match="does not write a weight file"):
+        RrfsDustData(spec=with_weights).run()
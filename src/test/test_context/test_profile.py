@@ -0,0 +1,78 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.context.profile import PROFILER, Phase, Profiler
+from test.conftest import custom_env
+
+
+def test_phase_disabled() -> None:
+    profiler = Profiler()
+    with custom_env(PROFILE=False):
+        with profiler.phase(Phase.RESIZE_NC):
+            pass
+    assert profiler.stats == {}
+
+
+def test_phase() -> None:
+    profiler = Profiler()
+
+    @profiler.phase(Phase.NC_WRITE)
+    def write(path: Path) -> None:
+        time.sleep(0.01)
+
+    with custom_env(PROFILE=True):
+        with profiler.phase(Phase.FIELD_LOAD):
+            data = bytearray(64 * 1024**2)
+        write(Path("foo"))
+        with profiler.phase(Phase.NC_WRITE):
+            write(Path("foo"))
+    stats = profiler.stats[Phase.NC_WRITE]
+    assert stats.count == 2
+    assert stats.wall >= 0.02
+    assert profiler.stats[Phase.FIELD_LOAD].rss_delta >= len(data) // 2
+    assert stats.process_peak_rss > 0
+
+    profiler.reset()
+    assert profiler.stats == {}
+
+
+def test_concurrent() -> None:
+    profiler = Profiler()
+    with custom_env(PROFILE=True):
+        with profiler.concurrent():
+            with profiler.phase(Phase.FIELD_LOAD):
+                _ = bytearray(1024)
+        with profiler.phase(Phase.FIELD_LOAD):
+            pass
+    stats = profiler.stats[Phase.FIELD_LOAD]
+    assert stats.count == 2
+    assert stats.concurrent_count == 1
+    assert stats.process_peak_rss > 0
+
+
+@pytest.mark.mpi
+def test_write_report(tmp_path_shared: Path) -> None:
+    with custom_env(PROFILE=True, LOG_PREFIX="test"):
+        PROFILER.reset()
+        with PROFILER.phase(Phase.FIELD_LOAD):
+            _ = bytearray(1024)
+        actual = PROFILER.write_report("op", directory=tmp_path_shared)
+    PROFILER.reset()
+
+    if COMM.rank != 0:
+        assert actual is None
+        return
+    assert actual == tmp_path_shared / "test-profile-op.json"
+    with open(actual) as f:
+        report = json.load(f)
+    assert report["size"] == COMM.size
+    assert [ii["phase"] for ii in report["phases"]] == [Phase.FIELD_LOAD]
+    assert report["phases"][0]["count"] == 1
+    with open(tmp_path_shared / "test-profile-op.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["phase"] == Phase.FIELD_LOAD
@@ -1,6 +1,10 @@
 from pathlib import Path
 
-from regrid_wrapper.describe import DescribeParams, describe
+import numpy as np
+import pytest
+import xarray as xr
+
+from regrid_wrapper.describe import DescribeParams, StreamingStats, describe
 from test.conftest import create_dust_data_file
 
 
@@ -13,6 +17,77 @@ def test(tmp_path_shared: Path) -> None:
         varnames=["uthr", "sand", "clay", "rdrag", "ssm"],
         namespace="dust",
         csv_out=tmp_path_shared / "summary.csv",
+        chunk_bytes=26 * 71 * 8 * 5,
     )
     df = describe(params)
     assert df is not None
+    with xr.open_dataset(data) as ds:
+        for row in df.to_dict(orient="records"):
+            da = ds[row["varname"]]
+            for key in ["min", "max", "mean", "std", "sum"]:
+                assert row[key] == pytest.approx(getattr(da, key)().item())
+            assert row["n"] == da.count().item()
+            assert row["n_null"] == 0
+            tolerance = 4 * (row["max"] - row["min"]) / params.nbins
+            for q in [0.25, 0.5, 0.75]:
+                lower = da.quantile(q, method="lower").item() - tolerance
+                higher = da.quantile(q, method="higher").item() + tolerance
+                assert lower <= row[f"{q:.0%}"] <= higher
+            assert row["median"] == row["50%"]
+
+
+def test_nproc(tmp_path: Path) -> None:
+    files = [tmp_path / f"data-{ii}.nc" for ii in range(3)]
+    for path in files:
+        _ = create_dust_data_file(path)
+    kwargs = dict(files=files, varnames=["uthr", "ssm"], namespace="dust")
+    serial = describe(DescribeParams(**kwargs, csv_out=tmp_path / "serial.csv"))
+    parallel = describe(
+        DescribeParams(**kwargs, csv_out=tmp_path / "parallel.csv", nproc=2)
+    )
+    assert serial.equals(parallel)
+
+
+class TestStreamingStats:
+    def test_chunks(self) -> None:
+        rng = np.random.default_rng(1)
+        values = np.concatenate(
+            [
+                rng.normal(5, 1, 1000),
+                rng.normal(-20, 3, 1000),
+                rng.exponential(50, 1000),
+            ]
+        )
+        values[::97] = np.nan
+        masked = np.ma.masked_array(values, mask=np.zeros_like(values, dtype=bool))
+        masked.mask[::101] = True
+        stats = StreamingStats(nbins=1024)
+        for chunk in np.array_split(masked, 7):
+            stats.update(chunk)
+
+        expected = masked.compressed()
+        expected = expected[~np.isnan(expected)]
+        assert stats.n == expected.size
+        assert stats.n_null == values.size - expected.size
+        assert stats.min == expected.min()
+        assert stats.max == expected.max()
+        assert stats.mean == pytest.approx(expected.mean())
+        assert stats.std == pytest.approx(expected.std())
+        assert stats.sum == pytest.approx(expected.sum())
+        tolerance = 4 * (expected.max() - expected.min()) / stats.nbins
+        for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+            lower = np.quantile(expected, q, method="lower") - tolerance
+            higher = np.quantile(expected, q, method="higher") + tolerance
+            assert lower <= stats.quantile(q) <= higher
+
+    def test_constant_and_empty(self) -> None:
+        stats = StreamingStats()
+        assert np.isnan(stats.quantile(0.5))
+        stats.update(np.full(10, np.nan))
+        assert stats.n == 0 and stats.n_null == 10
+        assert np.isnan(stats.to_dict()["mean"])
+        stats.update(np.full(10, 3.0))
+        assert stats.quantile(0.5) == 3.0
+        assert stats.std == 0.0
+        stats.update(np.array([1e6]))
+        assert stats.quantile(0.5) == pytest.approx(3.0, abs=4e6 / stats.nbins)
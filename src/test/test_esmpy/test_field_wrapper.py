@@ -2,6 +2,7 @@ from pathlib import Path
 
 import esmpy
 import numpy as np
+from mpi4py import MPI
 
 from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV
 from regrid_wrapper.esmpy.field_wrapper import (
@@ -9,15 +10,31 @@ from regrid_wrapper.esmpy.field_wrapper import (
     NcToGrid,
     NcToField,
     FieldWrapperCollection,
+    NcToFieldBatch,
+    IoMode,
+    create_mpi_info,
+    dataset_session,
     resize_nc,
     open_nc,
     load_variable_data,
     GridSpec,
+    choose_decomp_dim,
+    estimate_stripe_imbalance,
+    is_mmap_readable,
+    load_mmap_variable_data,
+    iter_time_windows,
+)
+from regrid_wrapper.esmpy import field_wrapper
+from test.conftest import (
+    tmp_path_shared,
+    create_dust_data_file,
+    create_rrfs_grid_file,
+    custom_env,
 )
-from test.conftest import tmp_path_shared, create_dust_data_file, create_rrfs_grid_file
 from regrid_wrapper.common import ncdump
 from regrid_wrapper.context.comm import COMM
 import pytest
+from pytest_mock import MockerFixture
 
 
 DUST_FILENAME = "data.nc"
@@ -71,8 +88,12 @@ class TestGridWrapper:
         )
         gwrap = NcToGrid(path=path, spec=spec).create_grid_wrapper()
 
-        assert gwrap.corner_dims is not None
+        assert gwrap.corner_dims is None
         assert gwrap.spec.has_corners
+        corner_dims = gwrap.load_corner_coords()
+        assert gwrap.corner_dims is corner_dims
+        assert corner_dims.get("grid_x").size == 72
+        assert gwrap.load_corner_coords() is corner_dims
 
     @pytest.mark.mpi
     def test_fill_nc_variables(
@@ -95,6 +116,164 @@ class TestGridWrapper:
                 actual = load_variable_data(var, gwrap.dims)
                 assert (expected - actual).sum() == 0
 
+    @pytest.mark.mpi
+    @pytest.mark.parametrize("decomp_dim", ["x", "y"])
+    def test_decomp_dim(self, tmp_path_shared: Path, decomp_dim: str) -> None:
+        path = create_dust_file(tmp_path_shared)
+        spec = GridSpec(
+            x_center="geolon",
+            y_center="geolat",
+            x_dim=("lon",),
+            y_dim=("lat",),
+            decomp_dim=decomp_dim,
+        )
+        gwrap = NcToGrid(path=path, spec=spec).create_grid_wrapper()
+
+        assert gwrap.dims.value[0].coordinate_type == decomp_dim
+        assert list(gwrap.value.max_index) == [ii.size for ii in gwrap.dims.value]
+        x_data = gwrap.spec.get_x_data(gwrap.value, esmpy.StaggerLoc.CENTER)
+        with open_nc(path) as ds:
+            expected = load_variable_data(ds.variables["geolon"], gwrap.dims)
+        assert np.array_equal(x_data, expected)
+
+    @pytest.mark.mpi
+    def test_cost_variable(self, tmp_path_shared: Path) -> None:
+        path = create_dust_file(tmp_path_shared)
+        spec = GridSpec(
+            x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+        )
+        gwrap = NcToGrid(
+            path=path, spec=spec, cost_variable="uthr"
+        ).create_grid_wrapper()
+        assert gwrap.spec.decomp_dim in ("x", "y")
+        assert gwrap.dims.value[0].coordinate_type == gwrap.spec.decomp_dim
+
+
+@pytest.mark.mpi
+@pytest.mark.parametrize(
+    "file_format, is_mapped", [("NETCDF3_64BIT", True), ("NETCDF4", False)]
+)
+def test_mmap_coords(
+    tmp_path_shared: Path, mocker: MockerFixture, file_format: str, is_mapped: bool
+) -> None:
+    path = tmp_path_shared / "grid.nc"
+    if COMM.rank == 0:
+        ds = create_rrfs_grid_file(path)
+        path.unlink()
+        ds.to_netcdf(path, format=file_format)
+    COMM.barrier()
+    spy = mocker.spy(field_wrapper, "load_mmap_variable_data")
+    open_spy = mocker.spy(field_wrapper, "_create_dataset_")
+    spec = GridSpec(
+        x_center="grid_lont",
+        y_center="grid_latt",
+        x_dim=("grid_xt",),
+        y_dim=("grid_yt",),
+        x_corner="grid_lon",
+        y_corner="grid_lat",
+        x_corner_dim=("grid_x",),
+        y_corner_dim=("grid_y",),
+    )
+    gwrap = NcToGrid(path=path, spec=spec).create_grid_wrapper()
+    gwrap.load_corner_coords()
+
+    assert spy.call_count == (4 if is_mapped else 0)
+    # Mapped files are never opened in parallel.
+    parallel_opens = [ii for ii in open_spy.call_args_list if ii.args[3]]
+    assert len(parallel_opens) == (0 if is_mapped else 2)
+    with open_nc(path) as ds:
+        for staggerloc, dims, varname in [
+            (esmpy.StaggerLoc.CENTER, gwrap.dims, "grid_lont"),
+            (esmpy.StaggerLoc.CORNER, gwrap.corner_dims, "grid_lon"),
+        ]:
+            expected = load_variable_data(ds.variables[varname], dims)
+            actual = gwrap.spec.get_x_data(gwrap.value, staggerloc)
+            assert np.array_equal(actual, expected)
+            assert is_mmap_readable(ds.variables[varname]) == is_mapped
+            if is_mapped:
+                actual = load_mmap_variable_data(path, varname, dims)
+                assert actual.dtype.isnative
+                assert np.array_equal(actual, expected)
+
+
+@pytest.mark.mpi
+def test_node_shared_coords(tmp_path_shared: Path) -> None:
+    path = tmp_path_shared / "grid.nc"
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(path, fields=["cost"])
+    COMM.barrier()
+    spec = GridSpec(
+        x_center="grid_lont",
+        y_center="grid_latt",
+        x_dim=("grid_xt",),
+        y_dim=("grid_yt",),
+        x_corner="grid_lon",
+        y_corner="grid_lat",
+        x_corner_dim=("grid_x",),
+        y_corner_dim=("grid_y",),
+    )
+    with custom_env(NODE_SHARED_COORDS=True):
+        nc2grid = NcToGrid(path=path, spec=spec, cost_variable="cost")
+        gwrap = nc2grid.create_grid_wrapper()
+        gwrap.load_corner_coords()
+
+    assert gwrap.spec.decomp_dim is not None
+    with open_nc(path) as ds:
+        for staggerloc, dims, names in [
+            (esmpy.StaggerLoc.CENTER, gwrap.dims, ("grid_lont", "grid_latt")),
+            (esmpy.StaggerLoc.CORNER, gwrap.corner_dims, ("grid_lon", "grid_lat")),
+        ]:
+            for getter, varname in zip(
+                [gwrap.spec.get_x_data, gwrap.spec.get_y_data], names
+            ):
+                expected = load_variable_data(ds.variables[varname], dims)
+                assert np.array_equal(getter(gwrap.value, staggerloc), expected)
+
+
+@pytest.mark.mpi
+def test_node_shared_coords_error(tmp_path_shared: Path, mocker: MockerFixture) -> None:
+    path = tmp_path_shared / "grid.nc"
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(path)
+    COMM.barrier()
+    # Errors on the reading rank are raised on every rank of the node.
+    with pytest.raises(KeyError):
+        with field_wrapper.NodeSharedCoordinateReader(path, ["grid_lont", "foo"]):
+            pass
+    var = mocker.MagicMock(dimensions=("x",), dtype=np.dtype("f8"))
+    var.__getitem__.side_effect = RuntimeError("read")
+    ds = mocker.MagicMock(dimensions={"x": [0] * 3}, variables={"grid_lont": var})
+    mocker.patch.object(field_wrapper, "_create_dataset_", return_value=ds)
+    with pytest.raises(RuntimeError, match="read"):
+        with field_wrapper.NodeSharedCoordinateReader(path, ["grid_lont"]):
+            pass
+
+
+@pytest.mark.parametrize(
+    "cost, nstripes, expected",
+    [
+        (np.ones(8), 4, 1.0),
+        (np.array([4, 0, 0, 0]), 2, 2.0),
+        (np.array([1, 1, 1]), 8, 1.0),
+        (np.zeros(4), 2, 1.0),
+    ],
+)
+def test_estimate_stripe_imbalance(
+    cost: np.ndarray, nstripes: int, expected: float
+) -> None:
+    assert estimate_stripe_imbalance(cost, nstripes) == expected
+
+
+def test_choose_decomp_dim() -> None:
+    # Valid points concentrated in the first few x columns but spread evenly
+    # over y rows.
+    valid = np.zeros((40, 20))
+    valid[:5, :] = 1
+    x_cost, y_cost = valid.sum(axis=1), valid.sum(axis=0)
+    assert choose_decomp_dim(x_cost, y_cost, 4) == "y"
+    assert choose_decomp_dim(y_cost, x_cost, 4) == "x"
+    assert choose_decomp_dim(x_cost, x_cost, 4) == "x"
+
 
 class TestFieldWrapper:
 
@@ -127,6 +306,104 @@ class TestFieldWrapperCollection:
             assert fwrap.dims.value[2].name == ("time",)
 
 
+class TestFieldBatchWrapper:
+
+    @pytest.mark.mpi
+    def test(
+        self,
+        tmp_path_shared: Path,
+        fake_field_wrapper_collection: FieldWrapperCollection,
+    ) -> None:
+        path = tmp_path_shared / DUST_FILENAME
+        gwrap = fake_field_wrapper_collection.value[0].gwrap
+        fbwrap = NcToFieldBatch(
+            path=path,
+            names=RRFS_DUST_DATA_ENV.fields,
+            gwrap=gwrap,
+            dim_time=("time",),
+        ).create_field_wrapper()
+        assert fbwrap.value.data.shape[-1] == len(RRFS_DUST_DATA_ENV.fields)
+        for fwrap in fake_field_wrapper_collection.value:
+            actual = fbwrap.get_data(fwrap.value.name)
+            assert (actual - fwrap.value.data).sum() == 0
+
+        names = tuple(RRFS_DUST_DATA_ENV.fields[1:3])
+        selected = fbwrap.select(names)
+        assert selected.names == names
+        selected.value.data.fill(COMM.rank + 1)
+        fbwrap.update(selected)
+        fbwrap.fill_nc_variable(path)
+        with open_nc(path, "r") as ds:
+            for name in RRFS_DUST_DATA_ENV.fields:
+                actual = load_variable_data(ds.variables[name], fbwrap.dims)
+                is_selected = (actual == COMM.rank + 1).all()
+                assert is_selected == (name in names)
+
+
+def test_create_mpi_info() -> None:
+    assert create_mpi_info({}) == MPI.INFO_NULL
+    info = create_mpi_info({"cb_nodes": "2"})
+    try:
+        assert info.Get("cb_nodes") == "2"
+    finally:
+        info.Free()
+
+
+@pytest.mark.parametrize("io_mode", list(IoMode))
+@pytest.mark.mpi
+def test_io_mode(tmp_path_shared: Path, io_mode: IoMode) -> None:
+    path = create_dust_file(tmp_path_shared)
+    gwrap = NcToGrid(
+        path=path,
+        spec=GridSpec(
+            x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+        ),
+    ).create_grid_wrapper()
+    name = RRFS_DUST_DATA_ENV.fields[0]
+    fwrap = NcToField(
+        path=path, name=name, gwrap=gwrap, dim_time=("time",), io_mode=io_mode
+    ).create_field_wrapper()
+    assert fwrap.io_mode == io_mode
+    expected = fwrap.value.data.copy()
+    fwrap.fill_nc_variable(path)
+    with open_nc(path, "r") as ds:
+        actual = load_variable_data(ds.variables[name], fwrap.dims, io_mode=io_mode)
+    assert (actual - expected).sum() == 0
+
+
+@pytest.mark.mpi
+def test_load_variable_data_out(
+    tmp_path_shared: Path,
+    fake_field_wrapper_collection: FieldWrapperCollection,
+) -> None:
+    path = tmp_path_shared / DUST_FILENAME
+    fwrap = fake_field_wrapper_collection.value[0]
+    with open_nc(path, "r") as ds:
+        var = ds.variables[fwrap.value.name]
+        expected = load_variable_data(var, fwrap.dims)
+        out = np.zeros(expected.shape, order="F")
+        actual = load_variable_data(var, fwrap.dims, out=out)
+    assert actual is out
+    assert (actual - expected).sum() == 0
+
+
+@pytest.mark.mpi
+def test_dataset_session(tmp_path_shared: Path) -> None:
+    path = create_dust_file(tmp_path_shared)
+    with dataset_session():
+        with open_nc(path, "r") as first:
+            pass
+        with open_nc(path, "r") as second:
+            assert first is second
+            assert second.isopen()
+        with open_nc(path, "a") as writable:
+            assert writable is not first
+            assert not first.isopen()
+        with open_nc(path, "r") as readable:
+            assert readable is writable
+    assert not writable.isopen()
+
+
 @pytest.mark.mpi
 def test_resize_nc(tmp_path_shared: Path) -> None:
     src_path = create_dust_file(tmp_path_shared)
@@ -138,3 +415,54 @@ def test_resize_nc(tmp_path_shared: Path) -> None:
     with open_nc(dst_path, "r") as ds:
         for dim in ds.dimensions:
             assert ds.dimensions[dim].size == new_sizes[dim]
+
+
+@pytest.mark.mpi
+def test_resize_nc_copy_values(tmp_path_shared: Path) -> None:
+    src_path = create_dust_file(tmp_path_shared)
+    dst_path = tmp_path_shared / "data_resized.nc"
+    new_sizes = {"time": 12, "lat": 26, "lon": 71}
+    names = ["time", "uthr"]
+    resize_nc(src_path, dst_path, new_sizes, copy_values_for=names, max_chunk_bytes=1)
+    with open_nc(src_path, "r") as src:
+        with open_nc(dst_path, "r") as dst:
+            for name in names:
+                assert (src.variables[name][:] == dst.variables[name][:]).all()
+            assert dst.variables["sand"][:].mask.all()
+
+
+def test_iter_time_windows() -> None:
+    assert list(iter_time_windows(12, None)) == [(0, 12)]
+    assert list(iter_time_windows(12, 5)) == [(0, 5), (5, 10), (10, 12)]
+    assert list(iter_time_windows(3, 5)) == [(0, 3)]
+
+
+@pytest.mark.mpi
+def test_time_chunk_size(tmp_path_shared: Path) -> None:
+    path = create_dust_file(tmp_path_shared)
+    gwrap = NcToGrid(
+        path=path,
+        spec=GridSpec(
+            x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",)
+        ),
+    ).create_grid_wrapper()
+    names = RRFS_DUST_DATA_ENV.fields[0:2]
+    expected = NcToFieldBatch(
+        path=path, names=names, gwrap=gwrap, dim_time=("time",)
+    ).create_field_wrapper()
+    fwrap = NcToFieldBatch(
+        path=path, names=names, gwrap=gwrap, dim_time=("time",), time_chunk_size=5
+    ).create_field_wrapper()
+    assert fwrap.value.data.shape[-2:] == (5, 2)
+    assert fwrap.dims.get(("time",)).size == 12
+
+    for start, stop in iter_time_windows(12, 5):
+        if start > 0:
+            fwrap.set_time_window(start, stop)
+            fwrap.load_nc_variable(path)
+        for name in names:
+            actual = fwrap.get_data(name)[:, :, 0 : stop - start]
+            assert (actual == expected.get_data(name)[:, :, start:stop]).all()
+
+    with pytest.raises(ValueError):
+        fwrap.set_time_window(0, 12)
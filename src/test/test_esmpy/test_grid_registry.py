@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import esmpy
+import pytest
+from pytest_mock import MockerFixture
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.esmpy.field_wrapper import (
+    GridSpec,
+    NcToField,
+    NcToFieldBatch,
+    NcToGrid,
+)
+from regrid_wrapper.esmpy.grid_registry import (
+    GridRegistry,
+    create_field_wrapper,
+    create_grid_wrapper,
+    estimate_field_nbytes,
+    estimate_grid_nbytes,
+    grid_registry_session,
+)
+from test.conftest import create_rrfs_grid_file, custom_env
+
+SPEC = GridSpec(
+    x_center="grid_lont",
+    y_center="grid_latt",
+    x_dim=("grid_xt",),
+    y_dim=("grid_yt",),
+)
+
+
+def create_grid_defs(tmp_path_shared: Path, n: int) -> list[NcToGrid]:
+    paths = [tmp_path_shared / f"grid-{ii}.nc" for ii in range(n)]
+    if COMM.rank == 0:
+        for path in paths:
+            _ = create_rrfs_grid_file(path, with_corners=False, fields=["a", "b"])
+    COMM.barrier()
+    return [NcToGrid(path=path, spec=SPEC) for path in paths]
+
+
+@pytest.mark.mpi
+class TestGridRegistry:
+    def test_get(self, tmp_path_shared: Path, mocker: MockerFixture) -> None:
+        nc2grids = create_grid_defs(tmp_path_shared, 1)
+        spy = mocker.spy(NcToGrid, "create_grid_wrapper")
+        registry = GridRegistry(max_size=2, max_bytes=2**30)
+        gwrap = registry.get(nc2grids[0])
+        assert registry.get(NcToGrid(path=nc2grids[0].path, spec=SPEC)) is gwrap
+        assert spy.call_count == 1
+
+        other_spec = SPEC.model_copy(update={"decomp_dim": "y"})
+        other = registry.get(NcToGrid(path=nc2grids[0].path, spec=other_spec))
+        assert other is not gwrap
+        assert len(registry) == 2
+        assert registry.get_nbytes() == 2 * estimate_grid_nbytes(gwrap)
+
+    def test_evict_lru(self, tmp_path_shared: Path, mocker: MockerFixture) -> None:
+        nc2grids = create_grid_defs(tmp_path_shared, 3)
+        spy = mocker.spy(esmpy.Grid, "destroy")
+        registry = GridRegistry(max_size=2, max_bytes=2**30)
+        first = registry.get(nc2grids[0])
+        _ = registry.get(nc2grids[1])
+        assert registry.get(nc2grids[0]) is first
+        _ = registry.get(nc2grids[2])
+        assert len(registry) == 2
+        assert spy.call_count == 1
+        assert registry.get(nc2grids[0]) is first
+
+        registry.clear()
+        assert len(registry) == 0
+        assert spy.call_count == 3
+
+    def test_get_field(self, tmp_path_shared: Path, mocker: MockerFixture) -> None:
+        nc2grids = create_grid_defs(tmp_path_shared, 2)
+        path = nc2grids[0].path
+        spy = mocker.spy(esmpy.Field, "destroy")
+        registry = GridRegistry(max_size=1, max_bytes=2**30)
+        gwrap = registry.get(nc2grids[0])
+        fwrap = registry.get_field(NcToField(path=path, name="a", gwrap=gwrap))
+        assert registry.get_field(NcToField(path=path, name="a", gwrap=gwrap)) is fwrap
+        batch = registry.get_field(
+            NcToFieldBatch(path=path, names=("a", "b"), gwrap=gwrap)
+        )
+        assert batch is not fwrap
+        assert registry.get_nbytes() == (
+            estimate_grid_nbytes(gwrap)
+            + estimate_field_nbytes(fwrap)
+            + estimate_field_nbytes(batch)
+        )
+        assert estimate_field_nbytes(batch) == 2 * estimate_field_nbytes(fwrap)
+
+        # Fields on grids outside the registry are not shared.
+        other = nc2grids[1].create_grid_wrapper()
+        nc2field = NcToField(path=nc2grids[1].path, name="a", gwrap=other)
+        assert registry.get_field(nc2field) is not registry.get_field(nc2field)
+
+        # Evicting a grid destroys its fields.
+        _ = registry.get(nc2grids[1])
+        assert spy.call_count == 2
+
+    def test_evict_bytes(self, tmp_path_shared: Path) -> None:
+        nc2grids = create_grid_defs(tmp_path_shared, 2)
+        registry = GridRegistry(max_size=10, max_bytes=1)
+        _ = registry.get(nc2grids[0])
+        _ = registry.get(nc2grids[1])
+        # The most recently used grid is kept even when over budget.
+        assert len(registry) == 1
+
+
+@pytest.mark.mpi
+def test_grid_registry_session(tmp_path_shared: Path) -> None:
+    nc2grid = create_grid_defs(tmp_path_shared, 1)[0]
+    assert create_grid_wrapper(nc2grid) is not create_grid_wrapper(nc2grid)
+    with custom_env(GRID_REGISTRY_MAX_SIZE="1"):
+        with grid_registry_session() as registry:
+            gwrap = create_grid_wrapper(nc2grid)
+            with grid_registry_session() as nested:
+                assert nested is registry
+                assert create_grid_wrapper(nc2grid) is gwrap
+            nc2field = NcToField(path=nc2grid.path, name="a", gwrap=gwrap)
+            assert create_field_wrapper(nc2field) is create_field_wrapper(nc2field)
+            assert len(registry) == 1
+        assert len(registry) == 0
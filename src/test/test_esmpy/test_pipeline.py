@@ -0,0 +1,73 @@
+import threading
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from regrid_wrapper.concrete.rrfs_dust_data import RRFS_DUST_DATA_ENV
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.esmpy.field_wrapper import (
+    FieldBatchWrapper,
+    GridSpec,
+    NcToFieldBatch,
+    NcToGrid,
+    open_nc,
+    resize_nc,
+)
+from regrid_wrapper.esmpy.pipeline import TimeWindowPipeline
+from test.conftest import create_dust_data_file
+
+SPEC = GridSpec(x_center="geolon", y_center="geolat", x_dim=("lon",), y_dim=("lat",))
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+@pytest.mark.mpi
+def test(tmp_path_shared: Path, mocker: MockerFixture, enabled: bool) -> None:
+    src_path = tmp_path_shared / "src.nc"
+    dst_path = tmp_path_shared / "dst.nc"
+    if COMM.rank == 0:
+        _ = create_dust_data_file(src_path)
+    COMM.barrier()
+    resize_nc(src_path, dst_path, {"time": 12, "lat": 26, "lon": 71})
+    gwrap = NcToGrid(path=src_path, spec=SPEC).create_grid_wrapper()
+    names = RRFS_DUST_DATA_ENV.fields
+    fwraps = [
+        NcToFieldBatch(
+            path=path, names=names, gwrap=gwrap, dim_time=("time",), time_chunk_size=5
+        ).create_field_wrapper()
+        for path in [src_path, dst_path]
+    ]
+
+    threads = set()
+    load = FieldBatchWrapper.load_nc_variable
+
+    def load_nc_variable(self: FieldBatchWrapper, path: Path) -> None:
+        threads.add(threading.current_thread().name)
+        load(self, path)
+
+    mocker.patch.object(FieldBatchWrapper, "load_nc_variable", load_nc_variable)
+    pipeline = TimeWindowPipeline(
+        fwraps[0], src_path, fwraps[1], dst_path, 12, 5, enabled=enabled
+    )
+    assert pipeline.enabled == enabled
+    windows = []
+    for start, stop, src_window, dst_window in pipeline:
+        windows.append((start, stop))
+        # Stands in for regridding on identical grids
+        dst_window.value.data[...] = src_window.value.data
+    assert windows == [(0, 5), (5, 10), (10, 12)]
+    assert all(ii.startswith("regrid-io") for ii in threads) == enabled
+
+    COMM.barrier()
+    if COMM.rank == 0:
+        with open_nc(src_path, "r", parallel=False) as src:
+            with open_nc(dst_path, "r", parallel=False) as dst:
+                for name in names:
+                    assert (src.variables[name][:] == dst.variables[name][:]).all()
+
+
+def test_single_window(tmp_path: Path, mocker: MockerFixture) -> None:
+    pipeline = TimeWindowPipeline(
+        mocker.Mock(), tmp_path, mocker.Mock(), tmp_path, 12, None, enabled=True
+    )
+    assert not pipeline.enabled
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import esmpy
+import numpy as np
+import pytest
+import xarray as xr
+
+from regrid_wrapper.concrete.rrfs_smoke_dust_veg_map import RrfsSmokeDustVegetationMap
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.esmpy.field_wrapper import NcToGrid, GridSpec
+from regrid_wrapper.esmpy.weight_cache import create_weight_key, fingerprint_array
+from regrid_wrapper.model.spec import GenerateWeightFileAndRegridFields
+from regrid_wrapper.strategy.core import RegridProcessor
+from test.conftest import (
+    create_rrfs_grid_file,
+    create_veg_map_file,
+    assert_zero_sum_diff,
+)
+
+GRID_SPEC = GridSpec(
+    x_center="grid_lont",
+    y_center="grid_latt",
+    x_dim=("grid_xt",),
+    y_dim=("grid_yt",),
+)
+
+
+def test_fingerprint_array_is_order_independent() -> None:
+    data = np.arange(12, dtype=float).reshape(3, 4)
+    whole = fingerprint_array(data, (0, 0))
+    assert whole == fingerprint_array(np.asfortranarray(data), (0, 0))
+    assert whole != fingerprint_array(data * 2, (0, 0))
+    assert whole != fingerprint_array(data, (1, 0))
+
+
+@pytest.mark.mpi
+def test_create_weight_key(tmp_path_shared: Path) -> None:
+    path = tmp_path_shared / "grid.nc"
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(path, with_corners=False)
+    COMM.barrier()
+
+    src_gwrap = NcToGrid(path=path, spec=GRID_SPEC).create_grid_wrapper()
+    dst_gwrap = NcToGrid(path=path, spec=GRID_SPEC).create_grid_wrapper()
+    bilinear = esmpy.RegridMethod.BILINEAR
+    ignore = esmpy.UnmappedAction.IGNORE
+
+    key = create_weight_key(src_gwrap, dst_gwrap, bilinear, ignore)
+    assert key == create_weight_key(dst_gwrap, src_gwrap, bilinear, ignore)
+    assert key != create_weight_key(
+        src_gwrap, dst_gwrap, esmpy.RegridMethod.PATCH, ignore
+    )
+
+    mask = src_gwrap.add_mask()
+    mask.fill(1)
+    masked_key = create_weight_key(src_gwrap, dst_gwrap, bilinear, ignore)
+    assert key != masked_key
+    mask[0, 0] = 0
+    assert masked_key != create_weight_key(src_gwrap, dst_gwrap, bilinear, ignore)
+
+
+@pytest.mark.mpi
+def test_operation_reuses_cached_weights(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    cache_directory = tmp_path_shared / "cache"
+
+    if COMM.rank == 0:
+        _ = create_veg_map_file(src_grid, ["emiss_factor"])
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    outputs = []
+    for tag in ["first", "second"]:
+        weights = tmp_path_shared / f"weights-{tag}.nc"
+        veg_map = tmp_path_shared / f"veg_map-{tag}.nc"
+        spec = GenerateWeightFileAndRegridFields(
+            src_path=src_grid,
+            dst_path=dst_grid,
+            output_weight_filename=weights,
+            output_filename=veg_map,
+            fields=("emiss_factor",),
+            name=f"veg_map-{tag}",
+            weight_cache_directory=cache_directory,
+        )
+        op = RrfsSmokeDustVegetationMap(spec=spec)
+        RegridProcessor(operation=op).execute()
+        assert weights.exists()
+        outputs.append(veg_map)
+
+    assert len(list(cache_directory.glob("weights-*.nc"))) == 1
+
+    if COMM.rank == 0:
+        with xr.open_dataset(outputs[0]) as first:
+            with xr.open_dataset(outputs[1]) as second:
+                assert_zero_sum_diff(
+                    second["emiss_factor"].values, first["emiss_factor"].values
+                )
@@ -0,0 +1,24 @@
+import pytest
+
+from test.benchmark.imports import measure_import
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "regrid_wrapper.hydra.task_prep",
+        "regrid_wrapper.describe",
+        "regrid_wrapper.geom.grid",
+        "regrid_wrapper.model.config",
+        "regrid_wrapper.model.spec",
+        "regrid_wrapper.strategy.operation",
+    ],
+)
+def test_lazy_imports(module: str) -> None:
+    record = measure_import(module)
+    assert record.loaded == ()
+
+
+def test_heavy_imports() -> None:
+    record = measure_import("regrid_wrapper.hydra.run_operations", heavy=("esmpy",))
+    assert record.loaded == ("esmpy",)
@@ -1,11 +1,18 @@
+import os
 from pathlib import Path
 
+import netCDF4 as nc
 import pytest
+from pytest_mock import MockerFixture
 
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model import spec as spec_module
 from regrid_wrapper.model.spec import (
     GenerateWeightFileSpec,
     AbstractRegridSpec,
+    GenerateWeightFileAndRegridFields,
 )
+from test.conftest import create_dust_data_file
 
 
 @pytest.mark.mpi
@@ -23,3 +30,72 @@ class TestGenerateWeightFileSpec:
         self, tmp_path_shared: Path, fake_spec: AbstractRegridSpec
     ) -> None:
         assert fake_spec is not None
+
+    def test_src_cost_variable(self, fake_spec: GenerateWeightFileSpec) -> None:
+        # Balancing would make the weight file's source indexing data dependent.
+        kwargs = fake_spec.model_dump(exclude={"src_cost_variable"})
+        with pytest.raises(ValueError, match="cannot balance the decomposition"):
+            _ = GenerateWeightFileSpec(**kwargs, src_cost_variable="foo")
+
+    def test_no_output(self, fake_spec: GenerateWeightFileSpec) -> None:
+        kwargs = fake_spec.model_dump(exclude={"output_weight_filename"})
+        with pytest.raises(ValueError, match="spec has no output files"):
+            _ = GenerateWeightFileSpec(**kwargs)
+
+    def test_overwrite(self, fake_spec: GenerateWeightFileSpec) -> None:
+        COMM.barrier()
+        if COMM.rank == 0:
+            fake_spec.output_weight_filename.touch()
+        COMM.barrier()
+        kwargs = fake_spec.model_dump(exclude={"overwrite"})
+        with pytest.raises(IOError):
+            _ = GenerateWeightFileSpec(**kwargs)
+        spec = GenerateWeightFileSpec(**kwargs, overwrite=True)
+        assert spec.is_complete()
+
+
+@pytest.mark.mpi
+class TestGenerateWeightFileAndRegridFields:
+    def test_validate_fields(
+        self,
+        tmp_path_shared: Path,
+        fake_spec: GenerateWeightFileSpec,
+        mocker: MockerFixture,
+    ) -> None:
+        src_path = tmp_path_shared / "dust.nc"
+        if COMM.rank == 0:
+            _ = create_dust_data_file(src_path)
+        COMM.barrier()
+        spec_module.clear_variable_names_cache()
+        spy = mocker.spy(nc, "Dataset")
+        kwargs = fake_spec.model_dump(include={"name", "dst_path"})
+        kwargs["src_path"] = src_path
+        kwargs["output_weight_filename"] = tmp_path_shared / "weights.nc"
+        kwargs["output_filename"] = tmp_path_shared / "output.nc"
+
+        spec = GenerateWeightFileAndRegridFields(**kwargs, fields=("uthr",))
+        assert spec.fields == ("uthr",)
+        with pytest.raises(ValueError, match="missing fields: \\['foo'\\]"):
+            _ = GenerateWeightFileAndRegridFields(**kwargs, fields=("uthr", "foo"))
+        # The header is read once per path and only on rank 0.
+        assert spy.call_count == (1 if COMM.rank == 0 else 0)
+
+    def test_variable_names_modified(self, tmp_path_shared: Path) -> None:
+        path = tmp_path_shared / "dust.nc"
+        if COMM.rank == 0:
+            _ = create_dust_data_file(path)
+        COMM.barrier()
+        assert "foo" not in spec_module.get_variable_names(path)
+        if COMM.rank == 0:
+            with nc.Dataset(path, "a") as ds:
+                ds.createVariable("foo", "f8")
+            # Some filesystems only store modification times in whole seconds.
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        COMM.barrier()
+        assert "foo" in spec_module.get_variable_names(path)
+
+    def test_variable_names_error(self, tmp_path_shared: Path) -> None:
+        # Every rank raises instead of waiting on rank 0.
+        with pytest.raises(FileNotFoundError):
+            _ = spec_module.get_variable_names(tmp_path_shared / "missing.nc")
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import xarray as xr
+
+from regrid_wrapper.concrete.rave_to_rrfs import RaveToRrfs
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.spec import GenerateWeightFileSpec
+from regrid_wrapper.sparse.weight_matrix import WeightMatrix
+from regrid_wrapper.strategy.core import RegridProcessor
+from test.conftest import create_rrfs_grid_file, create_analytic_data_array
+
+
+def create_weight_file(path: Path) -> None:
+    # Destination point 0 averages source points 0 and 1, point 1 copies source
+    # point 3 and point 2 is unmapped.
+    with nc.Dataset(path, "w") as ds:
+        ds.createDimension("n_s", 3)
+        ds.createVariable("row", np.int32, ("n_s",))[:] = [1, 1, 2]
+        ds.createVariable("col", np.int32, ("n_s",))[:] = [1, 2, 4]
+        ds.createVariable("S", np.float64, ("n_s",))[:] = [0.5, 0.5, 1.0]
+
+
+class TestWeightMatrix:
+
+    def test_apply(self, tmp_path: Path) -> None:
+        path = tmp_path / "weights.nc"
+        create_weight_file(path)
+        wm = WeightMatrix.from_file(path, src_shape=(2, 2), dst_shape=(1, 3))
+
+        src = np.arange(8, dtype=float).reshape(2, 2, 2)
+        actual = wm.apply(src)
+        expected = np.array([[[0.5, 3.0, 0.0]], [[4.5, 7.0, 0.0]]])
+        assert actual.shape == (2, 1, 3)
+        assert np.all(actual == expected)
+
+        dst = np.full((2, 1, 3), -1.0)
+        wm.apply(src, dst=dst)
+        expected[..., 2] = -1.0
+        assert np.all(dst == expected)
+        assert wm.mapped.tolist() == [[True, True, False]]
+
+    def test_apply_bad_shape(self, tmp_path: Path) -> None:
+        path = tmp_path / "weights.nc"
+        create_weight_file(path)
+        wm = WeightMatrix.from_file(path, src_shape=(2, 2), dst_shape=(1, 3))
+        with pytest.raises(ValueError):
+            wm.apply(np.zeros((2, 3)))
+
+
+@pytest.mark.mpi
+def test_matches_esmf_weights(tmp_path_shared: Path) -> None:
+    src_grid = tmp_path_shared / "src_grid.nc"
+    dst_grid = tmp_path_shared / "dst_grid.nc"
+    weights = tmp_path_shared / "weights.nc"
+
+    if COMM.rank == 0:
+        _ = create_rrfs_grid_file(src_grid)
+        _ = create_rrfs_grid_file(dst_grid)
+    COMM.barrier()
+
+    spec = GenerateWeightFileSpec(
+        src_path=src_grid,
+        dst_path=dst_grid,
+        output_weight_filename=weights,
+        name="tester",
+    )
+    RegridProcessor(operation=RaveToRrfs(spec=spec)).execute()
+
+    if COMM.rank == 0:
+        with xr.open_dataset(src_grid) as ds:
+            lon_mesh = ds["grid_lont"].values
+            lat_mesh = ds["grid_latt"].values
+        src = create_analytic_data_array(
+            ["time", "grid_yt", "grid_xt"], lon_mesh, lat_mesh, ntime=3
+        ).values
+        wm = WeightMatrix.from_file(
+            weights, src_shape=lon_mesh.shape, dst_shape=lon_mesh.shape
+        )
+        actual = wm.apply(src)
+        assert np.allclose(actual, src)
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from regrid_wrapper.context.comm import COMM
+from regrid_wrapper.model.spec import GenerateWeightFileSpec
+from regrid_wrapper.strategy.core import RegridProcessor
+from regrid_wrapper.strategy.manifest import Manifest
+from regrid_wrapper.strategy.operation import AbstractRegridOperation
+
+
+class WritingRegridOperation(AbstractRegridOperation):
+
+    def run(self) -> None:
+        if COMM.rank == 0:
+            self._spec.output_weight_filename.write_text("weights")
+        COMM.barrier()
+
+
+class TestManifest:
+
+    def test_is_fresh(self, tmp_path: Path, fake_spec: GenerateWeightFileSpec) -> None:
+        manifest = Manifest(tmp_path / "manifest")
+        assert not manifest.is_fresh(fake_spec)
+
+        fake_spec.output_weight_filename.write_text("weights")
+        record = manifest.write(fake_spec)
+        assert manifest.read(fake_spec) == record
+        assert manifest.is_fresh(fake_spec)
+        assert len(list((tmp_path / "manifest").iterdir())) == 1
+
+        fake_spec.output_weight_filename.write_text("partial")
+        assert not manifest.is_fresh(fake_spec)
+
+        fake_spec.output_weight_filename.write_text("weights")
+        fake_spec.src_path.write_text("changed")
+        assert not manifest.is_fresh(fake_spec)
+
+        manifest.clear(fake_spec)
+        assert not fake_spec.output_weight_filename.exists()
+        assert manifest.read(fake_spec) is None
+
+    def test_spec_changed(
+        self, tmp_path: Path, fake_spec: GenerateWeightFileSpec
+    ) -> None:
+        manifest = Manifest(tmp_path / "manifest")
+        fake_spec.output_weight_filename.write_text("weights")
+        _ = manifest.write(fake_spec)
+        changed = fake_spec.model_copy(update={"esmpy_debug": True})
+        assert not manifest.is_fresh(changed)
+
+
+@pytest.mark.mpi
+def test_processor_skips_complete(
+    tmp_path_shared: Path, fake_spec: GenerateWeightFileSpec, mocker: MockerFixture
+) -> None:
+    manifest = Manifest(tmp_path_shared / "manifest")
+    spy = mocker.spy(WritingRegridOperation, "run")
+
+    RegridProcessor(WritingRegridOperation(fake_spec), manifest=manifest).execute()
+    assert spy.call_count == 1
+    assert fake_spec.is_complete()
+
+    spec = fake_spec.model_copy(update={"overwrite": True})
+    RegridProcessor(WritingRegridOperation(spec), manifest=manifest).execute()
+    assert spy.call_count == 1
+
+    if COMM.rank == 0:
+        spec.output_weight_filename.write_text("partial")
+    COMM.barrier()
+    RegridProcessor(WritingRegridOperation(spec), manifest=manifest).execute()
+    assert spy.call_count == 2
+    assert spec.output_weight_filename.read_text() == "weights"
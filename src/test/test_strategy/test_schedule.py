@@ -0,0 +1,169 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from regrid_wrapper.concrete.core import COST_VARIABLES, iter_operations
+from regrid_wrapper.hydra.task_prep import create_run_commands, do_task_prep
+from regrid_wrapper.model.config import (
+    Component,
+    ComponentKey,
+    RrfsGrid,
+    RrfsGridKey,
+    SmokeDustRegridConfig,
+    SourceDefinition,
+)
+from regrid_wrapper.strategy.schedule import (
+    allocate_tasks,
+    create_schedule,
+    read_grid_size,
+)
+from test.conftest import (
+    create_dust_data_file,
+    create_emi_data_file,
+    create_rrfs_grid_file,
+    create_veg_map_file,
+)
+
+
+@pytest.fixture
+def fake_cfg(tmp_path: Path) -> SmokeDustRegridConfig:
+    veg_map_path = tmp_path / "veg_map_source.nc"
+    dust_path = tmp_path / "dust_source.nc"
+    _ = create_veg_map_file(veg_map_path, ["emiss_factor"])
+    _ = create_dust_data_file(dust_path)
+    rrfs_grids = {}
+    for key, nlon in zip(RrfsGridKey, [40, 80, 160]):
+        path = tmp_path / f"{key}.nc"
+        _ = create_rrfs_grid_file(path, nlon=nlon)
+        rrfs_grids[key] = RrfsGrid(grid=path, nodes=1)
+    components = {
+        ComponentKey.VEG_MAP: Component(grid=veg_map_path),
+        ComponentKey.RAVE_GRID: Component(
+            grid=rrfs_grids[RrfsGridKey.RRFS_NA_13KM].grid
+        ),
+        ComponentKey.DUST: Component(grid=dust_path),
+    }
+    return SmokeDustRegridConfig(
+        target_grids=tuple(RrfsGridKey),
+        target_components=(ComponentKey.VEG_MAP, ComponentKey.DUST),
+        root_output_directory=tmp_path / "root",
+        source_definition=SourceDefinition(
+            components=components, rrfs_grids=rrfs_grids
+        ),
+        concurrent=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "costs, ntasks, expected",
+    [
+        ([1.0, 1.0, 1.0], 3, [1, 1, 1]),
+        ([1.0, 1.0], 5, [3, 2]),
+        ([1.0, 3.0], 10, [3, 7]),
+        ([0.0, 0.0], 4, [2, 2]),
+    ],
+)
+def test_allocate_tasks(costs, ntasks, expected) -> None:
+    actual = allocate_tasks(costs, ntasks)
+    assert actual == expected
+    assert sum(actual) == ntasks
+
+
+def test_allocate_tasks_too_few() -> None:
+    with pytest.raises(ValueError):
+        _ = allocate_tasks([1.0, 1.0], 1)
+
+
+def test_read_grid_size(tmp_path: Path) -> None:
+    path = tmp_path / "dust.nc"
+    _ = create_dust_data_file(path)
+    actual = read_grid_size(path)
+    assert actual.cells == 71 * 26
+    assert actual.layers == 12 * 5 + 2
+
+
+def test_create_schedule(fake_cfg: SmokeDustRegridConfig) -> None:
+    groups = create_schedule(fake_cfg, 24)
+    assert len(groups) == 6
+    assert sum(ii.ntasks for ii in groups) == 24
+    costs = {(ii.target_grid, ii.target_components): ii for ii in groups}
+    small = costs[(RrfsGridKey.RRFS_NA_13KM, (ComponentKey.DUST,))]
+    large = costs[(RrfsGridKey.RRFS_CONUS_25KM, (ComponentKey.DUST,))]
+    assert small.cost < large.cost
+    assert small.ntasks <= large.ntasks
+
+
+def test_create_schedule_by_grid(fake_cfg: SmokeDustRegridConfig) -> None:
+    groups = create_schedule(fake_cfg, 4)
+    assert [ii.target_components for ii in groups] == [
+        (ComponentKey.VEG_MAP, ComponentKey.DUST)
+    ] * 3
+    assert sum(ii.ntasks for ii in groups) == 4
+    assert create_schedule(fake_cfg, 2) == []
+
+
+def test_create_run_commands(fake_cfg: SmokeDustRegridConfig) -> None:
+    actual = create_run_commands(fake_cfg, 24)
+    assert actual.count("srun --exact") == 6
+    assert "target_components=[DUST]" in actual
+    assert actual.endswith(
+        'status=0; for pid in "${pids[@]}"; do wait "${pid}" || status=1; done\n'
+        "exit ${status}"
+    )
+    # A failed group fails the job after the other groups finish.
+    wait_lines = actual.splitlines()[-2:]
+    script = ["set -e", "pids=()", "(exit 3) & pids+=($!)", "true & pids+=($!)"]
+    ret = subprocess.run(["bash", "-c", "\n".join(script + wait_lines)])
+    assert ret.returncode == 1
+
+    sequential = fake_cfg.model_copy(update={"concurrent": False})
+    actual = create_run_commands(sequential, 24)
+    assert actual.startswith("mpirun -np 24")
+
+
+def test_iter_operation_keys(fake_cfg: SmokeDustRegridConfig) -> None:
+    keys = list(fake_cfg.iter_operation_keys())
+    assert keys[:2] == [
+        (RrfsGridKey.RRFS_NA_13KM, ComponentKey.VEG_MAP),
+        (RrfsGridKey.RRFS_NA_13KM, ComponentKey.DUST),
+    ]
+    fan_out = fake_cfg.model_copy(update={"fan_out": True})
+    fan_out_keys = list(fan_out.iter_operation_keys())
+    assert fan_out_keys[:3] == [
+        (target_grid, ComponentKey.VEG_MAP) for target_grid in RrfsGridKey
+    ]
+    assert sorted(fan_out_keys) == sorted(keys)
+
+
+@pytest.mark.parametrize("balance_decomposition", [False, True])
+def test_iter_operations_balance_decomposition(
+    fake_cfg: SmokeDustRegridConfig, balance_decomposition: bool
+) -> None:
+    cfg = fake_cfg.model_copy(update={"balance_decomposition": balance_decomposition})
+    do_task_prep(cfg)
+    keys = list(cfg.iter_operation_keys())
+    for (_, component), op in zip(keys, iter_operations(cfg)):
+        expected = COST_VARIABLES.get(component) if balance_decomposition else None
+        assert op.spec.src_cost_variable == expected
+
+
+def test_iter_operations_unique_names(fake_cfg: SmokeDustRegridConfig) -> None:
+    # Profile reports are named after operations and must not overwrite
+    # each other.
+    emi_path = fake_cfg.root_output_directory.parent / "emi_source.nc"
+    _ = create_emi_data_file(emi_path)
+    components = dict(fake_cfg.source_definition.components)
+    components[ComponentKey.EMI] = Component(grid=emi_path)
+    cfg = fake_cfg.model_copy(
+        update={
+            "target_components": (*fake_cfg.target_components, ComponentKey.EMI),
+            "source_definition": fake_cfg.source_definition.model_copy(
+                update={"components": components}
+            ),
+        }
+    )
+    do_task_prep(cfg)
+    names = [ii.spec.name for ii in iter_operations(cfg)]
+    assert len(names) == 3 * len(RrfsGridKey)
+    assert len(set(names)) == len(names)